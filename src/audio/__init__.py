@@ -1,7 +1,20 @@
-"""Central logic for capturing and loading audio signals."""
+"""Central logic for capturing and loading audio signals.
 
-from .loader import load_audio
-from .recorder import record_audio, start_recording, stop_recording
+The submodules are imported on first use: the recorder loads sounddevice,
+which initializes PortAudio and is not needed to load a file.
+"""
 
+from lazy_exports import lazy_exports
 
-__all__ = ["load_audio", "record_audio", "start_recording", "stop_recording"]
\ No newline at end of file
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "load_audio": ".loader",
+    "record_audio": ".recorder",
+    "start_recording": ".recorder",
+    "stop_recording": ".recorder",
+}
+
+__all__ = sorted(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
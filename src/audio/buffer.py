@@ -0,0 +1,120 @@
+# src/audio/buffer.py
+
+"""Append-only sample buffer made of large preallocated pages.
+
+The recorder callback runs on the PortAudio thread and must not stall, so it
+only copies every block into the current page and then publishes the new
+number of frames. Readers only look at the frames published so far, which
+were written before they were published, so neither side takes a lock (one
+writer and any number of readers).
+
+Pages are never moved or concatenated: a recording of any length costs one
+new page every PAGE_FRAMES frames, and the page after the current one is
+prepared outside the callback with `reserve`. Once a consumer has saved the
+oldest pages elsewhere it can `release` them, so memory stays bounded.
+"""
+
+import numpy as np
+
+
+# Frames per page (about 65 s at 16 kHz, 4 MiB of float32)
+PAGE_FRAMES = 1 << 20
+
+
+class PagedBuffer:
+    """Mono float32 samples in fixed-size pages, written by a single producer."""
+
+    def __init__(self, page_frames: int = PAGE_FRAMES):
+        """Initialize an empty buffer; the first page is allocated at once."""
+        self.page_frames = page_frames
+        self._pages = [np.empty(page_frames, dtype=np.float32)]
+        self._spare = None
+        self._frames = 0
+        # Pages before this index were released
+        self._released = 0
+
+    @property
+    def frames(self) -> int:
+        """Number of frames written and visible to readers."""
+        return self._frames
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append samples (producer side; called from the audio callback)."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if not len(samples):
+            return
+
+        position = self._frames
+        written = 0
+        while written < len(samples):
+            page_index, offset = divmod(position, self.page_frames)
+            if page_index == len(self._pages):
+                self._pages.append(self._take_page())
+            count = min(len(samples) - written, self.page_frames - offset)
+            self._pages[page_index][offset : offset + count] = samples[
+                written : written + count
+            ]
+            written += count
+            position += count
+
+        # Publish last: readers never see frames that are not written yet
+        self._frames = position
+
+    def reserve(self) -> None:
+        """Prepare the next page, so that the producer does not allocate it.
+
+        Call it from a thread other than the producer (e.g. the loop that
+        keeps the audio stream open).
+        """
+        if self._spare is None:
+            self._spare = np.empty(self.page_frames, dtype=np.float32)
+
+    @property
+    def first_frame(self) -> int:
+        """First frame that can still be read (the rest were released)."""
+        return self._released * self.page_frames
+
+    def release(self, end: int) -> None:
+        """Drop the whole pages before frame `end`; they can no longer be read.
+
+        Views returned earlier stay valid, the page is freed with the last one.
+        """
+        last = min(end, self._frames) // self.page_frames
+        for index in range(self._released, last):
+            self._pages[index] = None
+        self._released = max(self._released, last)
+
+    def pages(self, start: int = 0, end: int | None = None) -> list:
+        """Return views of the frames from `start` to `end`, page by page.
+
+        No samples are copied; the views stay valid while the buffer lives.
+        """
+        if start < self.first_frame:
+            raise ValueError(f"Frames before {self.first_frame} were released")
+        end = self._frames if end is None else min(end, self._frames)
+        views = []
+        while start < end:
+            page_index, offset = divmod(start, self.page_frames)
+            count = min(end - start, self.page_frames - offset)
+            views.append(self._pages[page_index][offset : offset + count])
+            start += count
+        return views
+
+    def read(self, start: int = 0, end: int | None = None) -> np.ndarray:
+        """Return the frames from `start` to `end` as one array.
+
+        It is a view when they are in a single page and a copy otherwise.
+        """
+        views = self.pages(start, end)
+        if len(views) == 1:
+            return views[0]
+        if not views:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(views)
+
+    def _take_page(self) -> np.ndarray:
+        """Return the reserved page, or allocate one if there is none."""
+        page, self._spare = self._spare, None
+        if page is None:
+            page = np.empty(self.page_frames, dtype=np.float32)
+        return page
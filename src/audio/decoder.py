@@ -0,0 +1,167 @@
+# src/audio/decoder.py
+
+"""In-memory audio decoding through an FFmpeg pipe.
+
+FFmpeg decodes any supported format (video containers included) and writes
+16 kHz mono float32 samples to its stdout, which are read straight into a
+NumPy buffer. There is a single decode per file and no temporary file.
+"""
+
+import subprocess
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from logger import get_logger
+
+from .loader import get_ffmpeg_path
+from .reader import read_audio
+
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Samples read per chunk when the length of the audio is not known
+CHUNK_SAMPLES = 1 << 20
+
+
+def decode_audio(
+    audio_path: str, sample_rate: int = SAMPLE_RATE, start: float = 0.0
+) -> np.ndarray:
+    """Decode an audio file to mono float32 samples at `sample_rate`.
+
+    Uses FFmpeg when it is available and falls back to soundfile (with the
+    polyphase resampler) otherwise or when FFmpeg fails. With `start` only
+    the audio from that second on is decoded.
+    """
+    ffmpeg_path = get_ffmpeg_path()
+    if ffmpeg_path:
+        try:
+            return decode_with_ffmpeg(audio_path, sample_rate, ffmpeg_path, start)
+        except RuntimeError as e:
+            logger.warning(f"Decoding with FFmpeg failed: {e}")
+    else:
+        logger.warning("FFmpeg not found, decoding with soundfile")
+
+    logger.info("Trying alternative method...")
+    return decode_with_soundfile(audio_path, sample_rate, start)
+
+
+def decode_with_ffmpeg(
+    audio_path: str,
+    sample_rate: int = SAMPLE_RATE,
+    ffmpeg_path: str = "ffmpeg",
+    start: float = 0.0,
+) -> np.ndarray:
+    """Decode a file with FFmpeg, reading its raw f32le output from a pipe."""
+    # Seeking before the input skips the earlier audio without decoding it
+    seek = ["-ss", f"{start:.6f}"] if start > 0 else []
+    cmd = [
+        ffmpeg_path,
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-threads",
+        "0",
+        *seek,
+        "-i",
+        audio_path,
+        "-vn",
+        "-f",
+        "f32le",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-",
+    ]
+    logger.debug(f"Running: {' '.join(cmd)}")
+
+    try:
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except OSError as e:
+        raise RuntimeError(f"Could not start FFmpeg: {e}") from e
+
+    # Drain stderr in parallel so a chatty FFmpeg cannot block on a full pipe
+    errors = []
+    reader = threading.Thread(
+        target=lambda: errors.append(process.stderr.read()), daemon=True
+    )
+    reader.start()
+
+    try:
+        expected = _expected_samples(audio_path, sample_rate, start)
+        samples = read_samples(process.stdout, expected)
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+        reader.join()
+
+    if returncode != 0:
+        message = errors[0].decode("utf-8", "replace").strip() if errors else ""
+        raise RuntimeError(f"FFmpeg error (code {returncode}): {message}")
+    return samples
+
+
+def read_samples(stream, expected: int | None = None) -> np.ndarray:
+    """Read raw float32 samples from a binary stream into a NumPy array.
+
+    With `expected` the buffer is allocated once and filled in place; the
+    data is read in CHUNK_SAMPLES pieces when the length is unknown or the
+    estimate falls short.
+    """
+    chunks = []
+    # One spare sample tells whether the estimate was long enough
+    size = expected + 1 if expected else CHUNK_SAMPLES
+    while True:
+        chunk = np.empty(size, dtype=np.float32)
+        filled = _fill(stream, memoryview(chunk).cast("B"))
+        chunks.append(chunk[: filled // chunk.itemsize])
+        if filled < chunk.nbytes:
+            break
+        size = CHUNK_SAMPLES
+
+    if len(chunks) == 1:
+        return chunks[0]
+    return np.concatenate(chunks)
+
+
+def decode_with_soundfile(
+    audio_path: str, sample_rate: int = SAMPLE_RATE, start: float = 0.0
+) -> np.ndarray:
+    """Decode a file with soundfile (formats supported by libsndfile).
+
+    The file is read, mixed down and resampled in blocks, so only the output
+    is held in memory in full.
+    """
+    return read_audio(audio_path, sample_rate, start=start)
+
+
+def _fill(stream, view: memoryview) -> int:
+    """Read from `stream` until `view` is full or the stream ends."""
+    filled = 0
+    while filled < len(view):
+        count = stream.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+def _expected_samples(
+    audio_path: str, sample_rate: int, start: float = 0.0
+) -> int | None:
+    """Estimate the decoded length from the file header, if soundfile can."""
+    try:
+        info = sf.info(audio_path)
+    except Exception:
+        return None
+    frames = info.frames - int(start * info.samplerate)
+    if frames <= 0 or info.samplerate <= 0:
+        return None
+    return -(-frames * sample_rate // info.samplerate)
@@ -56,7 +56,8 @@ def get_ffmpeg_path() -> str:
 def convert_mp4_to_wav(mp4_path: str) -> str:
     """Convert an MP4 file to WAV using ffmpeg.
 
-    Returns the path of the temporary WAV file.
+    Returns the path of the temporary WAV file. Transcription no longer needs
+    it (see `audio.decoder`); it is kept for callers that want a WAV file.
     """
     temp_wav = None
 
@@ -144,9 +145,10 @@ def convert_mp4_to_wav(mp4_path: str) -> str:
 
 def load_audio(audio_path: str) -> str:
     """Validate an audio file.
-    
-    If it is MP4, it converts it to WAV automatically.
-    Returns the absolute path to the audio.
+
+    Returns the absolute path to the audio. Every supported format, MP4
+    included, is decoded in memory by the transcriber, so no conversion is
+    done here.
     """
     # Convert to absolute path if relative
     audio_path = os.path.abspath(audio_path)
@@ -159,9 +161,4 @@ def load_audio(audio_path: str) -> str:
     if ext not in SUPPORTED_EXTENSIONS:
         raise ValueError(f"Audio format not supported. Detected extension: {ext}")
 
-    # If MP4, convert to WAV
-    if ext == ".mp4":
-        logger.info("MP4 file detected, converting to WAV...")
-        return convert_mp4_to_wav(audio_path)
-
     return audio_path
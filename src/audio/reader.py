@@ -0,0 +1,117 @@
+# src/audio/reader.py
+
+"""Block-wise reading of audio files with soundfile.
+
+Reading a whole file with `sf.read` and converting it afterwards keeps
+several full-length copies alive at once (the multichannel samples, their
+float32 version, the mono mix and the resampled signal), which for hours of
+multichannel audio is gigabytes. Here the file is read in blocks of
+BLOCK_FRAMES frames and every block is mixed to mono, normalized and
+resampled before the next one is read, so the memory used besides the
+output is bounded by the block size.
+"""
+
+from collections.abc import Iterator
+from math import ceil
+
+import numpy as np
+import soundfile as sf
+
+from .resample import PolyphaseResampler
+
+
+SAMPLE_RATE = 16000
+
+# Frames read from the file at a time (about 1.5 s at 44.1 kHz)
+BLOCK_FRAMES = 1 << 16
+
+# Subtypes whose samples can exceed [-1, 1] when read as float
+FLOAT_SUBTYPES = ("FLOAT", "DOUBLE")
+
+
+def iter_blocks(
+    audio_path: str,
+    sample_rate: int = SAMPLE_RATE,
+    block_frames: int = BLOCK_FRAMES,
+    start: float = 0.0,
+) -> Iterator[np.ndarray]:
+    """Yield the audio of a file as mono float32 blocks at `sample_rate`.
+
+    Reading begins `start` seconds into the file. Loud float files are scaled
+    down to a peak of 1.0, like the whole-file conversion did; they are read
+    twice, once to find their peak. Every yielded block is a new array that
+    the caller may keep.
+    """
+    with sf.SoundFile(audio_path) as audio_file:
+        if start > 0:
+            audio_file.seek(min(int(start * audio_file.samplerate), audio_file.frames))
+        scale = _normalization(audio_file, block_frames)
+        resampler = None
+        if audio_file.samplerate != sample_rate:
+            resampler = PolyphaseResampler(audio_file.samplerate, sample_rate)
+
+        # The frames of every block are read into the same buffer
+        buffer = np.empty((block_frames, audio_file.channels), dtype=np.float32)
+        for block in audio_file.blocks(out=buffer):
+            samples = _to_mono(block, scale)
+            if resampler is not None:
+                samples = resampler.process(samples)
+            if len(samples):
+                yield samples
+
+        if resampler is not None:
+            tail = resampler.flush()
+            if len(tail):
+                yield tail
+
+
+def read_audio(
+    audio_path: str,
+    sample_rate: int = SAMPLE_RATE,
+    block_frames: int = BLOCK_FRAMES,
+    start: float = 0.0,
+) -> np.ndarray:
+    """Read a file (from `start` seconds on) as mono float32 samples.
+
+    The output is allocated once from the length in the header and filled
+    block by block.
+    """
+    info = sf.info(audio_path)
+    frames = max(0, info.frames - int(start * info.samplerate))
+    output = np.empty(ceil(frames * sample_rate / info.samplerate), np.float32)
+    position = 0
+    for block in iter_blocks(audio_path, sample_rate, block_frames, start):
+        end = position + len(block)
+        if end > len(output):
+            # The header was short; only the extra samples are added
+            output = np.concatenate((output[:position], block))
+        else:
+            output[position:end] = block
+        position = end
+    return output[:position]
+
+
+def _normalization(audio_file: sf.SoundFile, block_frames: int) -> float:
+    """Return the factor that brings the peak of the mono mix down to 1.0.
+
+    Integer PCM read as float is always within [-1, 1], so only float
+    subtypes are scanned (from the current position to the end).
+    """
+    if audio_file.subtype not in FLOAT_SUBTYPES:
+        return 1.0
+
+    position = audio_file.tell()
+    peak = 0.0
+    buffer = np.empty((block_frames, audio_file.channels), dtype=np.float32)
+    for block in audio_file.blocks(out=buffer):
+        peak = max(peak, float(np.abs(_to_mono(block, 1.0)).max(initial=0.0)))
+    audio_file.seek(position)
+    return 1.0 / peak if peak > 1.0 else 1.0
+
+
+def _to_mono(block: np.ndarray, scale: float) -> np.ndarray:
+    """Mix a (frames, channels) block down to a new mono array."""
+    samples = np.mean(block, axis=1, dtype=np.float32)
+    if scale != 1.0:
+        samples *= scale
+    return samples
@@ -1,6 +1,11 @@
 # src/audio/recorder.py
 
-"""Real-time audio recording management."""
+"""Real-time audio recording management.
+
+Manual recordings are written to disk while they are captured (see
+`audio.writer`), so memory use does not grow with the length of the session.
+"""
+import os
 import tempfile
 import threading
 
@@ -10,6 +15,10 @@ import soundfile as sf
 
 from logger import get_logger
 
+from .buffer import PagedBuffer
+from .resample import PolyphaseResampler
+from .writer import StreamWriter, get_record_format
+
 
 logger = get_logger(__name__)
 
@@ -17,24 +26,45 @@ logger = get_logger(__name__)
 class AudioRecorder:
     """Audio recorder with start/stop control."""
 
-    def __init__(self):
-        """Initialize the status of the recorder and the audio buffer."""
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        capture_rate: int | None = None,
+        file_format: str | None = None,
+    ):
+        """Initialize the status of the recorder and the audio buffer.
+
+        `capture_rate` is the rate requested from the device (for microphones
+        that only work at 44.1/48 kHz); the recording is resampled to
+        `sample_rate` as it is written. `file_format` is "wav" or "flac"
+        (AUDIO_APP_RECORD_FORMAT by default).
+        """
         self.is_recording = False
-        self.audio_data = []
-        self.sample_rate = 16000
+        self.buffer = PagedBuffer()
+        self.sample_rate = sample_rate
+        self.capture_rate = capture_rate or sample_rate
+        self.file_format = file_format
         self.thread = None
+        self.writer = None
 
-    def start_recording(self):
-        """Start audio recording."""
+    def start_recording(self, on_audio=None):
+        """Start audio recording.
+
+        `on_audio` receives the recording in blocks at `sample_rate` while it
+        is written to disk, about once a second.
+        """
         if self.is_recording:
             return
 
         self.is_recording = True
-        self.audio_data = []
+        self.buffer = PagedBuffer()
+        self.writer = self._open_writer(on_audio)
+        self.writer.start()
 
         import logging
         logger = logging.getLogger(__name__)
         logger.info("Starting recording... (press STOP in the GUI to stop)")
+        logger.info(f"Recording to {self.writer.path}")
 
         # Start recording in a separate thread
         self.thread = threading.Thread(target=self._record_stream, daemon=True)
@@ -57,22 +87,26 @@ class AudioRecorder:
             device = None  # Default
 
             #Use stream for continuous recording
+            buffer = self.buffer
+
             def audio_callback(indata, frames, time, status):
                 if status:
                     logger.debug(f"Stream status: {status}")
-                # Copy audio data
-                self.audio_data.append(indata.copy())
+                # Copy the block into the preallocated pages (mono)
+                buffer.write(indata[:, 0])
 
             # Create audio stream
             with sd.InputStream(
                 callback=audio_callback,
                 channels=1,
-                samplerate=self.sample_rate,
+                samplerate=self.capture_rate,
                 blocksize=4096,
                 device=device,
             ):
                 # Record while is_recording is True
                 while self.is_recording:
+                    # The callback takes this page when the current one fills up
+                    buffer.reserve()
                     sd.sleep(100)  # Small pause to not consume CPU
 
         except Exception as e:
@@ -80,8 +114,9 @@ class AudioRecorder:
             self.is_recording = False
 
     def stop_recording(self) -> str:
-        """Stop recording and returns the WAV file path."""
-        if not self.is_recording:
+        """Stop recording and returns the path of the audio file."""
+        # A stream that failed halfway still leaves its audio to save
+        if not self.is_recording and self.writer is None:
             return None
 
         self.is_recording = False
@@ -92,37 +127,54 @@ class AudioRecorder:
 
         logger.info("Recording stopped")
 
-        if not self.audio_data:
-            logger.warning("No audio was recorded")
+        # Only the last second is still in memory: write it and close the file
+        writer, self.writer = self.writer or self._open_writer(), None
+        try:
+            frames = writer.finish()
+        except RuntimeError as e:
+            logger.error(str(e))
             return None
 
-        # Concatenate all audio blocks
-        audio_array = np.concatenate(self.audio_data, axis=0)
-
-        # Convert to float32
-        audio_array = audio_array.astype(np.float32)
+        if not frames:
+            logger.warning("No audio was recorded")
+            os.remove(writer.path)
+            return None
 
-        # Normalize if necessary
-        max_val = np.abs(audio_array).max()
-        if max_val > 1.0:
-            audio_array = audio_array / max_val
+        logger.info(f"Saved Audio: {writer.path}")
+        return writer.path
+
+    def _open_writer(self, on_audio=None) -> StreamWriter:
+        """Create the temporary file of a recording and its writer."""
+        file_format = self.file_format or get_record_format()
+        with tempfile.NamedTemporaryFile(
+            suffix="." + file_format, delete=False
+        ) as temp_file:
+            path = temp_file.name
+        return StreamWriter(
+            self.buffer,
+            path,
+            self.capture_rate,
+            self.sample_rate,
+            file_format,
+            on_audio=on_audio,
+        )
 
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_wav = temp_file.name
-        sf.write(temp_wav, audio_array, self.sample_rate)
 
-        logger.info(f"Saved Audio: {temp_wav}")
-        return temp_wav
+def _resample_blocks(blocks: list, capture_rate: int, sample_rate: int) -> np.ndarray:
+    """Resample recorded blocks one by one into a single mono array."""
+    resampler = PolyphaseResampler(capture_rate, sample_rate)
+    parts = [resampler.process(block.reshape(-1)) for block in blocks]
+    parts.append(resampler.flush())
+    return np.concatenate(parts)
 
 
 # Global recorder instance
 global_recorder = AudioRecorder()
 
 
-def start_recording() -> None:
-    """Start audio recording."""
-    global_recorder.start_recording()
+def start_recording(on_audio=None) -> None:
+    """Start audio recording (`on_audio` receives its blocks as they are saved)."""
+    global_recorder.start_recording(on_audio)
 
 
 def stop_recording() -> str:
@@ -130,10 +182,13 @@ def stop_recording() -> str:
     return global_recorder.stop_recording()
 
 
-def record_audio(duration: int = 30, sample_rate: int = 16000) -> str:
+def record_audio(
+    duration: int = 30, sample_rate: int = 16000, capture_rate: int | None = None
+) -> str:
     """Legacy function for compatibility.
 
-    Record audio for a specific time.
+    Record audio for a specific time. With `capture_rate` the device records
+    at that rate and the audio is resampled to `sample_rate`.
     """
     logger.info(f"Recording for {duration} seconds...")
 
@@ -151,9 +206,10 @@ def record_audio(duration: int = 30, sample_rate: int = 16000) -> str:
         device = None # Default
 
         # Record audio
+        capture_rate = capture_rate or sample_rate
         audio_data = sd.rec(
-            int(duration * sample_rate),
-            samplerate=sample_rate,
+            int(duration * capture_rate),
+            samplerate=capture_rate,
             channels=1,
             dtype=np.float32,
             device=device,
@@ -162,6 +218,9 @@ def record_audio(duration: int = 30, sample_rate: int = 16000) -> str:
         # Wait for the recording to finish
         sd.wait()
 
+        if capture_rate != sample_rate:
+            audio_data = _resample_blocks([audio_data], capture_rate, sample_rate)
+
         # Verify that something was recorded
         if np.abs(audio_data).max() < 0.01:
             raise RuntimeError("No audio detected. Verify the microphone is working.")
@@ -0,0 +1,175 @@
+# src/audio/resample.py
+
+"""Rational-ratio polyphase resampling in float32.
+
+The signal is conceptually upsampled by `up`, low-pass filtered with a
+Kaiser-windowed sinc and downsampled by `down`, but only the filter taps that
+meet a real input sample are evaluated. Input can be fed in blocks, so long
+recordings are resampled with bounded memory.
+"""
+
+from math import ceil, gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Zero crossings of the sinc on each side of the filter centre
+DEFAULT_ZERO_CROSSINGS = 16
+
+# Kaiser window shape (about 80 dB of stop-band attenuation)
+DEFAULT_BETA = 8.0
+
+# Fraction of the output Nyquist frequency kept by the low-pass filter
+DEFAULT_ROLLOFF = 0.94
+
+# Output samples computed per step (bounds the temporary memory)
+_OUTPUT_STEP = 1 << 14
+
+
+def design_filter(
+    up: int,
+    down: int,
+    zero_crossings: int = DEFAULT_ZERO_CROSSINGS,
+    beta: float = DEFAULT_BETA,
+    rolloff: float = DEFAULT_ROLLOFF,
+) -> np.ndarray:
+    """Return the polyphase filter bank, shape (up, taps per phase).
+
+    Row `p` holds the taps of phase `p` in reverse order, ready to be
+    multiplied with a window of consecutive input samples.
+    """
+    # Cut-off in cycles per sample of the upsampled signal
+    cutoff = rolloff / (2 * max(up, down))
+    taps = max(2, ceil(2 * zero_crossings * max(up, down) / up))
+    length = taps * up
+    centre = length // 2
+
+    offsets = np.arange(length) - centre
+    window = np.kaiser(2 * centre + 1, beta)[:length]
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * offsets) * window
+    # Compensate the energy lost by inserting up - 1 zeros between samples
+    kernel *= up / kernel.sum()
+
+    bank = kernel.reshape(taps, up).T
+    return np.ascontiguousarray(bank[:, ::-1], dtype=np.float32)
+
+
+class PolyphaseResampler:
+    """Streaming resampler from `orig_rate` to `target_rate`.
+
+    Feed blocks with `process()` and call `flush()` after the last one; the
+    concatenated outputs have round-up(n * target / orig) samples and the
+    same alignment as resampling the whole signal at once.
+    """
+
+    def __init__(
+        self,
+        orig_rate: int,
+        target_rate: int,
+        zero_crossings: int = DEFAULT_ZERO_CROSSINGS,
+        beta: float = DEFAULT_BETA,
+    ):
+        """Design the filter for the reduced `target_rate / orig_rate` ratio."""
+        if orig_rate <= 0 or target_rate <= 0:
+            raise ValueError("Sample rates must be positive")
+
+        factor = gcd(int(orig_rate), int(target_rate))
+        self.up = int(target_rate) // factor
+        self.down = int(orig_rate) // factor
+        self.bank = design_filter(self.up, self.down, zero_crossings, beta)
+        self.taps = self.bank.shape[1]
+        self._centre = self.taps * self.up // 2
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous input and start a new signal."""
+        # Leading zeros act as the signal before the first sample
+        self._buffer = np.zeros(self.taps, dtype=np.float32)
+        self._buffer_start = -self.taps
+        self._consumed = 0
+        self._next_output = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample the next block of mono samples."""
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        self._consumed += len(block)
+        self._buffer = np.concatenate((self._buffer, block))
+        return self._drain(self._last_ready_output())
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining output after the last block."""
+        total = ceil(self._consumed * self.up / self.down)
+        # Zeros after the end play the role of the signal after the last sample
+        self._buffer = np.concatenate(
+            (self._buffer, np.zeros(self.taps, dtype=np.float32))
+        )
+        output = self._drain(total - 1)
+        self.reset()
+        return output
+
+    def _last_ready_output(self) -> int:
+        """Index of the last output whose input samples are all buffered."""
+        buffer_end = self._buffer_start + len(self._buffer)
+        return (buffer_end * self.up - 1 - self._centre) // self.down
+
+    def _input_index(self, n):
+        """Absolute index of the newest input sample used by output `n`."""
+        return (n * self.down + self._centre) // self.up
+
+    def _drain(self, last: int) -> np.ndarray:
+        """Compute outputs up to index `last` and drop the input not needed."""
+        first = self._next_output
+        if last < first:
+            return np.zeros(0, dtype=np.float32)
+
+        output = np.empty(last - first + 1, dtype=np.float32)
+        windows = sliding_window_view(self._buffer, self.taps)
+        step = max(_OUTPUT_STEP, self.up * 256)
+        for start in range(first, last + 1, step):
+            stop = min(start + step, last + 1)
+            self._compute(windows, start, stop, output[start - first : stop - first])
+
+        self._next_output = last + 1
+        keep_from = self._input_index(self._next_output) - self.taps + 1
+        drop = max(0, keep_from - self._buffer_start)
+        if drop:
+            self._buffer = self._buffer[drop:]
+            self._buffer_start += drop
+        return output
+
+    def _compute(self, windows, start: int, stop: int, out: np.ndarray) -> None:
+        """Fill `out` with outputs start..stop-1, one matrix product per phase.
+
+        Outputs `up` apart share the same phase and read windows `down` input
+        samples apart, so each phase is a strided view times its taps.
+        """
+        for offset in range(min(self.up, stop - start)):
+            n = start + offset
+            count = len(range(n, stop, self.up))
+            phase = (n * self.down + self._centre) % self.up
+            first = self._input_index(n) - self.taps + 1 - self._buffer_start
+            rows = windows[first : first + (count - 1) * self.down + 1 : self.down]
+            out[offset :: self.up] = rows @ self.bank[phase]
+
+
+def resample(
+    audio: np.ndarray,
+    orig_rate: int,
+    target_rate: int,
+    block_size: int = 1 << 18,
+) -> np.ndarray:
+    """Resample mono audio to `target_rate` and return float32 samples."""
+    if orig_rate == target_rate:
+        return np.asarray(audio, dtype=np.float32)
+
+    resampler = PolyphaseResampler(orig_rate, target_rate)
+    output = np.empty(ceil(len(audio) * resampler.up / resampler.down), np.float32)
+    position = 0
+    for start in range(0, len(audio), block_size):
+        chunk = resampler.process(audio[start : start + block_size])
+        output[position : position + len(chunk)] = chunk
+        position += len(chunk)
+    tail = resampler.flush()
+    output[position : position + len(tail)] = tail
+    return output
@@ -0,0 +1,139 @@
+# src/audio/writer.py
+
+"""Streaming of a recording to disk while it is being captured.
+
+A background thread moves the new frames of the recorder's buffer to a WAV or
+FLAC file about once a second and then releases the pages it has saved, so a
+session of any length keeps only a few seconds of audio in memory. The WAV
+header is rewritten on every flush: if the program dies, the file holds
+everything up to the last second and can be played as is. Stopping only
+writes that last second and closes the file.
+"""
+
+import os
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from logger import get_logger
+
+from .buffer import PagedBuffer
+from .resample import PolyphaseResampler
+
+
+logger = get_logger(__name__)
+
+FORMATS = ("wav", "flac")
+
+# Seconds between two writes of the new audio
+FLUSH_SECONDS = 1.0
+
+
+def get_record_format() -> str:
+    """Return the format of new recordings (AUDIO_APP_RECORD_FORMAT, "wav")."""
+    file_format = os.environ.get("AUDIO_APP_RECORD_FORMAT", "wav").lower()
+    if file_format not in FORMATS:
+        raise ValueError(
+            f"Unsupported recording format {file_format!r}; use one of {FORMATS}"
+        )
+    return file_format
+
+
+class StreamWriter:
+    """Writes the frames of a PagedBuffer to a sound file as they arrive."""
+
+    def __init__(
+        self,
+        buffer: PagedBuffer,
+        path: str,
+        capture_rate: int,
+        sample_rate: int,
+        file_format: str = "wav",
+        flush_seconds: float = FLUSH_SECONDS,
+        on_audio=None,
+    ):
+        """Open the file; `start` begins writing in the background.
+
+        Audio captured at `capture_rate` is resampled to `sample_rate`.
+        Samples outside [-1, 1] are clipped, since the peak of the whole
+        recording is not known while it is written. `on_audio` receives
+        every block written, from the writer thread (e.g. to transcribe it
+        live).
+        """
+        self.buffer = buffer
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self.on_audio = on_audio
+        self.frames = 0
+        self.error = None
+        self._position = 0
+        self._resampler = None
+        if capture_rate != sample_rate:
+            self._resampler = PolyphaseResampler(capture_rate, sample_rate)
+        self._file = sf.SoundFile(
+            path,
+            "w",
+            samplerate=sample_rate,
+            channels=1,
+            format=file_format.upper(),
+        )
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        self._thread.start()
+
+    def finish(self) -> int:
+        """Write the remaining frames, close the file and return its length.
+
+        Raises RuntimeError if writing failed; the file then keeps what was
+        written before the error.
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        try:
+            if self.error is None:
+                self._drain()
+                if self._resampler is not None:
+                    self._write(self._resampler.flush())
+        except Exception as e:
+            self.error = e
+        finally:
+            self._file.close()
+        if self.error is not None:
+            raise RuntimeError(f"Could not write {self.path}: {self.error}")
+        return self.frames
+
+    def _run(self) -> None:
+        """Save the new frames until the recording stops."""
+        try:
+            while not self._stop.wait(self.flush_seconds):
+                self._drain()
+        except Exception as e:
+            logger.exception(f"Error writing {self.path}: {e}")
+            self.error = e
+
+    def _drain(self) -> None:
+        """Write every frame published since the last call and release it."""
+        end = self.buffer.frames
+        if end == self._position:
+            return
+        for page in self.buffer.pages(self._position, end):
+            if self._resampler is not None:
+                page = self._resampler.process(page)
+            self._write(page)
+        self._position = end
+        # Updates the header, so the file is complete up to here
+        self._file.flush()
+        self.buffer.release(end)
+
+    def _write(self, samples: np.ndarray) -> None:
+        """Append samples, clipped to the range of the file."""
+        samples = np.clip(samples, -1.0, 1.0)
+        self._file.write(samples)
+        self.frames += len(samples)
+        if self.on_audio is not None:
+            self.on_audio(samples)
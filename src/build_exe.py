@@ -70,6 +70,9 @@ def main():
         "--hidden-import=pyperclip",
         "--hidden-import=tkinter",
     ]
+    # The packages import their submodules lazily, which PyInstaller cannot see
+    for package in ("audio", "output", "options", "transcription"):
+        cmd += ["--collect-submodules", package]
 
     # Window vs console
     if console_build:
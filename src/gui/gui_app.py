@@ -8,11 +8,17 @@ import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 
-from audio import load_audio, record_audio
-from audio.recorder import AudioRecorder
+from audio import load_audio
 from logger import get_logger
 from output import copy_to_clipboard, save_to_txt
-from transcription import transcribe_audio
+from transcription import LiveTranscriber, iter_revisions, iter_segments
+from transcription.client import daemon_enabled, is_daemon_available
+from transcription.jobqueue import tracked_job
+from transcription.language import get_default_language
+from transcription.resources import apply_plan, interactive_plan
+from transcription.transcriber import PREVIEW_MODEL
+from transcription.warmup import start_warm_up
+from transcription.worker import TranscriptionCancelled
 
 
 logger = get_logger(__name__)
@@ -38,6 +44,9 @@ if src_path not in sys.path:
 
 # Note: the logging/windowed setting to use console mode has been removed.
 
+# Languages offered in the selector ("auto" detects it); any code can be typed
+LANGUAGE_CHOICES = ("auto", "es", "en", "fr", "de", "it", "pt", "ca")
+
 
 class AudioTranscriptionGUI:
     """Main class for the audio transcription graphical interface."""
@@ -54,7 +63,13 @@ class AudioTranscriptionGUI:
         self.recording_duration = tk.IntVar(value=30)
         self.transcription_text = ""
         self.audio_recorder = None
+        self.live_transcriber = None
         self.recording_thread = None
+        self.cancel_event = threading.Event()
+        self.language_var = tk.StringVar(value=get_default_language())
+        self.model_status_var = tk.StringVar(value="")
+        self.preview_var = tk.BooleanVar(value=True)
+        self.live_var = tk.BooleanVar(value=True)
 
         # Set styles
         self.setup_styles()
@@ -186,6 +201,10 @@ class AudioTranscriptionGUI:
         )
         self.stop_button.pack(side="left", padx=5)
 
+        ttk.Checkbutton(
+            self.manual_frame, text="Live text", variable=self.live_var
+        ).pack(side="left", padx=(10, 0))
+
         # Recording status label
         self.recording_status_var = tk.StringVar(value="")
         ttk.Label(
@@ -208,6 +227,8 @@ class AudioTranscriptionGUI:
         self.result_text.grid(
             row=0, column=0, columnspan=2, sticky="nsew", pady=(0, 10)
         )
+        # Preview text, shown until the final model replaces it
+        self.result_text.tag_configure("preview", foreground="gray")
         result_frame.columnconfigure(0, weight=1)
         result_frame.rowconfigure(0, weight=1)
 
@@ -226,6 +247,9 @@ class AudioTranscriptionGUI:
         ttk.Button(button_frame, text="🗑️ Clean", command=self.clear_text).pack(
             side="left", padx=5
         )
+        ttk.Button(
+            button_frame, text="⏹ Cancel", command=self.cancel_transcription
+        ).pack(side="right", padx=5)
 
         # ===== SECTION 4: GENERAL BUTTONS =====
         footer_frame = ttk.Frame(main_frame)
@@ -234,6 +258,21 @@ class AudioTranscriptionGUI:
         ttk.Button(footer_frame, text="ℹ️ About", command=self.show_about).pack(
             side="left", padx=5
         )
+        ttk.Label(footer_frame, text="Language:", style="Info.TLabel").pack(
+            side="left", padx=(20, 5)
+        )
+        ttk.Combobox(
+            footer_frame,
+            textvariable=self.language_var,
+            values=LANGUAGE_CHOICES,
+            width=6,
+        ).pack(side="left")
+        ttk.Checkbutton(
+            footer_frame, text="Quick preview", variable=self.preview_var
+        ).pack(side="left", padx=(10, 0))
+        ttk.Label(
+            footer_frame, textvariable=self.model_status_var, foreground="gray"
+        ).pack(side="left", padx=(20, 5))
         ttk.Button(footer_frame, text="❌ Exit", command=self.on_closing).pack(
             side="right", padx=5
         )
@@ -285,21 +324,26 @@ class AudioTranscriptionGUI:
             # Check if it is MP4
             if self.selected_file.lower().endswith(".mp4"):
                 self.result_text.insert(
-                    tk.END, "Detected MP4 file, converting to WAV...\n"
+                    tk.END, "Detected MP4 file, extracting its audio...\n"
                 )
             else:
                 self.result_text.insert(tk.END, "Loading audio file...\n")
 
             self.result_text.update()
 
-            # Load audio (this will convert MP4 if necessary)
-            audio_preparado = load_audio(self.selected_file)
+            # The job is recorded in the queue with the time of every stage
+            with tracked_job(
+                self.selected_file, language=self.language_var.get()
+            ) as set_stage:
+                # Validate the file (it is decoded in memory when transcribing)
+                audio_preparado = load_audio(self.selected_file)
 
-            self.result_text.insert(tk.END, "Transcribing...\n")
-            self.result_text.update()
+                self.result_text.insert(tk.END, "Transcribing...\n")
+                self.result_text.update()
 
-            # Transcribe
-            self.transcription_text = transcribe_audio(audio_preparado)
+                # Transcribe
+                set_stage("transcribing")
+                self.transcription_text = self._transcribe(audio_preparado)
 
             if self.transcription_text:
                 self.result_text.delete(1.0, tk.END)
@@ -354,7 +398,9 @@ class AudioTranscriptionGUI:
             )
             self.result_text.update()
 
-            # Grabar
+            # Grabar (the recorder loads sounddevice on first use)
+            from audio.recorder import record_audio
+
             audio_grabado = record_audio(duration=duration)
 
             if not audio_grabado:
@@ -369,7 +415,7 @@ class AudioTranscriptionGUI:
 
             # Transcribe
             try:
-                self.transcription_text = transcribe_audio(audio_grabado)
+                self.transcription_text = self._transcribe(audio_grabado)
 
                 if self.transcription_text:
                     self.result_text.delete(1.0, tk.END)
@@ -410,6 +456,104 @@ class AudioTranscriptionGUI:
             self.result_text.config(state="normal")
             self.duration_button.config(state="normal")
 
+    def _transcribe(self, audio_path):
+        """Transcribe the file, showing each segment as it arrives.
+
+        The job runs in the daemon when one is running (its model is already
+        loaded) and in the worker process otherwise; both can be cancelled.
+        With "Quick preview" a fast model shows the text first (see
+        `_transcribe_with_preview`).
+        """
+        self.cancel_event.clear()
+        pieces = []
+        try:
+            if self.preview_var.get():
+                return self._transcribe_with_preview(audio_path)
+            segments = iter_segments(
+                audio_path,
+                language=self.language_var.get(),
+                cancel_event=self.cancel_event,
+            )
+            for segment in segments:
+                if not pieces:
+                    # Replace the "Transcribing..." message with the first text
+                    self.result_text.delete(1.0, tk.END)
+                self.result_text.insert(
+                    tk.END, (" " if pieces else "") + segment.text
+                )
+                self.result_text.see(tk.END)
+                self.result_text.update()
+                pieces.append(segment.text)
+        except TranscriptionCancelled:
+            raise TranscriptionCancelled(
+                "Transcription cancelled by the user"
+            ) from None
+        return " ".join(pieces) or None
+
+    def _transcribe_with_preview(self, audio_path):
+        """Show a quick preview and replace it window by window with the final text.
+
+        The preview (in gray) comes from a small model; the requested model
+        then decodes the same windows and its text replaces the preview of
+        each one as soon as it is ready. Returns the final text.
+        """
+        revisions = {}
+        for revision in iter_revisions(
+            audio_path,
+            language=self.language_var.get(),
+            cancel_event=self.cancel_event,
+        ):
+            revisions[revision.window] = revision
+            self._show_revisions(revisions)
+
+        texts = [
+            " ".join(segment.text for segment in revisions[window].segments)
+            for window in sorted(revisions)
+        ]
+        return " ".join(text for text in texts if text) or None
+
+    def _show_revisions(self, revisions):
+        """Show the latest text of every window, the preview ones in gray."""
+        self.result_text.delete(1.0, tk.END)
+        first = True
+        for window in sorted(revisions):
+            revision = revisions[window]
+            text = " ".join(segment.text for segment in revision.segments)
+            if not text:
+                continue
+            if not first:
+                self.result_text.insert(tk.END, " ")
+            tags = () if revision.final else ("preview",)
+            self.result_text.insert(tk.END, text, tags)
+            first = False
+        self.result_text.see(tk.END)
+        self.result_text.update()
+
+    def start_warm_up(self):
+        """Load the model in the background, showing when it is ready."""
+        # A running daemon already has its models loaded and takes the jobs
+        if daemon_enabled() and is_daemon_available():
+            self.model_status_var.set("Model ready (daemon)")
+            return
+        preview_model = PREVIEW_MODEL if self.preview_var.get() else None
+        if (
+            start_warm_up(on_done=self._warm_up_done, preview_model=preview_model)
+            is not None
+        ):
+            self.model_status_var.set("Loading model...")
+
+    def _warm_up_done(self, seconds, error):
+        """Show the result of the model warm-up."""
+        if error is None:
+            self.model_status_var.set(f"Model ready ({seconds:.0f}s)")
+        else:
+            self.model_status_var.set("Model not preloaded")
+
+    def cancel_transcription(self):
+        """Cancel the transcription in progress, freeing its CPU and memory."""
+        self.cancel_event.set()
+        self.recording_status_var.set("Transcription cancelled")
+
     def copy_to_clipboard(self):
         """Copy the transcribed text to the clipboard."""
         text = self.result_text.get(1.0, tk.END).strip()
@@ -512,7 +656,9 @@ Technologies:
             )
             self.result_text.update()
 
-            # Grabar
+            # Grabar (the recorder loads sounddevice on first use)
+            from audio.recorder import record_audio
+
             audio_grabado = record_audio(duration=duration)
 
             if not audio_grabado:
@@ -527,7 +673,7 @@ Technologies:
 
             # Transcribe
             try:
-                self.transcription_text = transcribe_audio(audio_grabado)
+                self.transcription_text = self._transcribe(audio_grabado)
 
                 if self.transcription_text:
                     self.result_text.delete(1.0, tk.END)
@@ -570,8 +716,19 @@ Technologies:
 
     def start_recording_manual(self):
         """Start manual recording (no time limit)."""
+        # Imported here: sounddevice initializes PortAudio when it is loaded
+        from audio.recorder import AudioRecorder
+
         self.audio_recorder = AudioRecorder()
-        self.audio_recorder.start_recording()
+        on_audio = None
+        if self.live_var.get():
+            # The text is shown while recording and is final right after STOP
+            self.live_transcriber = LiveTranscriber(
+                language=self.language_var.get(), on_update=self._show_live
+            )
+            self.live_transcriber.start()
+            on_audio = self.live_transcriber.feed
+        self.audio_recorder.start_recording(on_audio)
 
         self.start_button.config(state="disabled")
         self.stop_button.config(state="normal")
@@ -601,8 +758,11 @@ Technologies:
         # Stop recording
         audio_grabado = self.audio_recorder.stop_recording()
         self.audio_recorder = None
+        live, self.live_transcriber = self.live_transcriber, None
 
         if not audio_grabado:
+            if live is not None:
+                live.finish()
             messagebox.showerror(
                 "Error", "Error during recording. No audio was captured."
             )
@@ -610,13 +770,56 @@ Technologies:
             return
 
         #Transcribe to a separate thread (NOT daemon so it terminates completely)
-        thread = threading.Thread(
-            target=self._transcribe_manual_recording,
-            args=(audio_grabado,),
-            daemon=False,
-        )
+        if live is not None:
+            target, args = self._finish_live_recording, (live,)
+        else:
+            target, args = self._transcribe_manual_recording, (audio_grabado,)
+        thread = threading.Thread(target=target, args=args, daemon=False)
         thread.start()
 
+    def _show_live(self, update):
+        """Show the committed text of a live transcription and, in gray, the rest."""
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, update.committed)
+        if update.tentative:
+            if update.committed:
+                self.result_text.insert(tk.END, " ")
+            self.result_text.insert(tk.END, update.tentative, ("preview",))
+        self.result_text.see(tk.END)
+        if self.audio_recorder is not None:
+            self.recording_status_var.set(
+                f"Recording... (text {update.lag:.0f}s behind, press STOP to finish)"
+            )
+
+    def _finish_live_recording(self, live):
+        """Wait for the last window of a live transcription and show the text."""
+        try:
+            self.transcription_text = live.finish()
+            self.result_text.delete(1.0, tk.END)
+            if self.transcription_text:
+                self.result_text.insert(tk.END, self.transcription_text)
+                messagebox.showinfo(
+                    "Success", "Recording and transcription completed"
+                )
+            else:
+                self.result_text.insert(
+                    tk.END,
+                    "The recorded audio could not be transcribed." \
+                    "Make sure you have spoken clearly.",
+                )
+                messagebox.showerror(
+                    "Error",
+                    "Could not obtain transcription of the recorded audio.",
+                )
+        except Exception as e:
+            error_msg = f"Error transcribing audio:\n{str(e)}"
+            self.result_text.delete(1.0, tk.END)
+            self.result_text.insert(tk.END, error_msg)
+            messagebox.showerror("Transcription Error", error_msg)
+            logger.exception(f"Error in live transcription: {e}")
+        finally:
+            self.recording_status_var.set("")
+
     def _transcribe_manual_recording(self, audio_path):
         """Transcribe recorded audio manually."""
         try:
@@ -627,7 +830,7 @@ Technologies:
 
             # Transcribe
             try:
-                self.transcription_text = transcribe_audio(audio_path)
+                self.transcription_text = self._transcribe(audio_path)
 
                 if self.transcription_text:
                     self.result_text.delete(1.0, tk.END)
@@ -685,15 +888,14 @@ Technologies:
 
     def on_closing(self):
         """Handle application closure."""
-        # Stop any recording in progress
-        if (
-            hasattr(self, "audio_recorder")
-            and self.audio_recorder
-            and self.audio_recorder.is_recording
-        ):
-            self.audio_recorder.is_recording = False
-            if self.audio_recorder.thread:
-                self.audio_recorder.thread.join(timeout=1)
+        # Stop any recording in progress; its file is closed and kept
+        if hasattr(self, "audio_recorder") and self.audio_recorder:
+            self.audio_recorder.stop_recording()
+        if self.live_transcriber is not None:
+            self.live_transcriber.cancel()
+
+        # Kill any transcription still running in the worker process
+        self.cancel_event.set()
 
         # Close the application
         self.root.quit()
@@ -702,8 +904,11 @@ Technologies:
 
 def main():
     """Start the GUI."""
+    # Inference runs in the worker process; keep the cores for it
+    apply_plan(interactive_plan())
     root = tk.Tk()
-    AudioTranscriptionGUI(root)
+    gui = AudioTranscriptionGUI(root)
+    gui.start_warm_up()
     root.mainloop()
 
 
@@ -0,0 +1,34 @@
+"""Public names of a package imported on first use (PEP 562).
+
+Usage, in a package's __init__:
+    _EXPORTS = {"name": ".submodule"}
+    __all__ = sorted(_EXPORTS)
+    __getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+"""
+
+import importlib
+import sys
+from collections.abc import Callable
+
+
+def lazy_exports(package: str, exports: dict) -> tuple[Callable, Callable]:
+    """Return the module `__getattr__` and `__dir__` of `package`.
+
+    `exports` maps every public name to the (relative) submodule that defines
+    it; the submodule is imported when the name is first accessed and the
+    value is then cached in the package.
+    """
+
+    def __getattr__(name: str):
+        """Import the submodule that defines a public name on first access."""
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(exports[name], package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list:
+        """List the public names along with the ones already imported."""
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -1,15 +1,54 @@
 """Main module for audio automation."""
 
+import argparse
+import os
+
 from logger import get_logger, setup_logging
-from options import option_1_transcribe_file, option_2_record_and_transcribe
+from transcription.backends import available_backends
+from transcription.client import daemon_enabled, is_daemon_available
+from transcription.model_registry import SUPPORTED_DTYPES
+from transcription.resources import apply_plan, interactive_plan
+from transcription.warmup import start_warm_up
 
 
 setup_logging()
 logger = get_logger(__name__)
 
 
-def main():
+def main(argv: list | None = None):
     """Display the menu and handles user options."""
+    parser = argparse.ArgumentParser(description="Audio transcription console")
+    parser.add_argument(
+        "--language",
+        help='Language of the audio (e.g. "es", "en") or "auto" to detect it',
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=SUPPORTED_DTYPES,
+        help="Model precision (int8: quantized, faster on CPU)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=available_backends(),
+        help="Inference engine (ctranslate2: faster on CPU)",
+    )
+    parser.add_argument(
+        "--vad", action="store_true", help="Skip the silence before transcribing"
+    )
+    args = parser.parse_args(argv)
+    if args.dtype:
+        # Read by the transcription worker process when it loads the model
+        os.environ["AUDIO_APP_MODEL_DTYPE"] = args.dtype
+    if args.backend:
+        os.environ["AUDIO_APP_BACKEND"] = args.backend
+    if args.vad:
+        os.environ["AUDIO_APP_VAD"] = "1"
+    # Inference runs in the worker process; keep the cores for it
+    apply_plan(interactive_plan())
+    # Load the model while the user chooses (a running daemon is already warm)
+    if not (daemon_enabled() and is_daemon_available()):
+        start_warm_up()
+
     logger.info("=" * 50)
     logger.info("AUDIO AUTOMATION -TRANSCRIPTION")
     logger.info("=" * 50)
@@ -22,10 +61,15 @@ def main():
 
         opcion = input("\nOption (1/2/3): ").strip()
 
+        # The options (and the recorder) are imported when first chosen
         if opcion == "1":
-            option_1_transcribe_file()
+            from options import option_1_transcribe_file
+
+            option_1_transcribe_file(args.language)
         elif opcion == "2":
-            option_2_record_and_transcribe()
+            from options import option_2_record_and_transcribe
+
+            option_2_record_and_transcribe(args.language)
         elif opcion == "3":
             logger.info("\nSee you later!")
             break
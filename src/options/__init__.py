@@ -1,7 +1,18 @@
-"""Package for the management of user settings and options."""
+"""Package for the management of user settings and options.
 
-from .option1 import option_1_transcribe_file
-from .option2 import option_2_record_and_transcribe
+Each option is imported when it is first used, together with what it needs
+(option 2 needs the recorder).
+"""
 
+from lazy_exports import lazy_exports
 
-__all__ = ["option_1_transcribe_file", "option_2_record_and_transcribe"]
\ No newline at end of file
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "option_1_transcribe_file": ".option1",
+    "option_2_record_and_transcribe": ".option2",
+}
+
+__all__ = sorted(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
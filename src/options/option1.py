@@ -13,8 +13,11 @@ from transcription import transcribe_audio
 logger = get_logger(__name__)
 
 
-def option_1_transcribe_file():
-    """Transcribes an existing audio file."""
+def option_1_transcribe_file(language: str | None = None):
+    """Transcribes an existing audio file.
+
+    `language` overrides the default language ("auto" detects it).
+    """
     logger.info("\n=== OPTION 1: Transcribe File ===")
     file_path = input("Enter the path to the audio file: ").strip()
 
@@ -25,8 +28,13 @@ def option_1_transcribe_file():
     # Load and prepare audio
     prepared_audio = load_audio(file_path)
 
-    # Transcribe
-    text = transcribe_audio(prepared_audio)
+    # Transcribe in the worker process so that Ctrl+C cancels the job
+    logger.info("Transcribing... (press Ctrl+C to cancel)")
+    try:
+        text = transcribe_audio(prepared_audio, language=language, isolated=True)
+    except KeyboardInterrupt:
+        logger.warning("Transcription cancelled.")
+        return
     if not text:
         logger.error("Error during transcription.")
         return
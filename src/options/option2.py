@@ -7,7 +7,7 @@ import threading
 from audio import record_audio, start_recording, stop_recording
 from logger import get_logger
 from output import copy_to_clipboard, save_to_txt
-from transcription import transcribe_audio
+from transcription import LiveTranscriber, transcribe_audio
 
 
 logger = get_logger(__name__)
@@ -20,13 +20,16 @@ def _record_by_time(duration: int) -> str:
     return recorded_audio
 
 
-def _record_interactive() -> str:
-    """Record audio with start/stop control via terminal input."""
+def _record_interactive(on_audio=None) -> str:
+    """Record audio with start/stop control via terminal input.
+
+    `on_audio` receives the recorded blocks while recording.
+    """
     logger.info("\n--- INTERACTIVE RECORDING MODE ---")
     logger.info("Press ENTER or type 'stop' to stop recording")
     logger.info("Starting recording now...\n")
     
-    start_recording()
+    start_recording(on_audio)
     
     # Wait for user input in a thread to not block recording
     stop_event = threading.Event()
@@ -50,12 +53,37 @@ def _record_interactive() -> str:
     return recorded_audio
 
 
-def option_2_record_and_transcribe():
-    """Record audio in real time and transcribes it."""
+def _record_live(language: str | None = None) -> str | None:
+    """Record with start/stop control, printing the text while the user talks.
+
+    Returns the transcript, which is complete a moment after stopping.
+    """
+    def show(update):
+        if update.segments:
+            logger.info(" ".join(segment.text for segment in update.segments))
+
+    live = LiveTranscriber(language=language, on_update=show)
+    live.start()
+    recorded_audio = _record_interactive(live.feed)
+    if not recorded_audio:
+        live.cancel()
+        return None
+    logger.info("Finishing the transcription...")
+    return live.finish()
+
+
+def option_2_record_and_transcribe(language: str | None = None):
+    """Record audio in real time and transcribes it.
+
+    `language` overrides the default language ("auto" detects it).
+    """
     logger.info("\n=== OPTION 2: Record and Transcribe ===")
 
     # Ask for recording mode
-    mode = input("\nRecording mode:\n  1 = By time (seconds)\n  2 = Start/Stop control\nChoose (1 or 2): ").strip()
+    mode = input(
+        "\nRecording mode:\n  1 = By time (seconds)\n  2 = Start/Stop control\n"
+        "  3 = Start/Stop with live transcription\nChoose (1, 2 or 3): "
+    ).strip()
 
     recorded_audio = None
 
@@ -75,16 +103,30 @@ def option_2_record_and_transcribe():
         # Interactive start/stop
         recorded_audio = _record_interactive()
 
+    elif mode == "3":
+        # The text is printed while recording; no transcription after STOP
+        try:
+            text = _record_live(language)
+        except RuntimeError as e:
+            logger.error(str(e))
+            return
+
     else:
         logger.warning("Invalid mode selected.")
         return
 
-    if not recorded_audio:
-        logger.error("Error during recording.")
-        return
+    if mode != "3":
+        if not recorded_audio:
+            logger.error("Error during recording.")
+            return
 
-    # Transcribe
-    text = transcribe_audio(recorded_audio)
+        # Transcribe in the worker process so that Ctrl+C cancels the job
+        logger.info("Transcribing... (press Ctrl+C to cancel)")
+        try:
+            text = transcribe_audio(recorded_audio, language=language, isolated=True)
+        except KeyboardInterrupt:
+            logger.warning("Transcription cancelled.")
+            return
     if not text:
         logger.error("Error during transcription.")
         return
@@ -1,7 +1,17 @@
-"""Package to manage the output of transcripts."""
+"""Package to manage the output of transcripts.
 
-from .clipboard import copy_to_clipboard
-from .text_file import save_to_txt
+`copy_to_clipboard` (and with it pyperclip) is imported on first use.
+"""
 
+from lazy_exports import lazy_exports
 
-__all__ = ["copy_to_clipboard", "save_to_txt"]
\ No newline at end of file
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "copy_to_clipboard": ".clipboard",
+    "save_to_txt": ".text_file",
+}
+
+__all__ = sorted(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -7,4 +7,4 @@ import pyperclip
 
 def copy_to_clipboard(text):
     """Copy the text to the clipboard."""
-    pyperclip.copy(text)
\ No newline at end of file
+    pyperclip.copy(text)
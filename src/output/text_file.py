@@ -5,4 +5,4 @@
 def save_to_txt(text, filename="transcripcion.txt"):
     """Save the transcribed text in a text file."""
     with open(filename, "w", encoding="utf-8") as f:
-        f.write(text)
\ No newline at end of file
+        f.write(text)
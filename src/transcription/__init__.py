@@ -1,6 +1,26 @@
-"""Package responsible for speech-to-text transcription logic with Whisper."""
+"""Package responsible for speech-to-text transcription logic with Whisper.
 
-from .transcriber import transcribe_audio
+The public names are imported on first use (PEP 562), so that importing the
+package or one of its light submodules (resources, client...) does not load
+the transcriber. Whisper and torch are only imported when a model is loaded.
+"""
 
+from lazy_exports import lazy_exports
 
-__all__ = ["transcribe_audio"]
\ No newline at end of file
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "LiveTranscriber": ".live",
+    "LiveUpdate": ".live",
+    "Revision": ".segments",
+    "Segment": ".segments",
+    "acquire_model": ".model_registry",
+    "get_model_stats": ".model_registry",
+    "iter_revisions": ".transcriber",
+    "iter_segments": ".transcriber",
+    "transcribe_audio": ".transcriber",
+}
+
+__all__ = sorted(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
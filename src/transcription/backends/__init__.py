@@ -0,0 +1,58 @@
+"""Inference backends that run the Whisper models.
+
+A backend loads models, transcribes samples and detects their language. The
+transcriber only talks to this interface, so the engine can be chosen per job
+(`backend="ctranslate2"`) or for every job with AUDIO_APP_BACKEND.
+"""
+
+import os
+
+from .base import TranscriptionBackend
+from .ctranslate2_backend import CTranslate2Backend
+from .whisper_backend import WhisperBackend
+
+
+DEFAULT_BACKEND = "whisper"
+
+_backends = {
+    WhisperBackend.name: WhisperBackend(),
+    CTranslate2Backend.name: CTranslate2Backend(),
+}
+
+
+def get_default_backend() -> str:
+    """Return the backend used when a job does not choose one."""
+    name = os.environ.get("AUDIO_APP_BACKEND", DEFAULT_BACKEND).strip().lower()
+    return name or DEFAULT_BACKEND
+
+
+def get_backend(name: str | None = None) -> TranscriptionBackend:
+    """Return a backend by name (None for the default one)."""
+    name = name or get_default_backend()
+    backend = _backends.get(name)
+    if backend is None:
+        raise ValueError(
+            f"Unknown transcription backend: {name} "
+            f"(available: {', '.join(available_backends())})"
+        )
+    return backend
+
+
+def register_backend(backend: TranscriptionBackend) -> None:
+    """Add a backend, or replace the one with the same name."""
+    _backends[backend.name] = backend
+
+
+def available_backends() -> list:
+    """Return the names of the registered backends."""
+    return sorted(_backends)
+
+
+__all__ = [
+    "DEFAULT_BACKEND",
+    "TranscriptionBackend",
+    "available_backends",
+    "get_backend",
+    "get_default_backend",
+    "register_backend",
+]
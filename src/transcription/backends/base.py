@@ -0,0 +1,45 @@
+# src/transcription/backends/base.py
+
+"""Interface shared by every inference backend."""
+
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+
+
+@runtime_checkable
+class TranscriptionBackend(Protocol):
+    """Speech-to-text engine that runs Whisper models.
+
+    The registry keeps whatever `load` returns and hands it back to
+    `transcribe` and `detect_language`, so each backend chooses its own model
+    object.
+    """
+
+    name: str
+
+    def load(self, model: str, device: str | None, dtype: str):
+        """Load a model by name (tiny, base, small...) or local path."""
+        ...
+
+    def model_bytes(self, loaded) -> int:
+        """Estimate the memory used by a loaded model."""
+        ...
+
+    def transcribe(self, loaded, audio: np.ndarray, **options) -> dict:
+        """Transcribe 16 kHz mono samples.
+
+        `options` are Whisper decoding options (language, initial_prompt...).
+        Returns a Whisper-style result: {"text", "segments", "language"}, where
+        every segment is a dict with text, start, end and avg_logprob.
+
+        A `deadline` option, when given, is a `time.monotonic()` value: the
+        decode must stop with `TranscriptionTimeout` as soon as it can tell
+        that the deadline passed. Likewise a `cancel_event` option (a
+        `threading.Event`) stops it with `TranscriptionCancelled` once set.
+        """
+        ...
+
+    def detect_language(self, loaded, audio: np.ndarray) -> tuple:
+        """Return (language code, probability) for one 30-second window."""
+        ...
@@ -0,0 +1,134 @@
+# src/transcription/backends/ctranslate2_backend.py
+
+"""CPU-optimized backend: Whisper converted to CTranslate2 (`faster-whisper`).
+
+CTranslate2 runs the encoder and decoder with fused int8/float kernels and a
+C++ beam search, which is usually several times faster than PyTorch on CPU
+and needs less memory. It is an optional dependency:
+
+    pip install "audio-transcription[ctranslate2]"
+
+and it is only imported when a model is loaded.
+
+Models are the CTranslate2 conversions of the Whisper checkpoints, downloaded
+on first use (the same names: tiny, base, small...) or a local folder.
+"""
+
+import os
+import time
+
+import numpy as np
+
+from logger import get_logger
+
+from ..resources import get_current_plan
+from ..worker import TranscriptionCancelled, TranscriptionTimeout
+
+
+logger = get_logger(__name__)
+
+# Whisper options that have no CTranslate2 counterpart
+_IGNORED_OPTIONS = ("verbose", "fp16")
+
+
+def _import_faster_whisper():
+    """Import `faster_whisper` on first use, with a clear error if missing."""
+    try:
+        import faster_whisper
+    except ImportError as e:
+        raise RuntimeError(
+            "The ctranslate2 backend needs faster-whisper: pip install faster-whisper"
+        ) from e
+    return faster_whisper
+
+
+class CTranslate2Model:
+    """A loaded `faster_whisper.WhisperModel` and the size of its weights."""
+
+    def __init__(self, model, size: int):
+        """Keep the model and its size in bytes."""
+        self.model = model
+        self.size = size
+
+
+class CTranslate2Backend:
+    """Backend that runs Whisper models converted to CTranslate2."""
+
+    name = "ctranslate2"
+
+    def load(self, model: str, device: str | None, dtype: str) -> CTranslate2Model:
+        """Download (once) and load the CTranslate2 conversion of a model."""
+        faster_whisper = _import_faster_whisper()
+        path = model if os.path.isdir(model) else faster_whisper.download_model(model)
+        # 0 lets CTranslate2 choose (OMP_NUM_THREADS or 4)
+        plan = get_current_plan()
+        whisper_model = faster_whisper.WhisperModel(
+            path,
+            device=device or "auto",
+            compute_type=dtype,
+            cpu_threads=plan.intra_op_threads if plan else 0,
+        )
+        return CTranslate2Model(whisper_model, _folder_bytes(path))
+
+    def model_bytes(self, loaded: CTranslate2Model) -> int:
+        """Return the size of the model files (the weights held in memory)."""
+        return loaded.size
+
+    def transcribe(
+        self,
+        loaded: CTranslate2Model,
+        audio: np.ndarray,
+        deadline: float | None = None,
+        cancel_event=None,
+        **options,
+    ) -> dict:
+        """Transcribe samples, decoding greedily like `whisper.transcribe`.
+
+        faster-whisper decodes lazily, segment by segment, so a `deadline` and
+        a `cancel_event` are checked after every segment.
+        """
+        for option in _IGNORED_OPTIONS:
+            options.pop(option, None)
+        # faster-whisper defaults to beam search; Whisper's transcribe does not
+        options.setdefault("beam_size", 1)
+
+        raw_segments, info = loaded.model.transcribe(
+            audio.astype(np.float32, copy=False), **options
+        )
+        segments = []
+        for segment in raw_segments:
+            segments.append(
+                {
+                    "text": segment.text,
+                    "start": segment.start,
+                    "end": segment.end,
+                    "avg_logprob": segment.avg_logprob,
+                }
+            )
+            if cancel_event is not None and cancel_event.is_set():
+                raise TranscriptionCancelled("Transcription cancelled")
+            if deadline is not None and time.monotonic() > deadline:
+                raise TranscriptionTimeout("The decode exceeded its deadline")
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
+    def detect_language(self, loaded: CTranslate2Model, audio: np.ndarray) -> tuple:
+        """Return (language, probability) from one Whisper window."""
+        if not loaded.model.model.is_multilingual:
+            return "en", 1.0
+        language, probability, _ = loaded.model.detect_language(
+            audio.astype(np.float32, copy=False)
+        )
+        return language, float(probability)
+
+
+def _folder_bytes(path: str) -> int:
+    """Total size of the files of a model folder."""
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
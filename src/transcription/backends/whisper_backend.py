@@ -0,0 +1,111 @@
+# src/transcription/backends/whisper_backend.py
+
+"""Default backend: the PyTorch implementation of `openai-whisper`.
+
+`whisper` (and with it torch) is imported when a model is first loaded, so
+importing the backends does not cost the seconds that torch takes to load.
+"""
+
+import time
+
+import numpy as np
+
+from ..worker import TranscriptionCancelled, TranscriptionTimeout
+
+
+class WhisperBackend:
+    """Backend that runs `openai-whisper` models (float32, float16 or int8)."""
+
+    name = "whisper"
+
+    def load(self, model: str, device: str | None, dtype: str):
+        """Load a Whisper model from disk with the requested device and dtype."""
+        import whisper
+
+        from ..resources import configure_torch
+
+        # Size the thread pools of torch now that it is loaded
+        configure_torch()
+        if dtype == "int8":
+            if device not in (None, "cpu"):
+                raise ValueError("int8 models only run on the CPU")
+            from ..quantize import load_quantized_model
+
+            return load_quantized_model(model)
+
+        if device is None:
+            loaded = whisper.load_model(model)
+        else:
+            loaded = whisper.load_model(model, device=device)
+
+        if dtype == "float16":
+            loaded = loaded.half()
+
+        return loaded
+
+    def model_bytes(self, loaded) -> int:
+        """Estimate the memory used by the parameters and buffers of a model."""
+        total = 0
+        for attr in ("parameters", "buffers"):
+            tensors = getattr(loaded, attr, None)
+            if tensors is None:
+                continue
+            for tensor in tensors():
+                total += tensor.numel() * tensor.element_size()
+
+        # The packed weights of quantized layers are neither parameters nor buffers
+        modules = getattr(loaded, "modules", None)
+        for module in modules() if modules is not None else ():
+            # Count the leaf that holds them, not also the layer that wraps it
+            weight_bias = getattr(module, "_weight_bias", None)
+            if weight_bias is None or next(module.children(), None) is not None:
+                continue
+            for tensor in weight_bias():
+                if tensor is not None:
+                    total += tensor.numel() * tensor.element_size()
+        return total
+
+    def transcribe(
+        self,
+        loaded,
+        audio: np.ndarray,
+        deadline: float | None = None,
+        cancel_event=None,
+        **options,
+    ) -> dict:
+        """Transcribe samples with `model.transcribe`.
+
+        A `deadline` and a `cancel_event` are checked before every step of the
+        decoder, so a decode that exceeds the deadline or is cancelled stops
+        at the next token and frees the model.
+        """
+        decoder = getattr(loaded, "decoder", None)
+        if (deadline is None and cancel_event is None) or decoder is None:
+            return loaded.transcribe(audio, verbose=False, **options)
+
+        def check_deadline(module, args):
+            if cancel_event is not None and cancel_event.is_set():
+                raise TranscriptionCancelled("Transcription cancelled")
+            if deadline is not None and time.monotonic() > deadline:
+                raise TranscriptionTimeout("The decode exceeded its deadline")
+
+        hook = decoder.register_forward_pre_hook(check_deadline)
+        try:
+            return loaded.transcribe(audio, verbose=False, **options)
+        finally:
+            hook.remove()
+
+    def detect_language(self, loaded, audio: np.ndarray) -> tuple:
+        """Return (language, probability) from one Whisper window."""
+        if not loaded.is_multilingual:
+            return "en", 1.0
+
+        import whisper
+
+        parameter = next(loaded.parameters())
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio), loaded.dims.n_mels
+        ).to(device=parameter.device, dtype=parameter.dtype)
+        _, probabilities = loaded.detect_language(mel)
+        language = max(probabilities, key=probabilities.get)
+        return language, float(probabilities[language])
@@ -0,0 +1,167 @@
+# src/transcription/backpressure.py
+
+"""Keeping live transcription in step with the recording.
+
+A live transcription falls behind when decoding a second of audio takes more
+than a second: the audio waiting to be decoded, and the delay of the text,
+then grow for as long as the user talks. `LagController` watches two
+signals after every decode: the lag (seconds of captured audio not committed
+as text yet) and the real-time factor (decode time per second of new audio,
+as a moving average). When the lag or the factor cross their thresholds it
+moves one level down a ladder of cheaper settings:
+
+1. skip the silences found by voice activity detection,
+2. greedy decoding, without the temperature fallback,
+3. longer windows decoded less often,
+4. each smaller model in turn.
+
+The first levels barely change the text; smaller models are the last resort.
+When the load drops (the factor stays low for a while) it climbs back one
+level at a time.
+"""
+
+from typing import NamedTuple
+
+from logger import get_logger
+
+from .scheduler import PROFILE_OPTIONS, candidate_models
+
+
+logger = get_logger(__name__)
+
+# Lag beyond the window length that means the decoder is falling behind
+LAG_MARGIN_SECONDS = 3.0
+
+# Real-time factor above which the decoder cannot keep up
+DEGRADE_RTF = 1.0
+
+# Real-time factor below which the previous level is tried again
+RECOVER_RTF = 0.5
+
+# Decodes to wait after a change before degrading again (the new level is
+# measured first) and decodes with a low factor before recovering
+SETTLE_STEPS = 3
+RECOVER_STEPS = 10
+
+# Weight of the newest decode in the moving real-time factor
+RTF_WEIGHT = 0.3
+
+# How much longer windows and steps become on the third level
+LONG_WINDOW_FACTOR = 2.0
+LONG_STEP_FACTOR = 3.0
+
+
+class LiveSettings(NamedTuple):
+    """How a live transcription decodes at one level of the ladder."""
+
+    model: str
+    profile: str
+    window_seconds: float
+    step_seconds: float
+    vad: bool
+
+    @property
+    def options(self) -> dict:
+        """Decoding options of the profile."""
+        return dict(PROFILE_OPTIONS.get(self.profile, {}))
+
+
+def degradation_levels(
+    model: str, window_seconds: float, step_seconds: float
+) -> list:
+    """Return the settings of every level, from the requested ones down."""
+    levels = [LiveSettings(model, "default", window_seconds, step_seconds, False)]
+    levels.append(levels[-1]._replace(vad=True))
+    levels.append(levels[-1]._replace(profile="greedy"))
+    levels.append(
+        levels[-1]._replace(
+            window_seconds=window_seconds * LONG_WINDOW_FACTOR,
+            step_seconds=step_seconds * LONG_STEP_FACTOR,
+        )
+    )
+    for smaller in candidate_models(model)[1:]:
+        levels.append(levels[-1]._replace(model=smaller))
+    return levels
+
+
+class LagController:
+    """Chooses the level of a live transcription from its lag and speed."""
+
+    def __init__(self, levels: list):
+        """Start at the first (most accurate) of `levels`."""
+        self.levels = levels
+        self.level = 0
+        self.lag = 0.0
+        self.rtf = None
+        self.changes = 0
+        self._steps = 0
+        self._fast_steps = 0
+        # Lag when the level was chosen: a level that reduces it is enough
+        self._start_lag = 0.0
+
+    @property
+    def settings(self) -> LiveSettings:
+        """Settings of the current level."""
+        return self.levels[self.level]
+
+    def observe(
+        self, lag: float, decode_seconds: float | None, audio_seconds: float
+    ) -> LiveSettings | None:
+        """Record one decode and return the new settings if the level changes.
+
+        `decode_seconds` is None when the decode also loaded its model; only
+        the lag counts then.
+        """
+        self.lag = lag
+        self._steps += 1
+        if decode_seconds is not None and audio_seconds > 0:
+            rtf = decode_seconds / audio_seconds
+            if self.rtf is None:
+                self.rtf = rtf
+            else:
+                self.rtf += RTF_WEIGHT * (rtf - self.rtf)
+
+        window = self.settings.window_seconds
+        growing = lag > window + LAG_MARGIN_SECONDS and lag >= self._start_lag
+        behind = growing or (self.rtf is not None and self.rtf > DEGRADE_RTF)
+        fast = self.rtf is not None and self.rtf < RECOVER_RTF and lag <= window
+        self._fast_steps = self._fast_steps + 1 if fast else 0
+
+        if behind and self._steps >= SETTLE_STEPS:
+            return self._move(+1, "behind")
+        if self._fast_steps >= RECOVER_STEPS:
+            return self._move(-1, "ahead")
+        return None
+
+    def metrics(self) -> dict:
+        """Return the current lag, real-time factor and settings."""
+        return {
+            "lag": self.lag,
+            "rtf": self.rtf,
+            "level": self.level,
+            "levels": len(self.levels),
+            "changes": self.changes,
+            **self.settings._asdict(),
+        }
+
+    def _move(self, direction: int, reason: str) -> LiveSettings | None:
+        """Go one level down (+1) or up (-1), if there is one."""
+        level = self.level + direction
+        if not 0 <= level < len(self.levels):
+            return None
+        rtf = "n/a" if self.rtf is None else f"{self.rtf:.2f}"
+        # The new level is measured from scratch
+        self.level = level
+        self.changes += 1
+        self._steps = 0
+        self._fast_steps = 0
+        self._start_lag = self.lag
+        self.rtf = None
+        settings = self.settings
+        logger.info(
+            f"Live transcription {reason} (lag {self.lag:.1f}s, rtf {rtf}): "
+            f"level {level}, {settings.model} {settings.profile}, "
+            f"{settings.window_seconds:.0f}s windows"
+            + (", skipping silences" if settings.vad else "")
+        )
+        return settings
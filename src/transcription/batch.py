@@ -0,0 +1,421 @@
+# src/transcription/batch.py
+
+"""Parallel batch transcription of folders and glob patterns.
+
+Usage (from the `src` folder):
+    python -m transcription.batch recordings/ "calls/**/*.mp3" --workers 4
+    python -m transcription.batch recordings/ --output-dir transcripts/
+    python -m transcription.batch
+
+Each worker process keeps its own warm model and gets its share of the cores
+from `resources.plan_threads`, so that the workers together do not
+oversubscribe the CPU. Files go through the durable job queue, so a run that
+is killed halfway is continued by the next one.
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import NamedTuple
+
+from audio.decoder import SAMPLE_RATE, decode_audio
+from audio.loader import SUPPORTED_EXTENSIONS
+from logger import get_logger
+from output import save_to_txt
+
+from .backends import available_backends
+from .jobqueue import ACTIVE_STATES, Job, JobQueue, worker_id
+from .model_registry import SUPPORTED_DTYPES, global_registry
+from .resources import (
+    apply_plan,
+    available_cpus,
+    claim_slot,
+    plan_environment,
+    plan_threads,
+)
+from .transcriber import transcribe_audio
+
+
+logger = get_logger(__name__)
+
+# Queue of the job database used by batch runs
+QUEUE = "batch"
+
+
+class BatchResult(NamedTuple):
+    """Outcome of a single file of a batch."""
+
+    audio_path: str
+    output_path: str | None
+    audio_seconds: float
+    elapsed: float
+    error: str | None = None
+
+
+class BatchReport:
+    """Aggregate results of a batch run."""
+
+    def __init__(self, results: list, wall_seconds: float):
+        """Store the per-file results and the total wall time."""
+        self.results = results
+        self.wall_seconds = wall_seconds
+
+    @property
+    def succeeded(self) -> list:
+        """Results transcribed without errors."""
+        return [r for r in self.results if r.error is None]
+
+    @property
+    def failed(self) -> list:
+        """Results that could not be transcribed."""
+        return [r for r in self.results if r.error is not None]
+
+    @property
+    def audio_seconds(self) -> float:
+        """Total duration of the transcribed audio."""
+        return sum(r.audio_seconds for r in self.succeeded)
+
+    @property
+    def throughput(self) -> float:
+        """Audio hours transcribed per wall-clock hour."""
+        if self.wall_seconds <= 0:
+            return 0.0
+        return self.audio_seconds / self.wall_seconds
+
+    def summary(self) -> str:
+        """Human readable summary of the batch."""
+        return (
+            f"{len(self.succeeded)} transcribed, {len(self.failed)} failed, "
+            f"{self.audio_seconds / 3600:.2f} audio hours in "
+            f"{self.wall_seconds / 3600:.2f} wall hours "
+            f"({self.throughput:.1f} audio-hours per wall-hour)"
+        )
+
+
+def collect_audio_files(inputs: list) -> list:
+    """Expand folders (recursively) and glob patterns into audio files.
+
+    Returns (audio_path, root) pairs, where root is the folder given as input
+    or None for single files and glob matches.
+    """
+    found = []
+    seen = set()
+
+    def add(path, root):
+        path = os.path.abspath(path)
+        if path not in seen and path.lower().endswith(SUPPORTED_EXTENSIONS):
+            seen.add(path)
+            found.append((path, root))
+
+    for item in inputs:
+        if os.path.isdir(item):
+            root = os.path.abspath(item)
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    add(os.path.join(dirpath, name), root)
+        elif glob.has_magic(item):
+            for path in sorted(glob.glob(item, recursive=True)):
+                if os.path.isfile(path):
+                    add(path, None)
+        elif os.path.isfile(item):
+            add(item, None)
+        else:
+            logger.warning(f"Input not found, skipping: {item}")
+
+    return found
+
+
+def output_path_for(
+    audio_path: str, root: str | None = None, output_dir: str | None = None
+) -> str:
+    """Return the .txt path of a transcript.
+
+    Without output folder the transcript is written next to the audio file;
+    with it, the folder structure below `root` is preserved.
+    """
+    base = os.path.splitext(audio_path)[0] + ".txt"
+    if not output_dir:
+        return base
+    relative = os.path.relpath(base, root) if root else os.path.basename(base)
+    return os.path.join(os.path.abspath(output_dir), relative)
+
+
+def transcribe_batch(
+    inputs: list,
+    model: str = "small",
+    workers: int | None = None,
+    threads_per_worker: int | None = None,
+    output_dir: str | None = None,
+    overwrite: bool = False,
+    language: str | None = None,
+    deadline: float | None = None,
+) -> BatchReport:
+    """Transcribe every audio file found in the inputs with a process pool.
+
+    The files are submitted to the job queue (see `jobqueue`) and the pool
+    runs every unfinished job of the batch queue, including the ones left by
+    a run that was killed; files already done are skipped. With a `deadline`
+    every file must be transcribed within that many seconds of starting it;
+    `model` is then the largest model allowed.
+    """
+    start = time.perf_counter()
+    job_queue = JobQueue()
+    # Jobs of a run that was killed on this machine are taken again at once
+    job_queue.release_orphans()
+    for audio_path, root in collect_audio_files(inputs):
+        output_path = output_path_for(audio_path, root, output_dir)
+        if not overwrite and os.path.exists(output_path):
+            logger.info(f"Already transcribed, skipping: {audio_path}")
+            continue
+        job_queue.submit(
+            audio_path,
+            output_path,
+            model=model,
+            force=overwrite,
+            language=language,
+            deadline=deadline,
+        )
+
+    counts = job_queue.counts(QUEUE)
+    unfinished = sum(counts[state] for state in ("pending", *ACTIVE_STATES))
+    if not unfinished:
+        logger.warning("No audio files to transcribe.")
+        return BatchReport([], 0.0)
+
+    if workers is None:
+        # Every worker holds a full model in memory
+        workers = max(1, len(available_cpus()) // 4)
+    workers = max(1, min(workers, unfinished))
+    if threads_per_worker is None:
+        threads_per_worker = plan_threads(workers).intra_op_threads
+
+    logger.info(
+        f"Transcribing {unfinished} files with {workers} workers "
+        f"x {threads_per_worker} threads (model {model})"
+    )
+
+    results = []
+    worker = worker_id()
+    with job_queue.keep_leases(worker) as held:
+        if workers == 1:
+            _init_worker(model, workers, threads_per_worker)
+            while True:
+                job = _next_job(job_queue, worker, held, running=0)
+                if job is None:
+                    break
+                result = _transcribe_one(job_queue.path, worker, job)
+                _finish_job(job_queue, worker, held, job, result, results, unfinished)
+        else:
+            # Spawn instead of fork: torch does not survive forking well
+            context = multiprocessing.get_context("spawn")
+            # Every worker takes the next slot (its block of cores when pinned)
+            slots = context.Value("i", 0)
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(model, workers, threads_per_worker, slots),
+            ) as pool:
+                running = {}
+
+                def fill():
+                    """Keep every worker busy with a job of the queue."""
+                    while len(running) < workers:
+                        job = _next_job(job_queue, worker, held, len(running))
+                        if job is None:
+                            return
+                        future = pool.submit(
+                            _transcribe_one, job_queue.path, worker, job
+                        )
+                        running[future] = job
+
+                # The workers start on the first submit and inherit these variables
+                with plan_environment(
+                    plan_threads(workers)._replace(intra_op_threads=threads_per_worker)
+                ):
+                    fill()
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = running.pop(future)
+                        _finish_job(
+                            job_queue,
+                            worker,
+                            held,
+                            job,
+                            future.result(),
+                            results,
+                            unfinished,
+                        )
+                    fill()
+
+    report = BatchReport(results, time.perf_counter() - start)
+    logger.info(report.summary())
+    return report
+
+
+def _next_job(job_queue: JobQueue, worker: str, held: set, running: int):
+    """Take the next job of the batch queue, waiting for retries when idle.
+
+    While other jobs are running this does not wait: their outcome may queue
+    a retry. Returns None when there is nothing left to take now.
+    """
+    while True:
+        job = job_queue.claim(worker, QUEUE)
+        if job is not None:
+            held.add(job.id)
+            return job
+        due = job_queue.next_due(QUEUE)
+        if running or due is None:
+            return None
+        logger.info(f"Waiting {due:.0f}s for the next retry")
+        time.sleep(due)
+
+
+def _finish_job(
+    job_queue: JobQueue,
+    worker: str,
+    held: set,
+    job: Job,
+    result: BatchResult,
+    results: list,
+    total: int,
+) -> None:
+    """Record the outcome of a job; failed attempts may be retried later."""
+    held.discard(job.id)
+    if result.error is None:
+        job_queue.complete(job.id, worker)
+    elif job_queue.fail(job.id, worker, result.error) == "pending":
+        logger.warning(
+            f"{result.audio_path} failed (attempt {job.attempts}/"
+            f"{job.max_attempts}), retrying later: {result.error}"
+        )
+        return
+    results.append(result)
+    _log_progress(result, len(results), total)
+
+
+def _init_worker(model: str, workers: int, threads: int, slots=None) -> None:
+    """Prepare a worker process: apply its thread plan and warm up the model."""
+    slot = 0 if slots is None else claim_slot(slots)
+    plan = plan_threads(workers, slot)
+    apply_plan(plan._replace(intra_op_threads=threads))
+
+    global_registry.get(model)
+
+
+def _transcribe_one(queue_path: str, worker: str, job: Job) -> BatchResult:
+    """Transcribe one job of the batch and write its transcript.
+
+    The job moves to "transcribing" once its audio is decoded.
+    """
+    start = time.perf_counter()
+    audio_path, output_path = job.audio_path, job.output_path
+    try:
+        # Decode once; the samples also give the exact duration
+        samples = decode_audio(audio_path)
+        audio_seconds = len(samples) / SAMPLE_RATE
+        JobQueue(queue_path).set_stage(job.id, worker, "transcribing")
+
+        deadline = job.options.get("deadline")
+        if deadline is not None:
+            deadline -= time.perf_counter() - start
+        text = transcribe_audio(
+            samples,
+            job.model,
+            language=job.options.get("language"),
+            deadline=deadline,
+            use_daemon=False,
+        )
+
+        if text is None:
+            raise RuntimeError("No transcription was generated")
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        save_to_txt(text, output_path)
+        return BatchResult(
+            audio_path, output_path, audio_seconds, time.perf_counter() - start
+        )
+
+    except Exception as e:
+        return BatchResult(audio_path, None, 0.0, time.perf_counter() - start, str(e))
+
+
+def _log_progress(result: BatchResult, done: int, total: int) -> None:
+    """Log the outcome of a finished file."""
+    if result.error is None:
+        logger.info(
+            f"[{done}/{total}] {result.audio_path} -> {result.output_path} "
+            f"({result.elapsed:.1f}s)"
+        )
+    else:
+        logger.error(f"[{done}/{total}] {result.audio_path} failed: {result.error}")
+
+
+def main(argv: list | None = None) -> int:
+    """Command line entry point of batch mode."""
+    parser = argparse.ArgumentParser(description="Batch audio transcription")
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="Audio files, folders or globs (none: continue the unfinished jobs)",
+    )
+    parser.add_argument("--model", default="small", help="Whisper model")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--threads", type=int, help="Torch threads per worker")
+    parser.add_argument(
+        "--language", help='Language code, or "auto" to detect it per file'
+    )
+    parser.add_argument(
+        "--dtype", choices=SUPPORTED_DTYPES, help="Model precision (int8: CPU only)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=available_backends(),
+        help="Inference engine (ctranslate2: faster on CPU)",
+    )
+    parser.add_argument(
+        "--vad", action="store_true", help="Skip the silence before transcribing"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Time allowed per file; smaller models are used to meet it",
+    )
+    parser.add_argument(
+        "--output-dir", help="Folder for the transcripts (default: next to audio)"
+    )
+    parser.add_argument(
+        "--overwrite", action="store_true", help="Transcribe files already done"
+    )
+    args = parser.parse_args(argv)
+
+    if args.dtype:
+        # Inherited by the worker processes
+        os.environ["AUDIO_APP_MODEL_DTYPE"] = args.dtype
+    if args.backend:
+        os.environ["AUDIO_APP_BACKEND"] = args.backend
+    if args.vad:
+        os.environ["AUDIO_APP_VAD"] = "1"
+
+    report = transcribe_batch(
+        args.inputs,
+        model=args.model,
+        workers=args.workers,
+        threads_per_worker=args.threads,
+        output_dir=args.output_dir,
+        overwrite=args.overwrite,
+        language=args.language,
+        deadline=args.deadline,
+    )
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# src/transcription/cache.py
+
+"""Content-addressed on-disk cache of transcripts.
+
+Entries are keyed by a hash of the decoded audio samples together with the
+model name and the decoding parameters, so the same recording is recognized
+even if it was copied, renamed or re-encoded to another container.
+
+Usage (from the `src` folder):
+    python -m transcription.cache --stats
+    python -m transcription.cache --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import zlib
+from contextlib import suppress
+
+import numpy as np
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+CACHE_VERSION = 1
+RECORD_SUFFIX = ".json.z"
+
+
+def get_cache_dir() -> str:
+    """Return the cache folder (AUDIO_APP_CACHE_DIR overrides it)."""
+    default = os.path.join(
+        os.path.expanduser("~"), ".cache", "audio_transcription", "transcripts"
+    )
+    return os.environ.get("AUDIO_APP_CACHE_DIR", default)
+
+
+def cache_enabled() -> bool:
+    """Return whether the cache is enabled (AUDIO_APP_CACHE=0 disables it)."""
+    return os.environ.get("AUDIO_APP_CACHE", "1") != "0"
+
+
+def audio_fingerprint(audio: np.ndarray) -> str:
+    """Return the SHA-256 of decoded float32 samples."""
+    samples = np.ascontiguousarray(audio, dtype=np.float32)
+    digest = hashlib.sha256()
+    digest.update(str(samples.shape).encode("ascii"))
+    digest.update(memoryview(samples).cast("B"))
+    return digest.hexdigest()
+
+
+def make_key(audio_digest: str, model: str, **params) -> str:
+    """Combine the audio hash, the model and the decoding parameters."""
+    description = json.dumps(
+        {"v": CACHE_VERSION, "audio": audio_digest, "model": model, "params": params},
+        sort_keys=True,
+    )
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+class TranscriptCache:
+    """Size-bounded folder of compressed transcript records."""
+
+    def __init__(self, directory: str | None = None, max_bytes: int | None = None):
+        """Initialize the cache; by default the folder and size come from env."""
+        self._directory = directory
+        self._max_bytes = max_bytes
+
+    @property
+    def directory(self) -> str:
+        """Folder where the records are stored."""
+        return self._directory or get_cache_dir()
+
+    @property
+    def max_bytes(self) -> int:
+        """Maximum size of the cache (AUDIO_APP_CACHE_MB, 256 MB by default)."""
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return int(float(os.environ.get("AUDIO_APP_CACHE_MB", "256")) * 1024 * 1024)
+
+    def get(self, key: str) -> dict | None:
+        """Return the record stored for a key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                record = json.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning(f"Discarding corrupt cache entry {key}: {e}")
+            self.invalidate(key)
+            return None
+
+        # The modification time is used as last access for eviction
+        with suppress(OSError):
+            os.utime(path)
+        return record
+
+    def put(self, key: str, record: dict) -> None:
+        """Store a record and evict old entries if the cache is too big."""
+        path = self._path(key)
+        data = zlib.compress(
+            json.dumps(record, separators=(",", ":")).encode("utf-8")
+        )
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see half records
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry: {e}")
+            return
+
+        self.prune()
+
+    def invalidate(self, key: str) -> bool:
+        """Remove a single entry."""
+        try:
+            os.remove(self._path(key))
+            return True
+        except OSError:
+            return False
+
+    def clear(self) -> int:
+        """Remove every entry and return how many were removed."""
+        removed = 0
+        for path, _, _ in self._records():
+            with suppress(OSError):
+                os.remove(path)
+                removed += 1
+        logger.info(f"Transcript cache cleared ({removed} entries)")
+        return removed
+
+    def prune(self) -> int:
+        """Evict least recently used entries until the cache fits its size."""
+        records = self._records()
+        total = sum(size for _, size, _ in records)
+        removed = 0
+        for path, size, _ in sorted(records, key=lambda r: r[2]):
+            if total <= self.max_bytes:
+                break
+            with suppress(OSError):
+                os.remove(path)
+                total -= size
+                removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        """Return the number of entries and their total size."""
+        records = self._records()
+        return {
+            "directory": self.directory,
+            "entries": len(records),
+            "bytes": sum(size for _, size, _ in records),
+            "max_bytes": self.max_bytes,
+        }
+
+    def _path(self, key: str) -> str:
+        """Return the file of a key (sharded by its first two characters)."""
+        return os.path.join(self.directory, key[:2], key + RECORD_SUFFIX)
+
+    def _records(self) -> list:
+        """List (path, size, mtime) of every record."""
+        records = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(RECORD_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                with suppress(OSError):
+                    st = os.stat(path)
+                    records.append((path, st.st_size, st.st_mtime))
+        return records
+
+
+# Global cache used by the transcriber
+global_cache = TranscriptCache()
+
+
+def clear_cache() -> int:
+    """Remove every cached transcript."""
+    return global_cache.clear()
+
+
+def main(argv: list | None = None) -> int:
+    """Command line entry point to inspect or invalidate the cache."""
+    parser = argparse.ArgumentParser(description="Transcript cache maintenance")
+    parser.add_argument("--clear", action="store_true", help="Remove every entry")
+    parser.add_argument("--stats", action="store_true", help="Show the cache size")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        clear_cache()
+    stats = global_cache.stats()
+    logger.info(
+        f"{stats['entries']} entries, {stats['bytes'] / 1024:.1f} KB "
+        f"in {stats['directory']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
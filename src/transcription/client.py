@@ -0,0 +1,206 @@
+# src/transcription/client.py
+
+"""Client side of the local transcription daemon."""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+
+from logger import get_logger
+
+from .worker import POLL_INTERVAL, TranscriptionCancelled, TranscriptionTimeout
+
+
+logger = get_logger(__name__)
+
+
+class DaemonUnavailable(RuntimeError):
+    """Raised when no transcription daemon answers on the socket."""
+
+
+def get_socket_path() -> str:
+    """Return the Unix socket path of the daemon.
+
+    It can be changed with the AUDIO_APP_DAEMON_SOCKET environment variable.
+    """
+    default = os.path.join(
+        tempfile.gettempdir(), f"audio_transcription-{_user_id()}.sock"
+    )
+    return os.environ.get("AUDIO_APP_DAEMON_SOCKET", default)
+
+
+def daemon_enabled() -> bool:
+    """Return whether clients may use the daemon (AUDIO_APP_DAEMON=0 disables)."""
+    return os.environ.get("AUDIO_APP_DAEMON", "1") != "0"
+
+
+def is_daemon_available(socket_path: str | None = None) -> bool:
+    """Cheaply check whether a daemon socket exists."""
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    return os.path.exists(socket_path or get_socket_path())
+
+
+def send_request(
+    payload: dict,
+    socket_path: str | None = None,
+    timeout: float | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict:
+    """Send a request to the daemon and return its JSON answer.
+
+    If `cancel_event` is set while waiting, the connection is closed (the
+    daemon then cancels the job) and TranscriptionCancelled is raised.
+    """
+    socket_path = socket_path or get_socket_path()
+    if not is_daemon_available(socket_path):
+        raise DaemonUnavailable(f"No daemon socket at {socket_path}")
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            line = _read_line(sock, timeout, cancel_event)
+    except OSError as e:
+        # Stale socket file left by a daemon that is not running, or a daemon
+        # that died while working
+        raise DaemonUnavailable(f"Daemon not responding at {socket_path}") from e
+
+    if not line:
+        raise DaemonUnavailable("The daemon closed the connection without answering")
+    return json.loads(line)
+
+
+def ping(socket_path: str | None = None) -> bool:
+    """Return True if a daemon answers on the socket."""
+    try:
+        return send_request({"op": "ping"}, socket_path, timeout=2).get("ok", False)
+    except (DaemonUnavailable, OSError, ValueError):
+        return False
+
+
+def request_transcription(
+    audio_path: str,
+    model: str = "small",
+    socket_path: str | None = None,
+    cancel_event: threading.Event | None = None,
+    **options,
+) -> str | None:
+    """Transcribe an audio file in the daemon.
+
+    Returns the text, or None if the daemon could not transcribe it.
+    Raises DaemonUnavailable if no daemon is running and
+    TranscriptionCancelled if `cancel_event` is set before it finishes.
+    """
+    payload = {
+        "op": "transcribe",
+        # The daemon may run with another working directory
+        "audio_path": os.path.abspath(audio_path),
+        "model": model,
+        "options": options,
+    }
+    logger.info(f"Sending transcription to the daemon: {audio_path}")
+    answer = send_request(payload, socket_path, cancel_event=cancel_event)
+
+    if not answer.get("ok"):
+        logger.error(f"The daemon could not transcribe: {answer.get('error')}")
+        return None
+    return answer.get("text")
+
+
+def stream_transcription(
+    op: str,
+    audio_path: str,
+    model: str = "small",
+    socket_path: str | None = None,
+    timeout: float | None = None,
+    cancel_event: threading.Event | None = None,
+    **options,
+) -> Iterator:
+    """Transcribe an audio file in the daemon, yielding results as they arrive.
+
+    `op` is "segments" or "revisions"; every item is the JSON form of one
+    segment or revision. Closing the connection cancels the job in the
+    daemon, which happens when `cancel_event` is set (TranscriptionCancelled)
+    or after `timeout` seconds (TranscriptionTimeout). Raises
+    DaemonUnavailable if no daemon answers and RuntimeError if it fails.
+    """
+    socket_path = socket_path or get_socket_path()
+    if not is_daemon_available(socket_path):
+        raise DaemonUnavailable(f"No daemon socket at {socket_path}")
+    payload = {
+        "op": op,
+        "audio_path": os.path.abspath(audio_path),
+        "model": model,
+        "options": options,
+    }
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            logger.info(f"Streaming transcription from the daemon: {audio_path}")
+            for line in _iter_lines(sock, timeout, cancel_event):
+                answer = json.loads(line)
+                if not answer.get("ok"):
+                    raise RuntimeError(
+                        f"The daemon could not transcribe: {answer.get('error')}"
+                    )
+                if answer.get("done"):
+                    return
+                yield answer["item"]
+        except TimeoutError as e:
+            raise TranscriptionTimeout(
+                f"The daemon did not finish in {timeout:.0f}s"
+            ) from e
+        except OSError as e:
+            raise DaemonUnavailable(f"Daemon not responding at {socket_path}") from e
+    raise DaemonUnavailable("The daemon closed the connection before the end")
+
+
+def _read_line(sock, timeout: float | None, cancel_event) -> bytes:
+    """Read one line from the socket, checking `cancel_event` meanwhile."""
+    if cancel_event is None:
+        with sock.makefile("rb") as stream:
+            return stream.readline()
+    return next(_iter_lines(sock, timeout, cancel_event), b"")
+
+
+def _iter_lines(sock, timeout: float | None, cancel_event) -> Iterator[bytes]:
+    """Yield the lines received until the connection closes.
+
+    Raises TranscriptionCancelled when `cancel_event` is set and TimeoutError
+    after `timeout` seconds in all.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    sock.settimeout(POLL_INTERVAL)
+    data = b""
+    while True:
+        while b"\n" in data:
+            line, data = data.split(b"\n", 1)
+            yield line + b"\n"
+        if cancel_event is not None and cancel_event.is_set():
+            raise TranscriptionCancelled("Transcription cancelled")
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("The daemon did not answer in time")
+        try:
+            received = sock.recv(65536)
+        except TimeoutError:
+            continue
+        if not received:
+            break
+        data += received
+    if data:
+        yield data
+
+
+def _user_id() -> str:
+    """Return an identifier of the current user for the socket name."""
+    if hasattr(os, "getuid"):
+        return str(os.getuid())
+    return os.environ.get("USERNAME", "user")
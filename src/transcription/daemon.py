@@ -0,0 +1,266 @@
+# src/transcription/daemon.py
+
+"""Long-lived transcription daemon that keeps Whisper models warm.
+
+Usage (from the `src` folder):
+    python -m transcription.daemon --preload small
+    python -m transcription.daemon --status
+    python -m transcription.daemon --stop
+
+Clients send one JSON line per request over a Unix domain socket and get one
+JSON line back, or for the progressive "segments" and "revisions" requests
+one line per result and a last {"ok": true, "done": true}. `transcribe_audio`,
+`iter_segments` and `iter_revisions` use the daemon automatically when it is
+running and fall back to in-process transcription otherwise.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import suppress
+
+from logger import get_logger
+
+from .backends import available_backends
+from .client import get_socket_path, ping, send_request
+from .model_registry import SUPPORTED_DTYPES, global_registry
+from .transcriber import iter_revisions, iter_segments, transcribe_audio
+from .warmup import warm_up_model
+from .worker import TranscriptionCancelled
+
+
+logger = get_logger(__name__)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle a single client request."""
+
+    def handle(self):
+        """Read a JSON request and write the JSON answer."""
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            self._reply({"ok": False, "error": "Invalid request"})
+            return
+
+        op = request.get("op")
+        if op == "ping":
+            self._reply({"ok": True, "pid": os.getpid()})
+
+        elif op == "stats":
+            stats = global_registry.stats()
+            stats["models"] = {
+                "/".join(str(part) for part in key): value
+                for key, value in stats["models"].items()
+            }
+            self._reply({"ok": True, "stats": stats})
+
+        elif op == "transcribe":
+            self._reply(self._transcribe(request))
+
+        elif op in ("segments", "revisions"):
+            self._stream(op, request)
+
+        elif op == "shutdown":
+            self._reply({"ok": True})
+            # shutdown() blocks until serve_forever ends, so not from this thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+        else:
+            self._reply({"ok": False, "error": f"Unknown operation: {op}"})
+
+    def _transcribe(self, request: dict) -> dict:
+        """Run a transcription job inside the daemon process."""
+        audio_path = request.get("audio_path")
+        if not audio_path or not os.path.isfile(audio_path):
+            return {"ok": False, "error": f"No exists the file: {audio_path}"}
+
+        options = request.get("options", {})
+        # The job runs here, on the preloaded models, and is stopped at the
+        # next decoder step when the client disconnects or its timeout passes
+        options["isolated"] = False
+        timeout = options.pop("timeout", None)
+        cancel_event = threading.Event()
+        threading.Thread(
+            target=self._watch_disconnect, args=(cancel_event,), daemon=True
+        ).start()
+        expired = threading.Event()
+        timer = None
+        if timeout is not None:
+
+            def expire():
+                expired.set()
+                cancel_event.set()
+
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+
+        try:
+            text = transcribe_audio(
+                audio_path,
+                model=request.get("model", "small"),
+                use_daemon=False,
+                cancel_event=cancel_event,
+                **options,
+            )
+        except Exception as e:
+            logger.exception(f"Daemon job failed: {e}")
+            return {"ok": False, "error": str(e)}
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if text is None and expired.is_set():
+            return {"ok": False, "error": f"Transcription exceeded {timeout}s"}
+        if text is None:
+            return {"ok": False, "error": "No transcription was generated"}
+        return {"ok": True, "text": text}
+
+    def _stream(self, op: str, request: dict) -> None:
+        """Run a progressive job, sending every segment or revision as it comes."""
+        audio_path = request.get("audio_path")
+        if not audio_path or not os.path.isfile(audio_path):
+            self._reply({"ok": False, "error": f"No exists the file: {audio_path}"})
+            return
+
+        options = request.get("options", {})
+        # Progressive jobs also run on the preloaded models
+        options["isolated"] = False
+        cancel_event = threading.Event()
+        threading.Thread(
+            target=self._watch_disconnect, args=(cancel_event,), daemon=True
+        ).start()
+
+        iterate = iter_segments if op == "segments" else iter_revisions
+        try:
+            for item in iterate(
+                audio_path,
+                model=request.get("model", "small"),
+                use_daemon=False,
+                cancel_event=cancel_event,
+                **options,
+            ):
+                self._reply({"ok": True, "item": _to_json(item)})
+        except Exception as e:
+            if cancel_event.is_set() or isinstance(e, TranscriptionCancelled):
+                logger.info("Daemon job cancelled: the client disconnected")
+                return
+            logger.exception(f"Daemon job failed: {e}")
+            with suppress(OSError):
+                self._reply({"ok": False, "error": str(e)})
+            return
+        self._reply({"ok": True, "done": True})
+
+    def _watch_disconnect(self, cancel_event: threading.Event) -> None:
+        """Set `cancel_event` when the client closes the connection."""
+        with suppress(OSError):
+            self.request.recv(1)
+        cancel_event.set()
+
+    def _reply(self, answer: dict) -> None:
+        """Send an answer as a JSON line."""
+        self.wfile.write(json.dumps(answer).encode("utf-8") + b"\n")
+
+
+def _to_json(item) -> list:
+    """Convert a Segment or a Revision into JSON-serializable lists."""
+    if hasattr(item, "window"):
+        return [item.window, [list(s) for s in item.segments], item.final]
+    return list(item)
+
+
+class TranscriptionDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server that transcribes with the process-wide models."""
+
+    daemon_threads = True
+
+
+def create_server(socket_path: str | None = None) -> TranscriptionDaemon:
+    """Bind the daemon socket, replacing a stale one if present."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix domain sockets are not available on this system")
+
+    socket_path = socket_path or get_socket_path()
+    if os.path.exists(socket_path):
+        if ping(socket_path):
+            raise RuntimeError(f"A daemon is already running at {socket_path}")
+        os.remove(socket_path)
+
+    server = TranscriptionDaemon(socket_path, _RequestHandler)
+    # Only the current user may send jobs
+    os.chmod(socket_path, 0o600)
+    return server
+
+
+def serve(socket_path: str | None = None, preload: tuple = ()) -> None:
+    """Run the daemon until it receives a shutdown request."""
+    socket_path = socket_path or get_socket_path()
+    server = create_server(socket_path)
+
+    for name in preload:
+        seconds = warm_up_model(name)
+        logger.info(f"Preloaded Whisper model ({name}) in {seconds:.1f}s")
+
+    logger.info(f"Transcription daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Daemon interrupted")
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        logger.info("Transcription daemon stopped")
+
+
+def main(argv: list | None = None) -> int:
+    """Command line entry point of the daemon."""
+    parser = argparse.ArgumentParser(description="Local transcription daemon")
+    parser.add_argument("--socket", help="Unix socket path")
+    parser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        help="Model to load at startup (can be repeated)",
+    )
+    parser.add_argument(
+        "--dtype", choices=SUPPORTED_DTYPES, help="Model precision (int8: CPU only)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=available_backends(),
+        help="Inference engine (ctranslate2: faster on CPU)",
+    )
+    parser.add_argument(
+        "--vad", action="store_true", help="Skip the silence before transcribing"
+    )
+    parser.add_argument("--status", action="store_true", help="Show daemon status")
+    parser.add_argument("--stop", action="store_true", help="Stop a running daemon")
+    args = parser.parse_args(argv)
+
+    if args.status or args.stop:
+        if not ping(args.socket):
+            logger.info("No transcription daemon is running")
+            return 1
+        op = "shutdown" if args.stop else "stats"
+        answer = send_request({"op": op}, args.socket, timeout=5)
+        logger.info(json.dumps(answer, indent=2))
+        return 0
+
+    if args.dtype:
+        os.environ["AUDIO_APP_MODEL_DTYPE"] = args.dtype
+    if args.backend:
+        os.environ["AUDIO_APP_BACKEND"] = args.backend
+    if args.vad:
+        os.environ["AUDIO_APP_VAD"] = "1"
+    serve(args.socket, tuple(args.preload))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+# src/transcription/incremental.py
+
+"""Incremental transcription of files that keep growing.
+
+Recordings still being written and rolling dumps grow between runs, and
+transcribing them again from the start costs more every time. Here every run
+only decodes the new tail of the file (plus a short overlap, so that a word
+cut at the old end is heard whole) and appends its text to the transcript.
+
+The state of every file (how far it is transcribed, its language and the
+text so far) is saved next to the transcript cache. The last segments of a
+run are not final while the file grows: they may end in a word that is still
+being recorded, so they are decoded again by the next run.
+
+Usage (from the `src` folder):
+    python -m transcription.incremental recording.wav
+    python -m transcription.incremental recording.wav --watch 10 --output out.txt
+    python -m transcription.incremental recording.wav --final
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import NamedTuple
+
+from audio.decoder import decode_audio
+from logger import get_logger
+from output import save_to_txt
+
+from .cache import get_cache_dir
+from .inference import backend_options
+from .language import resolve_language
+from .longform import PROMPT_WORDS, SAMPLE_RATE, merge_overlap
+from .resources import ensure_plan
+from .segments import Segment, iter_chunk_segments, join_segments
+
+
+logger = get_logger(__name__)
+
+STATE_VERSION = 1
+
+# Audio before the transcribed end decoded again, for a word cut at the end
+OVERLAP_SECONDS = 1.0
+
+# Segments ending this close to the end of a growing file are not final yet
+STABLE_MARGIN_SECONDS = 2.0
+
+
+class TailUpdate(NamedTuple):
+    """Result of one incremental run over a file."""
+
+    text: str
+    segments: list
+    decoded_seconds: float
+
+
+def get_state_dir() -> str:
+    """Return the folder of the incremental states (AUDIO_APP_INCREMENTAL_DIR)."""
+    default = os.path.join(os.path.dirname(get_cache_dir()), "incremental")
+    return os.environ.get("AUDIO_APP_INCREMENTAL_DIR", default)
+
+
+def transcribe_incremental(
+    audio_path: str,
+    model: str = "small",
+    *,
+    language: str | None = None,
+    backend: str | None = None,
+    final: bool = False,
+) -> TailUpdate:
+    """Transcribe what was added to a file since the previous run.
+
+    The first run transcribes the whole file. Later runs decode from the end
+    of the stable transcript on and append the new segments; with `final`
+    (the file is complete) the last segments are committed too. The state
+    starts over when the file is replaced, shrinks, or the model or backend
+    change. `language` ("auto" included) is resolved on the first run only.
+    """
+    ensure_plan()
+    path = os.path.abspath(audio_path)
+    stat = os.stat(path)
+    state = load_state(path)
+    if state is not None and not _same_file(state, stat, model, backend):
+        logger.info(f"{audio_path} was replaced, transcribing it from the start")
+        state = None
+    if state is None:
+        state = {
+            "version": STATE_VERSION,
+            "path": path,
+            "model": model,
+            "backend": backend,
+            "offset": 0.0,
+            "text": "",
+            "segments": [],
+            "final": False,
+        }
+    elif stat.st_size == state["size"] and (state["final"] or not final):
+        logger.info(f"{audio_path} has not grown since the last run")
+        return TailUpdate(state["text"], [], 0.0)
+
+    offset = state["offset"]
+    start = max(0.0, offset - OVERLAP_SECONDS)
+    samples = decode_audio(path, SAMPLE_RATE, start=start)
+    decoded = len(samples) / SAMPLE_RATE
+    logger.info(f"Transcribing {decoded:.1f}s of {audio_path} from {start:.1f}s")
+
+    if "language" not in state:
+        state["language"] = resolve_language(language, samples, model, None, backend)
+    options = {"language": state["language"], **backend_options(backend)}
+    if state["text"]:
+        options["initial_prompt"] = " ".join(state["text"].split()[-PROMPT_WORDS:])
+
+    # Segments that start in the overlap were committed by the previous run
+    segments = [
+        segment._replace(start=segment.start + start, end=segment.end + start)
+        for segment in iter_chunk_segments(samples, model, options)
+    ]
+    segments = [s for s in segments if (s.start + s.end) / 2 >= offset]
+
+    end = start + decoded
+    if final:
+        stable, offset = segments, end
+    else:
+        stable = [s for s in segments if s.end <= end - STABLE_MARGIN_SECONDS]
+        pending = segments[len(stable) :]
+        # Decode again from the first segment that may still change
+        offset = pending[0].start if pending else end - STABLE_MARGIN_SECONDS
+        offset = max(offset, state["offset"], stable[-1].end if stable else 0.0)
+
+    state["text"] = merge_overlap(state["text"], join_segments(stable))
+    state["segments"] += [list(segment) for segment in stable]
+    state.update(
+        offset=offset,
+        size=stat.st_size,
+        device=stat.st_dev,
+        inode=stat.st_ino,
+        final=final,
+    )
+    save_state(path, state)
+    return TailUpdate(state["text"], stable, decoded)
+
+
+def load_state(audio_path: str) -> dict | None:
+    """Return the saved state of a file, or None."""
+    try:
+        with open(_state_path(audio_path), encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Discarding corrupt incremental state: {e}")
+        return None
+    if state.get("version") != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(audio_path: str, state: dict) -> None:
+    """Write the state of a file atomically."""
+    path = _state_path(audio_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(temp_path, path)
+
+
+def reset_state(audio_path: str) -> bool:
+    """Forget the progress of a file; the next run starts from the beginning."""
+    try:
+        os.remove(_state_path(audio_path))
+        return True
+    except OSError:
+        return False
+
+
+def get_segments(audio_path: str) -> list:
+    """Return the segments committed so far for a file."""
+    state = load_state(os.path.abspath(audio_path))
+    return [Segment(*values) for values in state["segments"]] if state else []
+
+
+def _state_path(audio_path: str) -> str:
+    """Return the state file of an audio file, named after its path."""
+    name = hashlib.sha256(os.path.abspath(audio_path).encode("utf-8")).hexdigest()
+    return os.path.join(get_state_dir(), name + ".json")
+
+
+def _same_file(state: dict, stat: os.stat_result, model: str, backend) -> bool:
+    """Whether a state still describes the file and the job settings."""
+    return (
+        state.get("device") == stat.st_dev
+        and state.get("inode") == stat.st_ino
+        and stat.st_size >= state.get("size", 0)
+        and state.get("model") == model
+        and state.get("backend") == backend
+    )
+
+
+def main(argv: list | None = None) -> int:
+    """Command line entry point: transcribe the tail of a file once or in a loop."""
+    parser = argparse.ArgumentParser(description="Incremental transcription")
+    parser.add_argument("audio", help="File that keeps growing")
+    parser.add_argument("--model", default="small", help="Whisper model")
+    parser.add_argument(
+        "--language", help='Language code, or "auto" to detect it once'
+    )
+    parser.add_argument(
+        "--watch", type=float, metavar="SECONDS", help="Check the file every N s"
+    )
+    parser.add_argument(
+        "--final", action="store_true", help="The file is complete: commit all"
+    )
+    parser.add_argument("--reset", action="store_true", help="Start from scratch")
+    parser.add_argument("--output", help="Text file with the whole transcript")
+    args = parser.parse_args(argv)
+
+    if args.reset:
+        reset_state(args.audio)
+
+    try:
+        while True:
+            update = transcribe_incremental(
+                args.audio, args.model, language=args.language, final=args.final
+            )
+            if update.segments:
+                logger.info(join_segments(update.segments))
+                if args.output:
+                    save_to_txt(update.text, args.output)
+            if not args.watch or args.final:
+                break
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        logger.info("Stopped; the next run continues where this one ended")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+# src/transcription/inference.py
+
+"""Run models of the registry through their inference backend.
+
+The decoding options of a job may carry a "backend" entry with the engine that
+must run it. It is only present for engines other than the default Whisper
+one, so the options (and the cache keys built from them) of Whisper jobs stay
+as they were.
+"""
+
+import threading
+
+import numpy as np
+
+from .backends import DEFAULT_BACKEND, get_backend
+from .model_registry import acquire_model
+
+
+def backend_options(backend: str | None) -> dict:
+    """Return the job options that select `backend` (None for the default)."""
+    name = get_backend(backend).name
+    return {} if name == DEFAULT_BACKEND else {"backend": name}
+
+
+def transcribe_samples(
+    audio: np.ndarray,
+    model: str,
+    options: dict,
+    deadline: float | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict:
+    """Transcribe samples with a registry model and return a Whisper result.
+
+    With a `deadline` (a `time.monotonic()` value) the backend stops the
+    decode with `TranscriptionTimeout` once it passes, and with a
+    `cancel_event` with `TranscriptionCancelled` once it is set.
+    """
+    options = dict(options)
+    engine = get_backend(options.pop("backend", DEFAULT_BACKEND))
+    if deadline is not None:
+        options["deadline"] = deadline
+    if cancel_event is not None:
+        options["cancel_event"] = cancel_event
+    with acquire_model(model, backend=engine.name) as loaded:
+        return engine.transcribe(loaded, audio, **options)
+
+
+def detect_language_samples(
+    audio: np.ndarray, model: str, backend: str | None = None
+) -> tuple:
+    """Return (language, probability) of one window with a registry model."""
+    engine = get_backend(backend)
+    with acquire_model(model, backend=engine.name) as loaded:
+        return engine.detect_language(loaded, audio)
@@ -0,0 +1,530 @@
+# src/transcription/jobqueue.py
+
+"""Durable queue of transcription jobs in SQLite.
+
+Every file to transcribe is a row that goes through the states pending,
+converting (decoding the audio), transcribing, and done or failed. A worker
+that takes a job holds a lease on it and renews it while it works; when a
+worker dies (out of memory, reboot) its lease expires and the job is taken
+again by the next worker, so a new run continues where the last one stopped
+and files already done are not decoded again.
+
+Jobs are taken by priority (then in order of submission). A failed attempt
+is retried after a backoff that doubles every time, up to `max_attempts`.
+The time spent in every stage of the last attempt is kept with the job.
+
+Usage (from the `src` folder):
+    python -m transcription.jobqueue
+    python -m transcription.jobqueue --list failed
+    python -m transcription.jobqueue --retry-failed
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import closing, contextmanager
+from typing import NamedTuple
+
+from logger import get_logger
+
+from .cache import get_cache_dir
+
+
+logger = get_logger(__name__)
+
+STATES = ("pending", "converting", "transcribing", "done", "failed")
+
+# States of a job that a worker holds
+ACTIVE_STATES = ("converting", "transcribing")
+
+# A job whose lease is not renewed in this time is taken by another worker
+LEASE_SECONDS = 600.0
+
+# Wait before the first retry of a failed job; doubles with every attempt
+BACKOFF_SECONDS = 30.0
+
+MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    queue TEXT NOT NULL,
+    audio_path TEXT NOT NULL,
+    output_path TEXT NOT NULL DEFAULT '',
+    model TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    stage_started REAL,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    UNIQUE (queue, audio_path, output_path)
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (queue, state, priority);
+CREATE TABLE IF NOT EXISTS stage_times (
+    job_id INTEGER NOT NULL REFERENCES jobs (id) ON DELETE CASCADE,
+    attempt INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+"""
+
+
+class Job(NamedTuple):
+    """A transcription job of the queue."""
+
+    id: int
+    queue: str
+    audio_path: str
+    output_path: str | None
+    model: str
+    options: dict
+    priority: int
+    state: str
+    attempts: int
+    max_attempts: int
+    error: str | None
+    timings: dict
+
+
+def get_queue_path() -> str:
+    """Return the database of the queue (AUDIO_APP_QUEUE_DB)."""
+    default = os.path.join(os.path.dirname(get_cache_dir()), "jobs.sqlite3")
+    return os.environ.get("AUDIO_APP_QUEUE_DB", default)
+
+
+def worker_id() -> str:
+    """Return the name that identifies this process as a lease owner."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """Transcription jobs stored in a SQLite database shared by processes."""
+
+    def __init__(self, path: str | None = None, backoff_seconds: float | None = None):
+        """Initialize the queue; by default the database path comes from env."""
+        self._path = path
+        self.backoff_seconds = (
+            BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        )
+
+    @property
+    def path(self) -> str:
+        """SQLite database file."""
+        return self._path or get_queue_path()
+
+    def submit(
+        self,
+        audio_path: str,
+        output_path: str | None = None,
+        *,
+        queue: str = "batch",
+        model: str = "small",
+        priority: int = 0,
+        max_attempts: int = MAX_ATTEMPTS,
+        force: bool = False,
+        **options,
+    ) -> int:
+        """Add a job and return its id.
+
+        A job for the same file and output in the same queue is not added
+        twice: a failed one is queued again, a done one only with `force`,
+        and a pending or running one is left as it is. `options` are the
+        keyword arguments of `transcribe_audio` (language, deadline...).
+        """
+        audio_path = os.path.abspath(audio_path)
+        output = os.path.abspath(output_path) if output_path else ""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, state FROM jobs WHERE queue = ? AND audio_path = ? "
+                "AND output_path = ?",
+                (queue, audio_path, output),
+            ).fetchone()
+            if row is None:
+                return conn.execute(
+                    "INSERT INTO jobs (queue, audio_path, output_path, model, "
+                    "options, priority, max_attempts, created, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        queue,
+                        audio_path,
+                        output,
+                        model,
+                        json.dumps(options),
+                        priority,
+                        max_attempts,
+                        now,
+                        now,
+                    ),
+                ).lastrowid
+            if row["state"] == "failed" or (force and row["state"] == "done"):
+                conn.execute(
+                    "UPDATE jobs SET state = 'pending', attempts = 0, "
+                    "next_attempt = 0, error = NULL, model = ?, options = ?, "
+                    "priority = ?, max_attempts = ?, updated = ? WHERE id = ?",
+                    (
+                        model,
+                        json.dumps(options),
+                        priority,
+                        max_attempts,
+                        now,
+                        row["id"],
+                    ),
+                )
+            return row["id"]
+
+    def claim(
+        self,
+        worker: str,
+        queue: str = "batch",
+        lease_seconds: float = LEASE_SECONDS,
+        job_id: int | None = None,
+    ) -> Job | None:
+        """Take the next job that is due, or one whose lease expired.
+
+        The job moves to "converting" with a lease for `worker`. Jobs of dead
+        workers that used up their attempts are marked failed instead.
+        With `job_id` only that job is taken. Returns None when no job is due.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT id, attempts, max_attempts, state FROM jobs "
+                    "WHERE queue = ? AND ((state = 'pending' AND next_attempt <= ?) "
+                    "OR (state IN (?, ?) AND lease_expires < ?)) "
+                    "AND (? IS NULL OR id = ?) "
+                    "ORDER BY priority DESC, id LIMIT 1",
+                    (queue, now, *ACTIVE_STATES, now, job_id, job_id),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["state"] != "pending":
+                    logger.warning(f"Job {row['id']} lost its worker, taking it over")
+                    if row["attempts"] >= row["max_attempts"]:
+                        conn.execute(
+                            "UPDATE jobs SET state = 'failed', lease_owner = NULL, "
+                            "error = 'The worker stopped responding', updated = ? "
+                            "WHERE id = ?",
+                            (now, row["id"]),
+                        )
+                        continue
+                conn.execute(
+                    "UPDATE jobs SET state = 'converting', attempts = attempts + 1, "
+                    "lease_owner = ?, lease_expires = ?, stage_started = ?, "
+                    "error = NULL, updated = ? WHERE id = ?",
+                    (worker, now + lease_seconds, now, now, row["id"]),
+                )
+                return self._get(conn, row["id"])
+
+    def heartbeat(
+        self, job_id: int, worker: str, lease_seconds: float = LEASE_SECONDS
+    ) -> bool:
+        """Renew the lease of a job; False if the worker no longer holds it."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? "
+                "AND lease_owner = ? AND state IN (?, ?)",
+                (now + lease_seconds, now, job_id, worker, *ACTIVE_STATES),
+            )
+            return cursor.rowcount == 1
+
+    def set_stage(self, job_id: int, worker: str, stage: str) -> bool:
+        """Move a held job to another active stage, timing the one it leaves."""
+        if stage not in ACTIVE_STATES:
+            raise ValueError(f"Not an active stage: {stage}")
+        return self._finish_stage(job_id, worker, stage) is not None
+
+    def complete(self, job_id: int, worker: str) -> bool:
+        """Mark a held job as done."""
+        return self._finish_stage(job_id, worker, "done") is not None
+
+    def fail(self, job_id: int, worker: str, error: str) -> str | None:
+        """Record a failed attempt of a held job and return its new state.
+
+        The job is pending again (after the backoff) while it has attempts
+        left, and failed otherwise. Returns None if the worker lost the job.
+        """
+        return self._finish_stage(job_id, worker, None, error)
+
+    @contextmanager
+    def keep_leases(self, worker: str, lease_seconds: float = LEASE_SECONDS):
+        """Renew the leases of the job ids in the yielded set in a thread."""
+        held = set()
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(lease_seconds / 3):
+                for job_id in list(held):
+                    self.heartbeat(job_id, worker, lease_seconds)
+
+        thread = threading.Thread(target=renew, name="lease-keeper", daemon=True)
+        thread.start()
+        try:
+            yield held
+        finally:
+            stop.set()
+            thread.join()
+
+    def release_orphans(self) -> int:
+        """Expire the leases held by dead processes of this machine.
+
+        Their jobs can be taken at once instead of after the lease time.
+        Returns how many jobs were released.
+        """
+        host = socket.gethostname()
+        with self._transaction() as conn:
+            orphans = [
+                row["id"]
+                for row in conn.execute(
+                    "SELECT id, lease_owner FROM jobs WHERE state IN (?, ?)",
+                    ACTIVE_STATES,
+                )
+                if _is_dead_local_owner(row["lease_owner"], host)
+            ]
+            conn.executemany(
+                "UPDATE jobs SET lease_expires = 0 WHERE id = ?",
+                [(job_id,) for job_id in orphans],
+            )
+        if orphans:
+            logger.info(f"{len(orphans)} interrupted jobs will be taken again")
+        return len(orphans)
+
+    def next_due(self, queue: str = "batch") -> float | None:
+        """Seconds until the next pending job is due, or None if there is none."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT MIN(next_attempt) AS due FROM jobs "
+                "WHERE queue = ? AND state = 'pending'",
+                (queue,),
+            ).fetchone()
+        if row["due"] is None:
+            return None
+        return max(0.0, row["due"] - time.time())
+
+    def get(self, job_id: int) -> Job | None:
+        """Return a job by id."""
+        with closing(self._connect()) as conn:
+            return self._get(conn, job_id)
+
+    def jobs(self, queue: str | None = None, state: str | None = None) -> list:
+        """Return the jobs of a queue and state (all by default), oldest first."""
+        query = "SELECT id FROM jobs WHERE 1 = 1"
+        params = []
+        if queue is not None:
+            query += " AND queue = ?"
+            params.append(queue)
+        if state is not None:
+            query += " AND state = ?"
+            params.append(state)
+        with closing(self._connect()) as conn:
+            ids = [row["id"] for row in conn.execute(query + " ORDER BY id", params)]
+            return [self._get(conn, job_id) for job_id in ids]
+
+    def counts(self, queue: str | None = None) -> dict:
+        """Return the number of jobs in every state."""
+        counts = dict.fromkeys(STATES, 0)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT state, COUNT(*) AS n FROM jobs "
+                "WHERE ? IS NULL OR queue = ? GROUP BY state",
+                (queue, queue),
+            )
+            counts.update({row["state"]: row["n"] for row in rows})
+        return counts
+
+    def retry_failed(self, queue: str | None = None) -> int:
+        """Queue the failed jobs again with all their attempts; returns how many."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, next_attempt = 0, "
+                "updated = ? WHERE state = 'failed' AND (? IS NULL OR queue = ?)",
+                (time.time(), queue, queue),
+            ).rowcount
+
+    def _finish_stage(
+        self, job_id: int, worker: str, new_state: str | None, error: str | None = None
+    ) -> str | None:
+        """Time the current stage of a held job and move it to `new_state`.
+
+        With `new_state` None the attempt failed and the state depends on the
+        attempts left.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT state, attempts, max_attempts, stage_started FROM jobs "
+                "WHERE id = ? AND lease_owner = ? AND state IN (?, ?)",
+                (job_id, worker, *ACTIVE_STATES),
+            ).fetchone()
+            if row is None:
+                logger.warning(f"Job {job_id} is no longer held by {worker}")
+                return None
+            conn.execute(
+                "INSERT INTO stage_times (job_id, attempt, stage, seconds) "
+                "VALUES (?, ?, ?, ?)",
+                (job_id, row["attempts"], row["state"], now - row["stage_started"]),
+            )
+
+            next_attempt = 0.0
+            if new_state is None:
+                new_state = "failed"
+                if row["attempts"] < row["max_attempts"]:
+                    new_state = "pending"
+                    backoff = self.backoff_seconds * 2 ** (row["attempts"] - 1)
+                    next_attempt = now + backoff
+            if new_state in ACTIVE_STATES:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, stage_started = ?, updated = ? "
+                    "WHERE id = ?",
+                    (new_state, now, now, job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, next_attempt = ?, error = ?, "
+                    "lease_owner = NULL, lease_expires = NULL, updated = ? "
+                    "WHERE id = ?",
+                    (new_state, next_attempt, error, now, job_id),
+                )
+            return new_state
+
+    def _get(self, conn: sqlite3.Connection, job_id: int) -> Job | None:
+        """Read a job and the stage timings of its last attempt."""
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        timings = {
+            time_row["stage"]: time_row["seconds"]
+            for time_row in conn.execute(
+                "SELECT stage, seconds FROM stage_times "
+                "WHERE job_id = ? AND attempt = ?",
+                (job_id, row["attempts"]),
+            )
+        }
+        return Job(
+            row["id"],
+            row["queue"],
+            row["audio_path"],
+            row["output_path"] or None,
+            row["model"],
+            json.loads(row["options"]),
+            row["priority"],
+            row["state"],
+            row["attempts"],
+            row["max_attempts"],
+            row["error"],
+            timings,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating it if needed."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Transactions are explicit (see _transaction)
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # Readers do not block the writer (and the other way round)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Yield a connection inside a write transaction, committed on exit."""
+        with closing(self._connect()) as conn:
+            # Take the write lock now: two workers must not claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+
+def _is_dead_local_owner(owner: str | None, host: str) -> bool:
+    """Whether a lease owner is a process of this machine that no longer runs."""
+    if not owner or os.name == "nt":
+        # On Windows os.kill would terminate the process instead of probing it
+        return False
+    owner_host, _, pid = owner.rpartition(":")
+    if owner_host != host or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # It exists but belongs to another user
+        return False
+    return False
+
+
+@contextmanager
+def tracked_job(audio_path: str, queue: str = "gui", **fields):
+    """Record a job that this process runs right away.
+
+    The job is submitted and taken at once. The block receives a function
+    that moves it to another stage (`set_stage("transcribing")`). The job is
+    done when the block ends and failed (without retries) if it raises. If
+    another live process holds the same job, nothing is recorded.
+    """
+    job_queue = JobQueue()
+    worker = worker_id()
+    job_id = job_queue.submit(
+        audio_path, queue=queue, max_attempts=1, force=True, **fields
+    )
+    job = job_queue.claim(worker, queue, job_id=job_id)
+    if job is None:
+        yield lambda stage: False
+        return
+    try:
+        with job_queue.keep_leases(worker) as held:
+            held.add(job.id)
+            yield lambda stage: job_queue.set_stage(job.id, worker, stage)
+    except BaseException as e:
+        job_queue.fail(job.id, worker, f"{type(e).__name__}: {e}")
+        raise
+    job_queue.complete(job.id, worker)
+
+
+def main(argv: list | None = None) -> int:
+    """Command line entry point: show or retry the jobs of the queue."""
+    parser = argparse.ArgumentParser(description="Transcription job queue")
+    parser.add_argument("--queue", help="Only this queue (batch, gui...)")
+    parser.add_argument("--list", choices=STATES, help="List the jobs in a state")
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="Queue failed jobs again"
+    )
+    args = parser.parse_args(argv)
+    job_queue = JobQueue()
+
+    if args.retry_failed:
+        logger.info(f"{job_queue.retry_failed(args.queue)} failed jobs queued again")
+    if args.list:
+        for job in job_queue.jobs(args.queue, args.list):
+            timings = ", ".join(f"{k} {v:.1f}s" for k, v in job.timings.items())
+            logger.info(
+                f"[{job.id}] {job.audio_path} (attempt {job.attempts}/"
+                f"{job.max_attempts}) {timings} {job.error or ''}".rstrip()
+            )
+    counts = job_queue.counts(args.queue)
+    logger.info(", ".join(f"{state}: {n}" for state, n in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# src/transcription/language.py
+
+"""Spoken language identification for transcription jobs.
+
+The language is detected once per recording on the 30 seconds with the most
+speech, which costs a single encoder pass and one decoder step. The answer is
+cached by audio hash and passed to the full decode, so Whisper never has to
+detect it again.
+"""
+
+import os
+
+import numpy as np
+
+from logger import get_logger
+
+from .cache import global_cache, make_key
+from .inference import backend_options, detect_language_samples
+from .model_registry import get_default_dtype
+
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Value of `language` that asks for detection
+AUTO = "auto"
+
+# Seconds of audio used for detection (one Whisper window)
+EXCERPT_SECONDS = 30.0
+
+
+def get_default_language() -> str:
+    """Return the language used when a job does not choose one."""
+    return os.environ.get("AUDIO_APP_LANGUAGE", "es").strip().lower() or "es"
+
+
+def speech_excerpt(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    seconds: float = EXCERPT_SECONDS,
+    frame_seconds: float = 0.02,
+) -> np.ndarray:
+    """Return the `seconds`-long window of `audio` with the most active frames.
+
+    Frames are active when their energy is well above the noise floor of the
+    recording, so long silences, intros and outros are skipped.
+    """
+    length = int(seconds * sample_rate)
+    if len(audio) <= length:
+        return audio
+
+    frame = max(1, int(frame_seconds * sample_rate))
+    n_frames = len(audio) // frame
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    energy = np.einsum("ij,ij->i", frames, frames) / frame
+
+    floor, peak = np.percentile(energy, [10, 90])
+    active = energy > floor + 0.1 * (peak - floor)
+
+    window = length // frame
+    counts = np.concatenate(([0], np.cumsum(active, dtype=np.int64)))
+    start = int(np.argmax(counts[window:] - counts[:-window])) * frame
+    return audio[start : start + length]
+
+
+def detect_language(
+    audio: np.ndarray,
+    model: str = "small",
+    digest: str | None = None,
+    backend: str | None = None,
+) -> str:
+    """Detect the spoken language of `audio` with the Whisper `model`.
+
+    With `digest` (the audio fingerprint) the answer is cached on disk.
+    `backend` is the inference backend (None for the default one).
+    """
+    key = None
+    if digest is not None:
+        key = make_key(
+            digest,
+            model,
+            task="language-id",
+            dtype=get_default_dtype(),
+            **backend_options(backend),
+        )
+        record = global_cache.get(key)
+        if record is not None:
+            logger.info(f"Language found in cache: {record['language']}")
+            return record["language"]
+
+    excerpt = speech_excerpt(audio)
+    language, probability = detect_language_samples(excerpt, model, backend)
+    logger.info(f"Detected language: {language} ({probability:.0%})")
+
+    if key is not None:
+        global_cache.put(key, {"language": language, "probability": probability})
+    return language
+
+
+def resolve_language(
+    language: str | None,
+    audio: np.ndarray,
+    model: str,
+    digest: str | None = None,
+    backend: str | None = None,
+) -> str:
+    """Return the language code to decode with.
+
+    None means the default language (AUDIO_APP_LANGUAGE, "es" if unset) and
+    "auto" detects it from the audio.
+    """
+    language = (language or get_default_language()).strip().lower()
+    if language != AUTO:
+        return language
+    return detect_language(audio, model, digest, backend)
+
@@ -0,0 +1,320 @@
+# src/transcription/live.py
+
+"""Live transcription of a recording while the user is still talking.
+
+The recorder hands every block it writes to disk to a `LiveTranscriber`,
+whose thread sends the audio not committed yet (a sliding window of at most
+WINDOW_SECONDS) to the transcription worker process about once a second.
+The window is decoded there with the worker's threads and its warm model,
+and the segments come back to the thread. Segments that end well before the end of
+the window will not change any more and are committed; the rest of the
+window is tentative text, shown until a later decode confirms or corrects it.
+The window then starts again one second before the end of the committed
+text, so a word cut by the previous window is heard whole.
+
+When the recording stops only the last window is left to decode, so the
+final text is ready a moment after STOP. A slow machine would fall further
+behind the longer the user talks, so by default the decoding settings follow
+the lag (see `backpressure`).
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import NamedTuple
+
+import numpy as np
+
+from logger import get_logger
+
+from .backpressure import LagController, LiveSettings, degradation_levels
+from .inference import backend_options, transcribe_samples
+from .language import AUTO, resolve_language
+from .longform import PROMPT_WORDS, SAMPLE_RATE, merge_overlap
+from .model_registry import global_registry
+from .resources import ensure_plan
+from .segments import join_segments, segments_from_result
+from .vad import SpeechMap, detect_speech
+from .worker import global_worker
+
+
+logger = get_logger(__name__)
+
+# Longest audio decoded at once; a full window commits all but its last segment
+WINDOW_SECONDS = 10.0
+
+# New audio that triggers the next decode
+STEP_SECONDS = 1.0
+
+# Segments ending this close to the end of the window are still tentative
+STABLE_MARGIN_SECONDS = 2.0
+
+# Audio before the committed end decoded again, for a word cut at the seam
+OVERLAP_SECONDS = 1.0
+
+# Seconds the thread waits for new audio before checking again
+POLL_SECONDS = 0.1
+
+
+class LiveUpdate(NamedTuple):
+    """Text of a live transcription after one decode."""
+
+    committed: str
+    tentative: str
+    segments: list
+    final: bool
+    lag: float = 0.0
+    rtf: float | None = None
+
+
+class LiveTranscriber:
+    """Transcribes audio fed in blocks on a background thread."""
+
+    def __init__(
+        self,
+        model: str = "small",
+        *,
+        language: str | None = None,
+        backend: str | None = None,
+        on_update: Callable[[LiveUpdate], None] | None = None,
+        window_seconds: float = WINDOW_SECONDS,
+        step_seconds: float = STEP_SECONDS,
+        adaptive: bool = True,
+        worker=None,
+    ):
+        """Prepare a live job; `feed` audio and `start` the thread.
+
+        `on_update` is called from the thread after every decode that
+        changed the text. `language` ("auto" included) is resolved from the
+        first window. With `adaptive`, cheaper settings are used while the
+        text lags behind the recording. Windows are decoded in `worker`
+        (the global transcription worker by default).
+        """
+        self.model = model
+        self.worker = worker or global_worker
+        self.language = language
+        self.backend = backend
+        self.on_update = on_update
+        self.controller = None
+        if adaptive:
+            self.controller = LagController(
+                degradation_levels(model, window_seconds, step_seconds)
+            )
+        self._fixed = LiveSettings(
+            model, "default", window_seconds, step_seconds, False
+        )
+        self.committed = ""
+        self.tentative = ""
+        self.segments = []
+        self.lag = 0.0
+        self.rtf = None
+        self.error = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._blocks = deque()
+        self._queued = 0
+        # Samples not committed yet and the time of the first one
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._offset = 0.0
+        self._committed_end = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def settings(self) -> LiveSettings:
+        """Model, decoding profile, window and VAD used by the next decode."""
+        return self.controller.settings if self.controller else self._fixed
+
+    def metrics(self) -> dict:
+        """Return the lag, the audio waiting, the real-time factor and settings."""
+        return {
+            "lag": self.lag,
+            "backlog": self._queued / SAMPLE_RATE,
+            "rtf": self.rtf,
+            "level": self.controller.level if self.controller else 0,
+            **self.settings._asdict(),
+        }
+
+    def feed(self, samples: np.ndarray) -> None:
+        """Queue 16 kHz mono samples (thread-safe, e.g. from the recorder)."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        with self._lock:
+            self._blocks.append(samples)
+            self._queued += len(samples)
+
+    def start(self) -> None:
+        """Start decoding in the background."""
+        self._thread.start()
+
+    def finish(self) -> str:
+        """Decode the audio left, commit all the text and return it.
+
+        Call it once no more audio will be fed. Raises RuntimeError if
+        decoding failed.
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        else:
+            self._step(final=True)
+        if self.error is not None:
+            raise RuntimeError(f"Live transcription failed: {self.error}")
+        return self.committed
+
+    def cancel(self) -> None:
+        """Stop after the current decode, leaving the rest of the audio."""
+        self._cancelled = True
+        self._stop.set()
+
+    def _run(self) -> None:
+        """Decode every STEP_SECONDS of new audio until the recording stops."""
+        try:
+            while not self._stop.is_set():
+                if self._queued >= self.settings.step_seconds * SAMPLE_RATE:
+                    self._step(final=False)
+                else:
+                    self._stop.wait(POLL_SECONDS)
+            if not self._cancelled:
+                self._step(final=True)
+        except Exception as e:
+            logger.exception(f"Error in live transcription: {e}")
+            self.error = e
+
+    def _step(self, final: bool) -> None:
+        """Decode the window, commit its stable segments and slide it."""
+        settings = self.settings
+        # A decode never takes more than a window: the rest waits its turn
+        limit = None if final else int(settings.window_seconds * SAMPLE_RATE)
+        new_seconds = self._take_audio(limit)
+        end = self._offset + len(self._audio) / SAMPLE_RATE
+        if not len(self._audio):
+            if final:
+                self._publish([], final)
+            return
+
+        window = end - self._offset
+        prompt = " ".join(self.committed.split()[-PROMPT_WORDS:]) or None
+        self.language, segments, decode_seconds, loaded = self.worker.call(
+            _decode_window, self._audio, settings, self.language, self.backend, prompt
+        )
+        # Segments that start in the overlap were committed already
+        segments = [
+            s._replace(start=s.start + self._offset, end=s.end + self._offset)
+            for s in segments
+            if (s.start + s.end) / 2 + self._offset >= self._committed_end
+        ]
+
+        if final:
+            stable = segments
+        else:
+            stable = [s for s in segments if s.end <= end - STABLE_MARGIN_SECONDS]
+            if not stable and window >= settings.window_seconds:
+                # A full window must move on even while the speaker does not pause
+                stable = segments[:-1] or segments
+        pending = segments[len(stable) :]
+
+        if stable:
+            self.committed = merge_overlap(self.committed, join_segments(stable))
+            self.segments += stable
+            self._committed_end = stable[-1].end
+        # Leave room for the next step, so that a full window always slides
+        keep = settings.window_seconds - settings.step_seconds
+        cut = max(self._committed_end - OVERLAP_SECONDS, end - keep)
+        if cut > self._offset:
+            self._audio = self._audio[int((cut - self._offset) * SAMPLE_RATE) :]
+            self._offset = cut
+
+        tentative = ""
+        if pending and not final:
+            # Without the words the overlap repeats from the committed text
+            merged = merge_overlap(self.committed, join_segments(pending))
+            tentative = merged[len(self.committed) :].strip()
+        logger.debug(
+            f"Live window of {window:.1f}s decoded in "
+            f"{decode_seconds:.1f}s: {len(stable)} segments committed"
+        )
+
+        # Audio captured while decoding counts too; silence that left the
+        # window is done even though it committed nothing
+        settled = max(self._committed_end, self._offset)
+        self.lag = end + self._queued / SAMPLE_RATE - settled
+        if self.controller is not None and not final:
+            # The first decode with a model also loads it: not a measure of speed
+            self.controller.observe(
+                self.lag, decode_seconds if loaded else None, new_seconds
+            )
+            self.rtf = self.controller.rtf
+        elif loaded and new_seconds:
+            self.rtf = decode_seconds / new_seconds
+        if stable or final or tentative != self.tentative:
+            self.tentative = tentative
+            self._publish(stable, final)
+
+    def _take_audio(self, limit: int | None) -> float:
+        """Move queued audio to the window, up to `limit` samples in all.
+
+        Returns the seconds of audio moved.
+        """
+        taken = []
+        with self._lock:
+            room = None if limit is None else limit - len(self._audio)
+            while self._blocks and (room is None or room > 0):
+                block = self._blocks.popleft()
+                if room is not None:
+                    if len(block) > room:
+                        self._blocks.appendleft(block[room:])
+                        block = block[:room]
+                    room -= len(block)
+                taken.append(block)
+            moved = sum(len(block) for block in taken)
+            self._queued -= moved
+        self._audio = np.concatenate([self._audio, *taken])
+        return moved / SAMPLE_RATE
+
+    def _publish(self, segments: list, final: bool) -> None:
+        """Pass the current text to the `on_update` callback."""
+        if self.on_update is not None:
+            self.on_update(
+                LiveUpdate(
+                    self.committed,
+                    self.tentative,
+                    segments,
+                    final,
+                    self.lag,
+                    self.rtf,
+                )
+            )
+
+
+def _decode_window(
+    audio: np.ndarray,
+    settings: LiveSettings,
+    language: str | None,
+    backend: str | None,
+    prompt: str | None,
+) -> tuple:
+    """Transcribe one live window (run in the worker process).
+
+    Returns (language, segments with times from the start of the window,
+    decode seconds, whether the model was loaded before this decode).
+    """
+    ensure_plan()
+    loaded = global_registry.is_loaded(settings.model, backend=backend)
+    started = time.perf_counter()
+    if language is None or language == AUTO:
+        language = resolve_language(language, audio, settings.model, None, backend)
+    options = {"language": language, **settings.options, **backend_options(backend)}
+    if prompt:
+        options["initial_prompt"] = prompt
+
+    segments, speech_map = [], None
+    if settings.vad:
+        speech_map = SpeechMap(detect_speech(audio), len(audio), SAMPLE_RATE)
+        audio = speech_map.compress(audio)
+    if len(audio):
+        result = transcribe_samples(audio, settings.model, options)
+        segments = segments_from_result(result, 0.0, len(audio) / SAMPLE_RATE)
+        if speech_map is not None:
+            segments = [speech_map.map_segment(s) for s in segments]
+    return language, segments, time.perf_counter() - started, loaded
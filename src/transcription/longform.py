@@ -0,0 +1,313 @@
+# src/transcription/longform.py
+
+"""Long-form transcription by splitting audio into bounded chunks.
+
+Audio is cut at the quietest point near each chunk boundary, every chunk is
+transcribed under its own deadline and the texts are stitched back together,
+removing the words repeated in the overlap between neighbouring chunks.
+Chunks run in this process, on its warm model; the backend stops a decode
+that exceeds its deadline, so the chunk is skipped without holding the CPU
+and the model while the next ones run.
+"""
+
+import functools
+import multiprocessing
+import re
+import threading
+import time
+
+import numpy as np
+
+from logger import get_logger
+
+from .inference import transcribe_samples
+from .resources import plan_threads
+from .worker import TranscriptionCancelled, TranscriptionTimeout, TranscriptionWorker
+
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Words of the previous chunk passed as prompt to keep the context
+PROMPT_WORDS = 50
+
+
+def find_chunks(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    max_seconds: float = 30.0,
+    search_seconds: float = 5.0,
+    overlap_seconds: float = 1.0,
+    frame_seconds: float = 0.02,
+) -> list:
+    """Return (start, end) sample ranges of at most `max_seconds` each.
+
+    Every cut is placed at the lowest-energy frame of the last `search_seconds`
+    before the maximum length, so chunks end in silence whenever there is any.
+    Chunks after the first start `overlap_seconds` before the cut so a word
+    split by the cut still appears whole in one of them.
+    """
+    total = len(audio)
+    max_len = int(max_seconds * sample_rate)
+    if total <= max_len:
+        return [(0, total)]
+
+    frame = max(1, int(frame_seconds * sample_rate))
+    n_frames = total // frame
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    # Mean power per frame without a squared copy of the whole signal
+    energy = np.einsum("ij,ij->i", frames, frames) / frame
+
+    overlap = int(overlap_seconds * sample_rate)
+    search = max(frame, int(search_seconds * sample_rate))
+
+    chunks = []
+    start = 0
+    while total - start > max_len:
+        window_start = (start + max_len - search) // frame
+        window_end = (start + max_len) // frame
+        cut = (window_start + int(np.argmin(energy[window_start:window_end]))) * frame
+        if cut <= start:
+            cut = start + max_len
+        chunks.append((max(0, start - overlap) if chunks else start, cut))
+        start = cut
+    chunks.append((max(0, start - overlap), total))
+    return chunks
+
+
+def merge_overlap(previous: str, following: str, max_words: int = 10) -> str:
+    """Append `following` to `previous`, dropping words repeated at the seam."""
+    if not previous:
+        return following
+    if not following:
+        return previous
+
+    prev_words = previous.split()
+    next_words = following.split()
+    prev_norm = [_normalize(w) for w in prev_words[-max_words:]]
+    next_norm = [_normalize(w) for w in next_words[:max_words]]
+
+    for size in range(min(len(prev_norm), len(next_norm)), 0, -1):
+        if prev_norm[-size:] == next_norm[:size]:
+            next_words = next_words[size:]
+            break
+
+    return " ".join(prev_words + next_words)
+
+
+def transcribe_long(
+    audio: np.ndarray,
+    transcribe_chunk,
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    max_chunk_seconds: float = 30.0,
+    chunk_timeout: float | None = None,
+    workers: list | None = None,
+    on_failure=None,
+    cancel_event: threading.Event | None = None,
+) -> str:
+    """Transcribe long audio chunk by chunk and stitch the texts.
+
+    `transcribe_chunk(samples, prompt)` returns the text of one chunk. Without
+    `workers` (chunks run in this process) or with a single one, the chunks
+    run one after the other and each one receives the end of the previous
+    text as prompt; with several `TranscriptionWorker`s they run in parallel
+    without prompt. `transcribe_chunk` is then sent to the workers, so it
+    must be picklable.
+
+    A chunk that exceeds `chunk_timeout` seconds is skipped. In this process
+    `transcribe_chunk` also receives a `deadline` keyword (a
+    `time.monotonic()` value) and must stop with `TranscriptionTimeout` once
+    it passes; in a worker the chunk is killed with the worker process, which
+    respawns for the next chunk. `on_failure(index)` is called for every
+    chunk that failed or timed out, whose text is missing from the result.
+    Once `cancel_event` is set the whole job stops with
+    TranscriptionCancelled; it is not passed to `transcribe_chunk`.
+    """
+    chunks = find_chunks(audio, sample_rate, max_seconds=max_chunk_seconds)
+    logger.info(
+        f"Long-form transcription: {len(audio) / sample_rate:.0f}s of audio "
+        f"in {len(chunks)} chunks"
+    )
+
+    texts = [""] * len(chunks)
+    if not workers or len(workers) == 1:
+        worker = workers[0] if workers else None
+        prompt = None
+        for index, (start, end) in enumerate(chunks):
+            text = _run_chunk(
+                worker,
+                transcribe_chunk,
+                audio[start:end],
+                prompt,
+                chunk_timeout,
+                index,
+                cancel_event,
+            )
+            if text is None and on_failure is not None:
+                on_failure(index)
+            texts[index] = text or ""
+            if text:
+                prompt = " ".join(text.split()[-PROMPT_WORDS:])
+    else:
+        pending = iter(enumerate(chunks))
+        lock = threading.Lock()
+        cancelled = []
+
+        def drain(worker):
+            # Every worker takes the next chunk as soon as it is free
+            while True:
+                with lock:
+                    index, (start, end) = next(pending, (None, (0, 0)))
+                if index is None:
+                    return
+                try:
+                    text = _run_chunk(
+                        worker,
+                        transcribe_chunk,
+                        audio[start:end],
+                        None,
+                        chunk_timeout,
+                        index,
+                        cancel_event,
+                    )
+                except TranscriptionCancelled as e:
+                    cancelled.append(e)
+                    return
+                if text is None and on_failure is not None:
+                    on_failure(index)
+                texts[index] = text or ""
+
+        threads = [
+            threading.Thread(target=drain, args=(worker,), daemon=True)
+            for worker in workers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if cancelled:
+            raise cancelled[0]
+
+    result = ""
+    for text in texts:
+        result = merge_overlap(result, text.strip())
+    return result
+
+
+def make_chunk_transcriber(
+    model: str, options: dict, cancel_event: threading.Event | None = None
+):
+    """Return a chunk callable that uses the in-process model registry.
+
+    A set `cancel_event` stops the decode of the current chunk.
+    """
+
+    def transcribe_chunk(
+        samples: np.ndarray, prompt: str | None, deadline: float | None = None
+    ) -> str:
+        kwargs = dict(options)
+        if prompt:
+            kwargs["initial_prompt"] = prompt
+        result = transcribe_samples(
+            samples, model, kwargs, deadline=deadline, cancel_event=cancel_event
+        )
+        return result.get("text", "").strip()
+
+    return transcribe_chunk
+
+
+def transcribe_long_form(
+    audio: np.ndarray,
+    model: str,
+    options: dict,
+    workers: int = 1,
+    chunk_timeout: float | None = None,
+    on_failure=None,
+    cancel_event: threading.Event | None = None,
+) -> str:
+    """Transcribe long audio with a model, in this process or in workers.
+
+    Chunks run one after the other in this process, with the model of its
+    registry, unless more than one worker is requested. Then they run in
+    parallel in `workers` worker processes, which load the model once. A
+    daemonic process (the transcription worker) cannot start processes, so
+    there the chunks always run in this process. `on_failure` and
+    `cancel_event` are passed to `transcribe_long`.
+    """
+    if workers > 1 and multiprocessing.current_process().daemon:
+        logger.warning(
+            f"Cannot start {workers} chunk workers from a daemonic process, "
+            "transcribing the chunks one by one"
+        )
+        workers = 1
+    if workers <= 1:
+        return transcribe_long(
+            audio,
+            make_chunk_transcriber(model, options, cancel_event),
+            chunk_timeout=chunk_timeout,
+            on_failure=on_failure,
+            cancel_event=cancel_event,
+        )
+
+    chunk_workers = [
+        TranscriptionWorker(plan=plan_threads(workers, slot)) for slot in range(workers)
+    ]
+    try:
+        return transcribe_long(
+            audio,
+            functools.partial(
+                _transcribe_chunk_in_worker, model=model, options=options
+            ),
+            chunk_timeout=chunk_timeout,
+            workers=chunk_workers,
+            on_failure=on_failure,
+            cancel_event=cancel_event,
+        )
+    finally:
+        for worker in chunk_workers:
+            worker.shutdown()
+
+
+def _transcribe_chunk_in_worker(
+    samples: np.ndarray, prompt: str | None, model: str, options: dict
+) -> str:
+    """Transcribe a chunk inside a worker process."""
+    return make_chunk_transcriber(model, options)(samples, prompt)
+
+
+def _run_chunk(
+    worker, transcribe_chunk, samples, prompt, timeout, index, cancel_event=None
+) -> str | None:
+    """Transcribe one chunk, in `worker` if there is one; None if it fails.
+
+    Cancelling (TranscriptionCancelled) stops the job instead of the chunk.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise TranscriptionCancelled("Transcription cancelled")
+    try:
+        if worker is None:
+            if timeout is None:
+                return transcribe_chunk(samples, prompt)
+            deadline = time.monotonic() + timeout
+            return transcribe_chunk(samples, prompt, deadline=deadline)
+        return worker.call(
+            transcribe_chunk,
+            samples,
+            prompt,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        )
+    except TranscriptionCancelled:
+        raise
+    except TranscriptionTimeout:
+        logger.error(f"Chunk {index + 1} exceeded its deadline ({timeout}s), skipped")
+    except Exception as e:
+        logger.error(f"Chunk {index + 1} failed: {e}")
+    return None
+
+
+def _normalize(word: str) -> str:
+    """Lowercase a word and strip its punctuation for comparisons."""
+    return re.sub(r"[^\w]", "", word.lower())
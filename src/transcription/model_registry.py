@@ -0,0 +1,271 @@
+# src/transcription/model_registry.py
+
+"""Process-wide registry of loaded Whisper models.
+
+Models are kept in memory keyed by (name, device, dtype, backend) so that
+consecutive transcriptions reuse them instead of deserializing the checkpoint
+again. When the estimated memory of the loaded models exceeds the configured
+budget, the least recently used models that are not in use are evicted.
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from logger import get_logger
+
+from .backends import get_backend
+
+
+logger = get_logger(__name__)
+
+# "int8" is a dynamically quantized model for CPU inference
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+# RAM budget for loaded models, configurable with AUDIO_APP_MODEL_MEMORY_MB
+DEFAULT_MAX_BYTES = int(
+    float(os.environ.get("AUDIO_APP_MODEL_MEMORY_MB", "3072")) * 1024 * 1024
+)
+
+
+def get_default_dtype() -> str:
+    """Return the precision used when none is requested.
+
+    Configurable with AUDIO_APP_MODEL_DTYPE (float32, float16 or int8).
+    """
+    return os.environ.get("AUDIO_APP_MODEL_DTYPE", "float32").strip() or "float32"
+
+
+class _Entry:
+    """Slot of the registry for a single model."""
+
+    def __init__(self):
+        self.model = None
+        self.size = 0
+        self.load_seconds = 0.0
+        self.error = None
+        self.users = 0
+        self.loaded = threading.Event()
+        # Whisper installs hooks on the model while decoding, so inference on
+        # the same instance must be serialized.
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Thread-safe LRU cache of loaded Whisper models."""
+
+    def __init__(self, max_bytes: int | None = None):
+        """Initialize an empty registry with a memory budget in bytes."""
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+
+    @contextmanager
+    def acquire(
+        self,
+        name: str,
+        device: str | None = None,
+        dtype: str | None = None,
+        backend: str | None = None,
+    ):
+        """Yield a loaded model with exclusive use for the duration of the block.
+
+        The model is loaded on first use. Without `dtype` the default precision
+        (`get_default_dtype`) is used, and without `backend` the default
+        inference backend. While the block runs the model cannot be evicted
+        and no other thread can run inference on it.
+        """
+        entry = self._checkout(name, device, dtype, backend)
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            self._release(entry)
+
+    def get(
+        self,
+        name: str,
+        device: str | None = None,
+        dtype: str | None = None,
+        backend: str | None = None,
+    ):
+        """Return a loaded model, loading it if necessary.
+
+        Unlike `acquire`, the model is not reserved for the caller.
+        """
+        entry = self._checkout(name, device, dtype, backend)
+        self._release(entry)
+        return entry.model
+
+    def is_loaded(
+        self,
+        name: str,
+        device: str | None = None,
+        dtype: str | None = None,
+        backend: str | None = None,
+    ) -> bool:
+        """Whether a model is resident, so using it costs no loading time."""
+        key = (name, device, dtype or get_default_dtype(), get_backend(backend).name)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.loaded.is_set()
+
+    def evict(
+        self,
+        name: str,
+        device: str | None = None,
+        dtype: str | None = None,
+        backend: str | None = None,
+    ):
+        """Remove a model from the registry if it is not in use."""
+        key = (name, device, dtype or get_default_dtype(), get_backend(backend).name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.users or not entry.loaded.is_set():
+                return False
+            del self._entries[key]
+            self._evictions += 1
+        gc.collect()
+        logger.info(f"Evicted Whisper model ({name})")
+        return True
+
+    def clear(self) -> None:
+        """Forget every loaded model and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._load_seconds = 0.0
+        gc.collect()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters, load times and resident models."""
+        with self._lock:
+            loaded = {
+                key: {"bytes": e.size, "load_seconds": e.load_seconds}
+                for key, e in self._entries.items()
+                if e.loaded.is_set()
+            }
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "load_seconds": self._load_seconds,
+                "resident_bytes": sum(m["bytes"] for m in loaded.values()),
+                "max_bytes": self.max_bytes,
+                "models": loaded,
+            }
+
+    def _checkout(
+        self, name: str, device: str | None, dtype: str | None, backend: str | None
+    ) -> _Entry:
+        """Return the entry for a key with one more user, loading it if needed."""
+        dtype = dtype or get_default_dtype()
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported model dtype: {dtype}")
+        engine = get_backend(backend)
+
+        key = (name, device, dtype, engine.name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.users += 1
+                self._hits += 1
+                must_load = False
+            else:
+                entry = _Entry()
+                entry.users = 1
+                self._entries[key] = entry
+                self._misses += 1
+                must_load = True
+
+        if not must_load:
+            # Another thread may still be loading it
+            entry.loaded.wait()
+            if entry.error is not None:
+                self._release(entry)
+                raise RuntimeError(
+                    f"Could not load Whisper model ({name}): {entry.error}"
+                ) from entry.error
+            return entry
+
+        logger.info(f"Loading Whisper model ({name}, {engine.name} backend)...")
+        start = time.perf_counter()
+        try:
+            model = engine.load(name, device, dtype)
+        except BaseException as e:
+            with self._lock:
+                entry.error = e
+                entry.users -= 1
+                self._entries.pop(key, None)
+            entry.loaded.set()
+            raise
+
+        entry.model = model
+        entry.size = engine.model_bytes(model)
+        entry.load_seconds = time.perf_counter() - start
+        entry.loaded.set()
+        logger.info(
+            f"Whisper model ({name}) loaded in {entry.load_seconds:.2f}s "
+            f"({entry.size / (1024 * 1024):.0f} MB)"
+        )
+
+        with self._lock:
+            self._load_seconds += entry.load_seconds
+            evicted = self._evict_over_budget()
+        if evicted:
+            gc.collect()
+            logger.info(f"Evicted Whisper models to fit the budget: {evicted}")
+        return entry
+
+    def _release(self, entry: _Entry) -> None:
+        """Drop one user of an entry."""
+        with self._lock:
+            entry.users -= 1
+
+    def _evict_over_budget(self) -> list:
+        """Evict least recently used idle models until within the budget.
+
+        Must be called with the registry lock held.
+        """
+        resident = sum(e.size for e in self._entries.values() if e.loaded.is_set())
+        evicted = []
+        for key in list(self._entries):
+            if resident <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if entry.users or not entry.loaded.is_set():
+                continue
+            del self._entries[key]
+            resident -= entry.size
+            self._evictions += 1
+            evicted.append(key[0])
+        return evicted
+
+
+# Global registry shared by the whole process
+global_registry = ModelRegistry()
+
+
+def acquire_model(
+    name: str,
+    device: str | None = None,
+    dtype: str | None = None,
+    backend: str | None = None,
+):
+    """Reserve a model of the global registry (context manager)."""
+    return global_registry.acquire(name, device=device, dtype=dtype, backend=backend)
+
+
+def get_model_stats() -> dict:
+    """Return the statistics of the global registry."""
+    return global_registry.stats()
@@ -0,0 +1,111 @@
+# src/transcription/quantize.py
+
+"""Int8 dynamically quantized Whisper models for CPU inference.
+
+The weights of every linear layer are stored as int8 and the activations are
+quantized on the fly, which makes the matrix products (most of the decoding
+time on CPU) cheaper and the model about 2-4x smaller in RAM. Quantizing takes
+a while, so the result is saved on disk and reused by later loads.
+"""
+
+import os
+import tempfile
+import warnings
+from contextlib import suppress
+
+import torch
+import whisper
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Bump to invalidate quantized models saved by older code
+FORMAT_VERSION = 1
+
+
+def get_model_cache_dir() -> str:
+    """Return the folder of the quantized models."""
+    default = os.path.join(
+        os.path.expanduser("~"), ".cache", "audio_transcription", "models"
+    )
+    return os.environ.get("AUDIO_APP_MODEL_CACHE_DIR", default)
+
+
+def quantized_model_path(name: str) -> str:
+    """Return the file of the quantized version of a model."""
+    return os.path.join(get_model_cache_dir(), f"{name}-int8.pt")
+
+
+def quantize_model(model):
+    """Quantize the linear layers of a Whisper model to int8 (in place)."""
+    # Whisper's Linear only adds a dtype cast to nn.Linear, but quantization
+    # only converts exact nn.Linear instances
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return torch.ao.quantization.quantize_dynamic(
+            model.cpu(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+
+
+def load_quantized_model(name: str):
+    """Return the int8 version of a model, quantizing and saving it only once."""
+    path = quantized_model_path(name)
+    model = _load_saved(path)
+    if model is not None:
+        return model
+
+    logger.info(f"Quantizing Whisper model ({name}) to int8...")
+    model = quantize_model(whisper.load_model(name, device="cpu"))
+    _save(model, path)
+    return model
+
+
+def _versions() -> dict:
+    """Versions that must match for a saved quantized model to be reused."""
+    return {
+        "format": FORMAT_VERSION,
+        "torch": torch.__version__,
+        "whisper": getattr(whisper, "__version__", ""),
+    }
+
+
+def _load_saved(path: str):
+    """Load a quantized model saved by `_save`, or None if unusable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        # The file holds pickled modules, written by this application
+        saved = torch.load(path, map_location="cpu", weights_only=False)
+    except Exception as e:
+        logger.warning(f"Unreadable quantized model {path}: {e}")
+        return None
+
+    if not isinstance(saved, dict) or saved.get("versions") != _versions():
+        logger.info(f"Quantized model {path} is outdated, quantizing again")
+        return None
+    logger.debug(f"Loaded quantized model: {path}")
+    return saved["model"]
+
+
+def _save(model, path: str) -> None:
+    """Write a quantized model atomically (errors are only logged)."""
+    directory = os.path.dirname(path)
+    temp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            torch.save({"versions": _versions(), "model": model}, f)
+        os.replace(temp_path, path)
+        logger.info(f"Quantized model saved: {path}")
+    except Exception as e:
+        logger.warning(f"Could not save the quantized model: {e}")
+        if temp_path is not None:
+            with suppress(OSError):
+                os.remove(temp_path)
@@ -0,0 +1,183 @@
+# src/transcription/resources.py
+
+"""CPU threads and affinity of the processes that run inference.
+
+Torch, OpenMP and MKL size their thread pools to every core of the machine in
+each process, so two transcriptions running at once (the GUI worker and a
+recording, or several batch workers) each start one thread per core and
+spend their time switching instead of computing. Every process that runs
+inference applies a `ThreadPlan` from this module instead, which splits the
+cores among the configured number of concurrent jobs.
+
+- AUDIO_APP_CONCURRENT_JOBS: jobs expected to run at once (default 1).
+- AUDIO_APP_CPU_AFFINITY=1: also pin every job to its own block of cores.
+"""
+
+import os
+import sys
+from contextlib import contextmanager, suppress
+from typing import NamedTuple
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Thread pool variables read by OpenMP, MKL and OpenBLAS when they start
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Smaller machines give every core to inference instead of reserving one
+RESERVE_MIN_CPUS = 4
+
+# Plan applied to this process (None until `apply_plan` is called)
+_current_plan = None
+
+
+class ThreadPlan(NamedTuple):
+    """Threads (and optionally cores) granted to one inference process."""
+
+    intra_op_threads: int
+    inter_op_threads: int = 1
+    cpus: tuple | None = None
+
+
+def get_concurrent_jobs() -> int:
+    """Return the number of jobs expected to run at once."""
+    try:
+        return max(1, int(os.environ.get("AUDIO_APP_CONCURRENT_JOBS", "1")))
+    except ValueError:
+        return 1
+
+
+def affinity_enabled() -> bool:
+    """Whether jobs are pinned to their cores (AUDIO_APP_CPU_AFFINITY=1)."""
+    return os.environ.get("AUDIO_APP_CPU_AFFINITY", "0") == "1"
+
+
+def available_cpus() -> list:
+    """Return the cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_threads(
+    jobs: int | None = None,
+    slot: int = 0,
+    reserve: int = 0,
+    pin: bool | None = None,
+) -> ThreadPlan:
+    """Return the share of the CPU of job `slot` out of `jobs` concurrent ones.
+
+    `jobs` defaults to AUDIO_APP_CONCURRENT_JOBS. On machines with at least
+    RESERVE_MIN_CPUS cores, `reserve` cores are left for the calling process
+    (e.g. the GUI and the recorder). With `pin` (default AUDIO_APP_CPU_AFFINITY)
+    the plan also assigns the job its own block of cores.
+    """
+    jobs = get_concurrent_jobs() if jobs is None else max(1, jobs)
+    cpus = available_cpus()
+    if reserve and len(cpus) >= RESERVE_MIN_CPUS:
+        cpus = cpus[: len(cpus) - reserve]
+
+    per_job = max(1, len(cpus) // jobs)
+    pinned = None
+    if (affinity_enabled() if pin is None else pin) and per_job * jobs <= len(cpus):
+        start = (slot % jobs) * per_job
+        pinned = tuple(cpus[start : start + per_job])
+    return ThreadPlan(per_job, 1, pinned)
+
+
+def interactive_plan() -> ThreadPlan:
+    """Return the plan of an interactive process (GUI or console).
+
+    A single thread is enough for the interface, the recorder and the audio
+    decoding; it runs on the core that `plan_threads(reserve=1)` leaves free.
+    The process is not pinned, since its workers would inherit the affinity.
+    """
+    return ThreadPlan(1, 1, None)
+
+
+def thread_env(plan: ThreadPlan) -> dict:
+    """Return the environment variables that size the native thread pools."""
+    return {var: str(plan.intra_op_threads) for var in THREAD_ENV_VARS}
+
+
+@contextmanager
+def plan_environment(plan: ThreadPlan):
+    """Set the thread variables of a plan only while the block runs.
+
+    Processes spawned inside the block inherit them from the start, before
+    they import numpy or torch.
+    """
+    previous = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    os.environ.update(thread_env(plan))
+    try:
+        yield
+    finally:
+        for var, value in previous.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def apply_plan(plan: ThreadPlan) -> ThreadPlan:
+    """Apply a plan to this process and the processes it starts later.
+
+    The environment variables only take effect in libraries loaded after this
+    call (and in child processes), so worker processes apply their plan
+    before importing torch. Torch itself is not imported here: if it is not
+    loaded yet, `configure_torch` sizes its pools when a model is loaded.
+    """
+    global _current_plan
+    os.environ.update(thread_env(plan))
+
+    if plan.cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, plan.cpus)
+        except OSError as e:
+            logger.warning(f"Could not pin the process to cores {plan.cpus}: {e}")
+
+    _current_plan = plan
+    configure_torch(plan)
+    logger.debug(
+        f"Thread plan: {plan.intra_op_threads} intra-op / "
+        f"{plan.inter_op_threads} inter-op threads, cores {plan.cpus or 'any'}"
+    )
+    return plan
+
+
+def configure_torch(plan: ThreadPlan | None = None) -> None:
+    """Size the thread pools of torch to a plan (default: the current one).
+
+    Does nothing until torch has been imported by someone else, so that
+    processes which never run a PyTorch model do not pay for loading it.
+    """
+    plan = plan or _current_plan
+    torch = sys.modules.get("torch")
+    if plan is None or torch is None:
+        return
+    torch.set_num_threads(plan.intra_op_threads)
+    # Only possible before the first parallel operation of the process
+    with suppress(RuntimeError):
+        torch.set_num_interop_threads(plan.inter_op_threads)
+
+
+def ensure_plan() -> ThreadPlan:
+    """Apply the default plan to this process unless one is already applied."""
+    if _current_plan is None:
+        return apply_plan(plan_threads())
+    return _current_plan
+
+
+def get_current_plan() -> ThreadPlan | None:
+    """Return the plan applied to this process, if any."""
+    return _current_plan
+
+
+def claim_slot(counter) -> int:
+    """Take the next job slot from a shared `multiprocessing.Value` counter."""
+    with counter.get_lock():
+        slot = counter.value
+        counter.value += 1
+    return slot
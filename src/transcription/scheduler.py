@@ -0,0 +1,437 @@
+# src/transcription/scheduler.py
+
+"""Choice of model and decoding parameters that meets a deadline.
+
+The decode time of a job is predicted from the length of its audio, how much
+of it is speech (silence costs Whisper a fraction of the time, and nothing
+with VAD), the model size and the real-time factor (seconds of decoding per
+second of audio) measured on this host. Given a deadline, the most accurate
+model no larger than the requested one, with the most accurate decoding
+parameters, whose prediction fits in the remaining time is chosen.
+
+Every decoded job updates the measured factor of its model and decoding
+parameters, and models not measured yet are scaled by how fast this host was
+with the others. The predicted and actual time of the last jobs are kept with
+the measurements in one JSON file (AUDIO_APP_SCHEDULER_FILE), updated under
+a lock file so that batch workers do not overwrite each other's results.
+
+Usage (from the `src` folder):
+    python -m transcription.scheduler voicemail.wav --deadline 120
+    python -m transcription.scheduler --history
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, suppress
+from typing import NamedTuple
+
+import numpy as np
+
+from logger import get_logger
+
+from .backends import get_backend
+from .cache import get_cache_dir
+from .model_registry import get_default_dtype, global_registry
+from .vad import detect_speech
+
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+STATE_VERSION = 1
+
+# Standard Whisper sizes, fastest first
+MODEL_SIZES = ("tiny", "base", "small", "medium", "large")
+
+# Seconds of greedy decoding per second of speech on a 4-core CPU
+PRIOR_RTF = {"tiny": 0.04, "base": 0.08, "small": 0.25, "medium": 0.75, "large": 1.5}
+
+# Seconds to load every model from the local checkpoint
+PRIOR_LOAD_SECONDS = {
+    "tiny": 1.0,
+    "base": 1.5,
+    "small": 3.0,
+    "medium": 8.0,
+    "large": 16.0,
+}
+
+# Decoding parameters, most accurate first, and their cost relative to greedy.
+# "default" is Whisper's own: greedy with temperature fallback.
+PROFILE_OPTIONS = {
+    "beam": {"beam_size": 5},
+    "default": {},
+    "greedy": {"temperature": 0.0},
+}
+PROFILE_COST = {"beam": 1.8, "default": 1.15, "greedy": 1.0}
+
+# Cost of a second of silence relative to a second of speech
+SILENCE_WEIGHT = 0.2
+
+# Predictions are stretched by this factor before comparing with the deadline
+SAFETY_MARGIN = 1.25
+
+# Weight of the newest measurement in the moving averages
+LEARNING_RATE = 0.3
+
+# Jobs kept in the history
+HISTORY_JOBS = 100
+
+
+class JobPlan(NamedTuple):
+    """Model and decoding parameters chosen for a job, with their prediction."""
+
+    model: str
+    profile: str
+    options: dict
+    backend: str
+    audio_seconds: float
+    speech_seconds: float
+    predicted_seconds: float
+    deadline: float | None
+    vad: bool = False
+
+
+def get_state_file() -> str:
+    """Return the file of the measurements (AUDIO_APP_SCHEDULER_FILE)."""
+    default = os.path.join(os.path.dirname(get_cache_dir()), "scheduler.json")
+    return os.environ.get("AUDIO_APP_SCHEDULER_FILE", default)
+
+
+def candidate_models(model: str) -> list:
+    """Return `model` and the standard sizes below it, most accurate first.
+
+    English-only models (".en") are replaced by English-only smaller ones.
+    """
+    suffix = ".en" if model.endswith(".en") else ""
+    smaller = MODEL_SIZES[: MODEL_SIZES.index(_size(model))]
+    return [model] + [size + suffix for size in reversed(smaller)]
+
+
+class DeadlineScheduler:
+    """Predicts decode times and learns the real-time factors of this host."""
+
+    def __init__(self, path: str | None = None):
+        """Initialize the scheduler; by default the file comes from env."""
+        self._path = path
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        """JSON file with the measurements and the history."""
+        return self._path or get_state_file()
+
+    def rtf(
+        self, model: str, profile: str = "default", backend: str | None = None
+    ) -> float:
+        """Return the seconds of decoding per second of speech expected.
+
+        Measured factors are used as they are; the others are the prior of
+        the model scaled by how this host compares with the priors.
+        """
+        state = self._load()
+        measured = state["rtf"].get(_key(backend, model, profile))
+        if measured is not None:
+            return measured
+        return _prior_rtf(model, profile) * _host_factor(state["rtf"])
+
+    def estimate(
+        self,
+        model: str,
+        profile: str,
+        audio_seconds: float,
+        speech_seconds: float,
+        backend: str | None = None,
+        vad: bool = False,
+    ) -> float:
+        """Predict the seconds to decode a job, loading the model if needed."""
+        silence = 0.0 if vad else SILENCE_WEIGHT * (audio_seconds - speech_seconds)
+        seconds = self.rtf(model, profile, backend) * (speech_seconds + silence)
+        if not global_registry.is_loaded(model, backend=backend):
+            loads = self._load()["load"]
+            seconds += loads.get(_key(backend, model), _prior_load_seconds(model))
+        return seconds
+
+    def plan(
+        self,
+        audio: np.ndarray,
+        deadline: float | None = None,
+        *,
+        model: str = "small",
+        backend: str | None = None,
+        vad: bool = False,
+        sample_rate: int = SAMPLE_RATE,
+    ) -> JobPlan:
+        """Choose the model and decoding parameters of a job.
+
+        With a `deadline` (seconds from now) the most accurate plan with
+        `model` or a smaller one whose prediction, with a safety margin, fits
+        is chosen; when none fits, the fastest one. Without a deadline the
+        plan is `model` with the default parameters.
+        """
+        speech = detect_speech(audio, sample_rate)
+        return self.plan_seconds(
+            len(audio) / sample_rate,
+            float(np.sum(speech[:, 1] - speech[:, 0])) / sample_rate,
+            deadline,
+            model=model,
+            backend=backend,
+            vad=vad,
+        )
+
+    def plan_seconds(
+        self,
+        audio_seconds: float,
+        speech_seconds: float,
+        deadline: float | None = None,
+        *,
+        model: str = "small",
+        backend: str | None = None,
+        vad: bool = False,
+    ) -> JobPlan:
+        """Choose like `plan`, for audio whose speech was already measured."""
+        backend = get_backend(backend).name
+
+        if deadline is None:
+            options = [(model, "default")]
+        else:
+            options = [
+                (candidate, profile)
+                for candidate in candidate_models(model)
+                for profile in PROFILE_OPTIONS
+            ]
+
+        for candidate, profile in options:
+            predicted = self.estimate(
+                candidate, profile, audio_seconds, speech_seconds, backend, vad
+            )
+            if deadline is None or predicted * SAFETY_MARGIN <= deadline:
+                break
+        else:
+            logger.warning(
+                f"No model is expected to finish in {deadline:.0f}s; "
+                f"using the fastest one ({candidate}, {profile})"
+            )
+
+        plan = JobPlan(
+            candidate,
+            profile,
+            dict(PROFILE_OPTIONS[profile]),
+            backend,
+            audio_seconds,
+            speech_seconds,
+            predicted,
+            deadline,
+            vad,
+        )
+        if deadline is not None:
+            logger.info(
+                f"Scheduled {audio_seconds:.0f}s of audio ({speech_seconds:.0f}s "
+                f"of speech) with {candidate} ({profile}): {predicted:.1f}s "
+                f"expected, deadline {deadline:.0f}s"
+            )
+        return plan
+
+    def observe(
+        self,
+        plan: JobPlan,
+        seconds: float,
+        load_seconds: float = 0.0,
+    ) -> None:
+        """Learn from a finished job and add it to the history.
+
+        `seconds` is the time the decode took, `load_seconds` the part of it
+        spent loading the model.
+        """
+        silence = SILENCE_WEIGHT * (plan.audio_seconds - plan.speech_seconds)
+        effective = plan.speech_seconds + (0.0 if plan.vad else silence)
+        with self._lock, _locked(self.path + ".lock"):
+            state = self._load()
+            if effective > 0:
+                key = _key(plan.backend, plan.model, plan.profile)
+                rtf = max(0.0, seconds - load_seconds) / effective
+                state["rtf"][key] = _average(state["rtf"].get(key), rtf)
+            if load_seconds > 0:
+                key = _key(plan.backend, plan.model)
+                state["load"][key] = _average(state["load"].get(key), load_seconds)
+            state["jobs"].append(
+                {
+                    "time": time.time(),
+                    "model": plan.model,
+                    "profile": plan.profile,
+                    "backend": plan.backend,
+                    "audio_seconds": plan.audio_seconds,
+                    "speech_seconds": plan.speech_seconds,
+                    "deadline": plan.deadline,
+                    "predicted_seconds": plan.predicted_seconds,
+                    "actual_seconds": seconds,
+                }
+            )
+            del state["jobs"][:-HISTORY_JOBS]
+            self._save(state)
+        logger.info(
+            f"Decoded with {plan.model} ({plan.profile}) in {seconds:.1f}s, "
+            f"{plan.predicted_seconds:.1f}s predicted"
+        )
+
+    def history(self) -> list:
+        """Return the last jobs, oldest first, with predicted and actual times."""
+        return self._load()["jobs"]
+
+    def reset(self) -> None:
+        """Forget every measurement and the history."""
+        with suppress(OSError):
+            os.remove(self.path)
+
+    def _load(self) -> dict:
+        """Read the state file, or return an empty state."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                return state
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding corrupt scheduler state: {e}")
+        return {"version": STATE_VERSION, "rtf": {}, "load": {}, "jobs": []}
+
+    def _save(self, state: dict) -> None:
+        """Write the state file atomically."""
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+
+
+# Global scheduler shared by the whole process
+global_scheduler = DeadlineScheduler()
+
+
+@contextmanager
+def _locked(path: str):
+    """Hold an exclusive lock on `path` (created if needed) across processes."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+
+            # Locks the first byte; retries for 10 seconds, then raises OSError
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _size(model: str) -> str:
+    """Return the standard size of a model name ("large" if unknown)."""
+    name = model.split(".")[0]
+    for size in MODEL_SIZES:
+        if name.startswith(size):
+            return size
+    return "large"
+
+
+def _key(backend: str | None, model: str, profile: str | None = None) -> str:
+    """Return the key of a measurement: backend, model, dtype and profile."""
+    parts = [get_backend(backend).name, model, get_default_dtype()]
+    return ":".join(parts + ([profile] if profile else []))
+
+
+def _prior_rtf(model: str, profile: str) -> float:
+    """Return the real-time factor assumed before measuring a model."""
+    return PRIOR_RTF[_size(model)] * PROFILE_COST[profile]
+
+
+def _prior_load_seconds(model: str) -> float:
+    """Return the load time assumed before measuring a model."""
+    return PRIOR_LOAD_SECONDS[_size(model)]
+
+
+def _host_factor(measured: dict) -> float:
+    """How much slower than the priors this host is (geometric mean)."""
+    ratios = []
+    for key, rtf in measured.items():
+        parts = key.split(":")
+        # Measurements saved before the dtype was part of the key are ignored
+        if len(parts) != 4:
+            continue
+        _, model, _, profile = parts
+        if rtf > 0 and profile in PROFILE_COST:
+            ratios.append(math.log(rtf / _prior_rtf(model, profile)))
+    return math.exp(sum(ratios) / len(ratios)) if ratios else 1.0
+
+
+def _average(previous: float | None, value: float) -> float:
+    """Update an exponential moving average."""
+    if previous is None:
+        return value
+    return (1 - LEARNING_RATE) * previous + LEARNING_RATE * value
+
+
+def main(argv: list | None = None) -> int:
+    """Command line entry point: show the plan for a file, or the history."""
+    parser = argparse.ArgumentParser(description="Deadline-aware model choice")
+    parser.add_argument("audio", nargs="?", help="Audio file to plan")
+    parser.add_argument("--deadline", type=float, help="Seconds to finish in")
+    parser.add_argument("--model", default="small", help="Largest model to use")
+    parser.add_argument("--backend", help="Inference engine")
+    parser.add_argument("--vad", action="store_true", help="Silence is skipped")
+    parser.add_argument("--history", action="store_true", help="Show past jobs")
+    args = parser.parse_args(argv)
+
+    if args.history or not args.audio:
+        for job in global_scheduler.history():
+            deadline = job["deadline"]
+            logger.info(
+                f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(job['time']))} "
+                f"{job['model']} ({job['profile']}): "
+                f"{job['audio_seconds']:.0f}s of audio, "
+                f"{job['predicted_seconds']:.1f}s predicted, "
+                f"{job['actual_seconds']:.1f}s actual"
+                + (f", deadline {deadline:.0f}s" if deadline is not None else "")
+            )
+        return 0
+
+    from audio.decoder import decode_audio
+
+    audio = decode_audio(args.audio, SAMPLE_RATE)
+    plan = global_scheduler.plan(
+        audio, args.deadline, model=args.model, backend=args.backend, vad=args.vad
+    )
+    for candidate in candidate_models(args.model):
+        for profile in PROFILE_OPTIONS:
+            seconds = global_scheduler.estimate(
+                candidate,
+                profile,
+                plan.audio_seconds,
+                plan.speech_seconds,
+                args.backend,
+                args.vad,
+            )
+            chosen = " <-" if (candidate, profile) == (plan.model, plan.profile) else ""
+            logger.info(f"{candidate:>10} {profile:>8}: {seconds:7.1f}s{chosen}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# src/transcription/segments.py
+
+"""Progressive transcription that yields segments as they are decoded.
+
+Audio is split at silences into windows of at most 30 seconds (the length
+Whisper decodes at once) and the segments of every window are yielded as soon
+as it is decoded, so the first text is available after one window instead of
+after the whole file.
+"""
+
+import threading
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import numpy as np
+
+from logger import get_logger
+
+from .inference import transcribe_samples
+from .longform import PROMPT_WORDS, SAMPLE_RATE, find_chunks
+from .worker import TranscriptionCancelled
+
+
+logger = get_logger(__name__)
+
+
+class Segment(NamedTuple):
+    """A piece of transcribed text with its position in the audio."""
+
+    text: str
+    start: float
+    end: float
+    avg_logprob: float = 0.0
+
+
+class Revision(NamedTuple):
+    """The segments of one window from a preview or a final pass.
+
+    A final revision replaces the preview of the same window.
+    """
+
+    window: int
+    segments: list
+    final: bool
+
+
+def segments_from_result(
+    result: dict, offset: float = 0.0, duration: float = 0.0
+) -> list:
+    """Convert a Whisper result into segments shifted by `offset` seconds.
+
+    Results without segment information become a single segment that covers
+    `duration` seconds.
+    """
+    raw_segments = result.get("segments")
+    if raw_segments is None:
+        text = result.get("text", "").strip()
+        return [Segment(text, offset, offset + duration)] if text else []
+
+    segments = []
+    for raw in raw_segments:
+        text = raw.get("text", "").strip()
+        if text:
+            segments.append(
+                Segment(
+                    text,
+                    offset + float(raw.get("start", 0.0)),
+                    offset + float(raw.get("end", duration)),
+                    float(raw.get("avg_logprob", 0.0)),
+                )
+            )
+    return segments
+
+
+def join_segments(segments) -> str:
+    """Join the text of several segments."""
+    return " ".join(segment.text for segment in segments)
+
+
+def find_windows(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    max_chunk_seconds: float = 30.0,
+) -> list:
+    """Return the (start, end) sample ranges of the windows decoded one by one."""
+    return find_chunks(
+        audio, sample_rate, max_seconds=max_chunk_seconds, overlap_seconds=0.0
+    )
+
+
+def iter_window_segments(
+    audio: np.ndarray,
+    model: str,
+    options: dict,
+    *,
+    windows: list | None = None,
+    sample_rate: int = SAMPLE_RATE,
+    max_chunk_seconds: float = 30.0,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[tuple]:
+    """Transcribe audio window by window, yielding (index, segments) per window.
+
+    `windows` are the ranges from `find_windows`, computed here when not
+    given. Each window receives the end of the previous text as prompt.
+    Windows do not overlap, so no text is repeated. Raises
+    TranscriptionCancelled once `cancel_event` is set, at the next step of
+    the decode.
+    """
+    if windows is None:
+        windows = find_windows(audio, sample_rate, max_chunk_seconds)
+    prompt = None
+    for index, (start, end) in enumerate(windows):
+        if cancel_event is not None and cancel_event.is_set():
+            raise TranscriptionCancelled("Transcription cancelled")
+
+        kwargs = dict(options)
+        if prompt:
+            kwargs["initial_prompt"] = prompt
+        result = transcribe_samples(
+            audio[start:end], model, kwargs, cancel_event=cancel_event
+        )
+
+        segments = segments_from_result(
+            result, start / sample_rate, (end - start) / sample_rate
+        )
+        logger.debug(f"Window {index + 1}/{len(windows)}: {len(segments)} segments")
+        yield index, segments
+
+        text = join_segments(segments)
+        if text:
+            prompt = " ".join(text.split()[-PROMPT_WORDS:])
+
+
+def iter_chunk_segments(
+    audio: np.ndarray,
+    model: str,
+    options: dict,
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    max_chunk_seconds: float = 30.0,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[Segment]:
+    """Transcribe audio window by window, yielding the segments of each one."""
+    for _, segments in iter_window_segments(
+        audio,
+        model,
+        options,
+        sample_rate=sample_rate,
+        max_chunk_seconds=max_chunk_seconds,
+        cancel_event=cancel_event,
+    ):
+        yield from segments
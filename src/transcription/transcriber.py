@@ -3,100 +3,593 @@
 """Interface for the Whisper AI model and result processing."""
 
 import threading
+import time
+from collections.abc import Iterator
+from itertools import chain, islice
 
 import numpy as np
-import soundfile as sf
-import whisper
 
+from audio.decoder import decode_audio
 from logger import get_logger
 
+from .cache import audio_fingerprint, cache_enabled, global_cache, make_key
+from .client import (
+    DaemonUnavailable,
+    daemon_enabled,
+    is_daemon_available,
+    request_transcription,
+    stream_transcription,
+)
+from .inference import backend_options, transcribe_samples
+from .language import resolve_language
+from .longform import SAMPLE_RATE, transcribe_long_form
+from .model_registry import get_default_dtype, global_registry
+from .resources import ensure_plan
+from .scheduler import global_scheduler
+from .segments import (
+    Revision,
+    Segment,
+    find_windows,
+    iter_chunk_segments,
+    iter_window_segments,
+    join_segments,
+    segments_from_result,
+)
+from .vad import apply_vad, vad_enabled
+from .worker import TranscriptionCancelled, TranscriptionTimeout, global_worker
+
 
 logger = get_logger(__name__)
 
+# Audio longer than this is transcribed in chunks
+LONG_FORM_SECONDS = 120.0
+
+# Maximum seconds to transcribe one chunk of long-form audio
+DEFAULT_CHUNK_TIMEOUT = 300.0
+
+# Fast model whose text is shown while the requested model refines it
+PREVIEW_MODEL = "base"
+
 
-def transcribe_audio(audio_path: str, model: str = "small") -> str | None:
+def transcribe_audio(
+    audio_path: str | np.ndarray,
+    model: str = "small",
+    *,
+    language: str | None = None,
+    backend: str | None = None,
+    vad: bool | None = None,
+    use_daemon: bool = True,
+    use_cache: bool = True,
+    long_form: bool | None = None,
+    long_form_workers: int = 1,
+    chunk_timeout: float | None = DEFAULT_CHUNK_TIMEOUT,
+    deadline: float | None = None,
+    isolated: bool | None = None,
+    timeout: float | None = None,
+    cancel_event: threading.Event | None = None,
+) -> str | None:
     """Transcribe an audio file using Whisper.
-    
-    Supports wav, mp3, m4a, flac, ogg, mp4 files.
+
+    Supports wav, mp3, m4a, flac, ogg, mp4 files, decoded once in memory, or
+    16 kHz mono samples already decoded with `audio.decoder.decode_audio`.
+    If a transcription daemon is running the job is sent to it, so the model
+    is already warm; otherwise it is transcribed in this process.
+    `language` is a Whisper language code, "auto" to detect it once from the
+    audio, or None for the default (AUDIO_APP_LANGUAGE, "es" if unset).
+    `backend` is the inference engine ("whisper" or "ctranslate2"), None for
+    the default (AUDIO_APP_BACKEND, "whisper" if unset).
+    With `vad` (default AUDIO_APP_VAD=1) long silences are cut out before
+    decoding, so the decode time follows the amount of speech.
+    Transcripts of audio already seen are taken from the on-disk cache unless
+    `use_cache` is False.
+    Audio longer than LONG_FORM_SECONDS (or any audio if `long_form` is True)
+    is split at silences into chunks transcribed under `chunk_timeout` each,
+    one by one on the warm model of this process, or in parallel in
+    `long_form_workers` processes when it is more than one.
+    With a `deadline` (seconds) `model` is the largest model allowed: the
+    scheduler picks the most accurate model and decoding parameters expected
+    to finish in time on this host (see `scheduler`).
+    With `isolated` (the default when `timeout` or `cancel_event` is given)
+    the job runs in a worker process that is killed when it exceeds `timeout`
+    seconds or `cancel_event` is set, so a hung decode frees its CPU and RAM.
+    A running daemon takes the job instead, whatever `isolated` says: it
+    decodes it with its preloaded models and stops it at the next decoder
+    step when `cancel_event` is set or `timeout` passes.
     Returns the transcribed text or None if there is an error.
     """
-    result = [None]
-
-    def transcribe_worker():
-        try:
-            logger.info(f"Loading Whisper model ({model})...")
-            whisper_model = whisper.load_model(model)
+    options = {
+        "language": language,
+        "backend": backend,
+        "vad": vad,
+        "use_cache": use_cache,
+        "long_form": long_form,
+        "long_form_workers": long_form_workers,
+        "chunk_timeout": chunk_timeout,
+        "deadline": deadline,
+    }
 
-            logger.info(f"Transcribing audio: {audio_path}")
+    if isolated is None:
+        isolated = timeout is not None or cancel_event is not None
 
-# Try to transcribe directly with Whisper (supports multiple formats)
+    try:
+        # The daemon receives paths; decoded samples are transcribed here
+        is_path = isinstance(audio_path, str)
+        if is_path and use_daemon and daemon_enabled() and is_daemon_available():
             try:
-                result[0] = whisper_model.transcribe(
-                    audio_path, language="es", verbose=False
+                # The daemon runs the job on its warm models in any case
+                return request_transcription(
+                    audio_path,
+                    model=model,
+                    cancel_event=cancel_event,
+                    timeout=timeout,
+                    **options,
                 )
-                text = result[0].get("text", "").strip()
-                if text:
-                    logger.info("Transcription completed.")
-                    result[0] = text
-                else:
-                    logger.warning("No text detected in the audio")
-                    result[0] = "No audio content detected"
-
-            except Exception as e:
-                logger.warning(f"Attempt 1 failed: {e}")
-                logger.info("Trying alternative method...")
-
-                # If it fails, we try to load the audio directly with soundfile
-                try:
-                    audio_data, sr = sf.read(audio_path)
-
-                    # Convert to float32
-                    audio_data = audio_data.astype(np.float32)
-
-                    # Convert to mono if stereo
-                    if len(audio_data.shape) > 1:
-                        audio_data = np.mean(audio_data, axis=1)
-
-                    # Normalize if necessary
-                    max_val = np.abs(audio_data).max()
-                    if max_val > 1.0:
-                        audio_data = audio_data / max_val
-
-                    # Resample to 16kHz if necessary
-                    if sr != 16000:
-                        num_samples = int(len(audio_data) * 16000 / sr)
-                        indices = np.linspace(0, len(audio_data) - 1, num_samples)
-                        audio_data = np.interp(
-                            indices, np.arange(len(audio_data)), audio_data
-                        )
-
-                    #Transcribe the audio in numpy format
-                    result[0] = whisper_model.transcribe(
-                        audio_data, language="es", verbose=False
-                    )
-                    text = result[0].get("text", "").strip()
-                    if text:
-                        logger.info("Transcription completed (alternative method).")
-                        result[0] = text
-                    else:
-                        logger.warning("No text detected in the audio")
-                        result[0] = "No audio content detected"
-
-                except Exception as e2:
-                    logger.error(f"Alternative method also failed:{e2}")
-                    result[0] = None
-
-        except Exception as e:
-            logger.exception(f"Fatal error when transcribing: {e}")
-            result[0] = None
-
-    # Run with timeout
-    thread = threading.Thread(target=transcribe_worker, daemon=True)
-    thread.start()
-    thread.join(timeout=300)  # 5 minutos timeout
-
-    if thread.is_alive():
-        logger.error("Transcription timeout exceeded (5 minutes)")
+            except DaemonUnavailable as e:
+                logger.debug(f"Daemon not available, transcribing in-process: {e}")
+
+        if isolated:
+            return global_worker.call(
+                _transcribe_file,
+                audio_path,
+                model,
+                timeout=timeout,
+                cancel_event=cancel_event,
+                **options,
+            )
+        return _transcribe_file(
+            audio_path, model, cancel_event=cancel_event, **options
+        )
+
+    except TranscriptionCancelled:
+        logger.warning("Transcription cancelled.")
+        return None
+    except TranscriptionTimeout as e:
+        logger.error(str(e))
+        return None
+    except Exception as e:
+        logger.exception(f"Fatal error when transcribing: {e}")
+        return None
+
+
+def iter_segments(
+    audio_path: str | np.ndarray,
+    model: str = "small",
+    *,
+    language: str | None = None,
+    backend: str | None = None,
+    vad: bool | None = None,
+    use_daemon: bool = True,
+    use_cache: bool = True,
+    isolated: bool | None = None,
+    timeout: float | None = None,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[Segment]:
+    """Transcribe an audio file, yielding segments as soon as they are decoded.
+
+    The audio is decoded in windows of at most 30 seconds and the segments
+    (text, start, end, avg_logprob) of each window are yielded right away.
+    Cached transcripts are yielded at once. `language`, `backend`, `vad`,
+    `use_daemon`, `isolated`, `timeout` and `cancel_event` work as in
+    `transcribe_audio`, but errors are raised instead of returning None;
+    segment times always refer to the original audio.
+    """
+    if use_daemon:
+        items = _daemon_stream(
+            "segments",
+            audio_path,
+            model,
+            timeout,
+            cancel_event,
+            language=language,
+            backend=backend,
+            vad=vad,
+            use_cache=use_cache,
+        )
+        if items is not None:
+            for item in items:
+                yield Segment(*item)
+            return
+
+    if isolated is None:
+        isolated = timeout is not None or cancel_event is not None
+
+    if isolated:
+        yield from global_worker.stream(
+            _iter_file_segments,
+            audio_path,
+            model,
+            language,
+            use_cache,
+            backend,
+            vad,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        )
+    else:
+        yield from _iter_file_segments(
+            audio_path, model, language, use_cache, backend, vad, cancel_event
+        )
+
+
+def _iter_file_segments(
+    audio_path: str | np.ndarray,
+    model: str,
+    language: str | None = None,
+    use_cache: bool = True,
+    backend: str | None = None,
+    vad: bool | None = None,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[Segment]:
+    """Decode an audio file and yield its segments, reusing cached ones."""
+    ensure_plan()
+    vad = vad_enabled() if vad is None else vad
+    audio_data, options, key = _prepare_job(
+        audio_path, model, language, use_cache, backend, vad
+    )
+
+    if key is not None:
+        record = global_cache.get(key)
+        if record is not None:
+            logger.info("Transcription found in cache.")
+            yield from _cached_segments(record, len(audio_data) / SAMPLE_RATE)
+            return
+
+    speech_map = None
+    if vad:
+        audio_data, speech_map = apply_vad(audio_data, SAMPLE_RATE)
+
+    segments = []
+    for segment in iter_chunk_segments(
+        audio_data, model, options, cancel_event=cancel_event
+    ):
+        if speech_map is not None:
+            segment = speech_map.map_segment(segment)
+        segments.append(segment)
+        yield segment
+
+    _store_segments(key, segments, model, options)
+
+
+def iter_revisions(
+    audio_path: str | np.ndarray,
+    model: str = "small",
+    *,
+    preview_model: str = PREVIEW_MODEL,
+    language: str | None = None,
+    backend: str | None = None,
+    vad: bool | None = None,
+    use_daemon: bool = True,
+    use_cache: bool = True,
+    isolated: bool | None = None,
+    timeout: float | None = None,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[Revision]:
+    """Transcribe an audio file in two passes: a quick preview, then `model`.
+
+    The fast `preview_model` transcribes every window first and its
+    revisions (window, segments, final=False) are yielded as they are
+    decoded; then `model` decodes the same windows again and yields the
+    final revision of each one, which replaces its preview. The audio is
+    decoded, fingerprinted, voice-filtered and split into windows once for
+    both passes, and the final pass decodes exactly like `iter_segments`, so
+    the final text is the same as a direct run with `model` (with "auto",
+    the language is detected by `preview_model`). A cached
+    transcript is yielded at once as a single final revision. The other
+    arguments work as in `iter_segments`.
+    """
+    if use_daemon:
+        items = _daemon_stream(
+            "revisions",
+            audio_path,
+            model,
+            timeout,
+            cancel_event,
+            preview_model=preview_model,
+            language=language,
+            backend=backend,
+            vad=vad,
+            use_cache=use_cache,
+        )
+        if items is not None:
+            for window, segments, final in items:
+                yield Revision(window, [Segment(*s) for s in segments], final)
+            return
+
+    if isolated is None:
+        isolated = timeout is not None or cancel_event is not None
+
+    args = (audio_path, model, preview_model, language, use_cache, backend, vad)
+    if isolated:
+        yield from global_worker.stream(
+            _iter_file_revisions,
+            *args,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        )
+    else:
+        yield from _iter_file_revisions(*args, cancel_event)
+
+
+def _iter_file_revisions(
+    audio_path: str | np.ndarray,
+    model: str,
+    preview_model: str,
+    language: str | None = None,
+    use_cache: bool = True,
+    backend: str | None = None,
+    vad: bool | None = None,
+    cancel_event: threading.Event | None = None,
+) -> Iterator[Revision]:
+    """Decode an audio file once and yield its preview and final revisions."""
+    ensure_plan()
+    vad = vad_enabled() if vad is None else vad
+    # The preview model detects the language, so the preview does not wait
+    # for the final model to load; the final pass reuses it
+    audio_data, options, key = _prepare_job(
+        audio_path,
+        model,
+        language,
+        use_cache,
+        backend,
+        vad,
+        language_model=preview_model,
+    )
+
+    if key is not None:
+        record = global_cache.get(key)
+        if record is not None:
+            logger.info("Transcription found in cache.")
+            duration = len(audio_data) / SAMPLE_RATE
+            yield Revision(0, _cached_segments(record, duration), True)
+            return
+
+    speech_map = None
+    if vad:
+        audio_data, speech_map = apply_vad(audio_data, SAMPLE_RATE)
+    windows = find_windows(audio_data, SAMPLE_RATE)
+
+    passes = [(model, True)]
+    if preview_model != model:
+        passes.insert(0, (preview_model, False))
+
+    segments = []
+    for pass_model, final in passes:
+        logger.info(f"Transcribing {len(windows)} windows with {pass_model}")
+        for index, window_segments in iter_window_segments(
+            audio_data,
+            pass_model,
+            options,
+            windows=windows,
+            cancel_event=cancel_event,
+        ):
+            if speech_map is not None:
+                window_segments = [speech_map.map_segment(s) for s in window_segments]
+            if final:
+                segments += window_segments
+            yield Revision(index, window_segments, final)
+
+    _store_segments(key, segments, model, options)
+
+
+def _daemon_stream(
+    op: str,
+    audio_path: str | np.ndarray,
+    model: str,
+    timeout: float | None,
+    cancel_event: threading.Event | None,
+    **options,
+) -> Iterator | None:
+    """Start a progressive job in the daemon, or return None if none answers.
+
+    The daemon runs it on its warm models; closing the connection (on
+    `cancel_event` or after `timeout`) cancels it there.
+    """
+    if not (
+        isinstance(audio_path, str) and daemon_enabled() and is_daemon_available()
+    ):
         return None
+    items = stream_transcription(
+        op, audio_path, model, timeout=timeout, cancel_event=cancel_event, **options
+    )
+    try:
+        # Only a daemon that does not answer at all is skipped
+        first = list(islice(items, 1))
+    except DaemonUnavailable as e:
+        logger.debug(f"Daemon not available, transcribing in-process: {e}")
+        return None
+    return chain(first, items)
+
+
+def _store_segments(key: str | None, segments: list, model: str, options: dict):
+    """Log the end of a progressive job and cache its segments."""
+    text = join_segments(segments)
+    if not text:
+        logger.warning("No text detected in the audio")
+        return
+
+    logger.info("Transcription completed.")
+    if key is not None:
+        global_cache.put(
+            key,
+            {
+                "text": text,
+                "segments": [list(segment) for segment in segments],
+                "model": model,
+                **options,
+            },
+        )
+
+
+def _cached_segments(record: dict, duration: float) -> list:
+    """Rebuild the segments of a cache record."""
+    if record.get("segments"):
+        return [Segment(*values) for values in record["segments"]]
+    return [Segment(record["text"], 0.0, duration)]
+
+
+def _transcribe_file(
+    audio_path: str | np.ndarray,
+    model: str,
+    language: str | None,
+    backend: str | None,
+    vad: bool | None,
+    use_cache: bool,
+    long_form: bool | None,
+    long_form_workers: int,
+    chunk_timeout: float | None,
+    deadline: float | None = None,
+    cancel_event: threading.Event | None = None,
+) -> str:
+    """Decode an audio file and transcribe it, reusing cached transcripts.
+
+    A set `cancel_event` stops the decode with TranscriptionCancelled.
+    """
+    start = time.perf_counter()
+    ensure_plan()
+    vad = vad_enabled() if vad is None else vad
+    plan = None
+    if deadline is not None:
+        # The model depends on the length of the audio and its speech
+        audio_path = _load_samples(audio_path)
+        plan = global_scheduler.plan(
+            audio_path,
+            deadline - (time.perf_counter() - start),
+            model=model,
+            backend=backend,
+            vad=vad,
+        )
+        model = plan.model
+    audio_data, options, key = _prepare_job(
+        audio_path, model, language, use_cache, backend, vad, plan
+    )
+
+    # A repeated recording costs a hash instead of a full decode
+    if key is not None:
+        record = global_cache.get(key)
+        if record is not None:
+            logger.info("Transcription found in cache.")
+            return record["text"]
+
+    # Only the speech is decoded, so long silences cost no decoding time
+    speech_map = None
+    if vad:
+        audio_data, speech_map = apply_vad(audio_data, SAMPLE_RATE)
+
+    if long_form is None:
+        long_form = len(audio_data) > LONG_FORM_SECONDS * SAMPLE_RATE
+
+    if plan is None and speech_map is not None:
+        # Without a deadline the job is only measured when its speech is
+        # known already; detecting it just for that would cost a full pass
+        plan = global_scheduler.plan_seconds(
+            speech_map.total_seconds,
+            speech_map.speech_seconds,
+            model=model,
+            backend=backend,
+            vad=vad,
+        )
+    decode_start = time.perf_counter()
+    load_start = global_registry.stats()["load_seconds"]
+
+    segments = None
+    failed_chunks = []
+    if not len(audio_data):
+        text = ""
+    elif long_form:
+        text = transcribe_long_form(
+            audio_data,
+            model,
+            options,
+            long_form_workers,
+            chunk_timeout,
+            on_failure=failed_chunks.append,
+            cancel_event=cancel_event,
+        )
+    else:
+        # Reuse the model if it is already loaded in this process
+        result = transcribe_samples(
+            audio_data, model, options, cancel_event=cancel_event
+        )
+        text = result.get("text", "").strip()
+        if result.get("segments") is not None:
+            segments = segments_from_result(result)
+            if speech_map is not None:
+                segments = [speech_map.map_segment(s) for s in segments]
+            segments = [list(s) for s in segments]
+
+    if plan is not None:
+        global_scheduler.observe(
+            plan,
+            time.perf_counter() - decode_start,
+            global_registry.stats()["load_seconds"] - load_start,
+        )
+
+    if text:
+        logger.info("Transcription completed.")
+    else:
+        logger.warning("No text detected in the audio")
+    if failed_chunks:
+        logger.warning(
+            f"{len(failed_chunks)} chunks are missing from the transcript, "
+            "which is not cached"
+        )
+
+    # Only complete transcripts are final; a retry may do better than these
+    if key is not None and text and not failed_chunks:
+        record = {"text": text, "model": model, **options}
+        if segments:
+            record["segments"] = segments
+        global_cache.put(key, record)
+    return text or "No audio content detected"
+
+
+def _prepare_job(
+    audio_path: str | np.ndarray,
+    model: str,
+    language: str | None,
+    use_cache: bool,
+    backend: str | None = None,
+    vad: bool = False,
+    plan=None,
+    language_model: str | None = None,
+) -> tuple:
+    """Decode the audio, choose its language and build its cache key.
+
+    Returns (samples, decoding options, cache key or None). The options carry
+    the backend when it is not the default one, and the decoding parameters
+    of a scheduler `plan`. Jobs with `vad` have their own cache entries, since
+    skipping the silence can change the text. "auto" is detected with
+    `language_model` (`model` by default).
+    """
+    audio_data = _load_samples(audio_path)
+    digest = None
+    if use_cache and cache_enabled():
+        digest = audio_fingerprint(audio_data)
+
+    options = {
+        "language": resolve_language(
+            language, audio_data, language_model or model, digest, backend
+        ),
+        **backend_options(backend),
+        **(plan.options if plan is not None else {}),
+    }
+    key = None
+    if digest is not None:
+        # The precision of the model can change the text
+        key = make_key(
+            digest,
+            model,
+            **options,
+            dtype=get_default_dtype(),
+            **({"vad": True} if vad else {}),
+        )
+    return audio_data, options, key
+
 
-    return result[0]
\ No newline at end of file
+def _load_samples(audio: str | np.ndarray) -> np.ndarray:
+    """Decode an audio file once, or pass already decoded samples through."""
+    if isinstance(audio, np.ndarray):
+        logger.info(f"Transcribing {len(audio) / SAMPLE_RATE:.1f}s of audio")
+        return audio.astype(np.float32, copy=False)
+    logger.info(f"Transcribing audio: {audio}")
+    return decode_audio(audio, SAMPLE_RATE)
@@ -0,0 +1,246 @@
+# src/transcription/vad.py
+
+"""Voice activity detection to skip the silence of recordings.
+
+Recordings are often more than half silence, and Whisper spends a full
+30-second window decoding it (or hallucinates text in it). This stage finds
+the speech with three features computed for all frames at once: energy,
+zero-crossing rate and spectral flatness. Speech starts at frames that are
+loud and tonal, and extends through the neighbouring frames that are above a
+lower energy threshold (hysteresis), so quiet consonants at the edges stay.
+
+Long silences are cut down to the padding around the speech, and a
+`SpeechMap` translates the times of the shorter audio back to the original
+recording. Enable it per job (`vad=True`) or with AUDIO_APP_VAD=1.
+"""
+
+import os
+
+import numpy as np
+
+from logger import get_logger
+
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Analysis frame length
+FRAME_SECONDS = 0.03
+
+# Frames analysed per block (bounds the memory of the spectra)
+BLOCK_FRAMES = 4096
+
+# Percentiles of the frame energy taken as noise floor and speech level
+NOISE_PERCENTILE = 10
+SPEECH_PERCENTILE = 95
+
+# Less contrast than this between both levels means there is no silence
+MIN_DYNAMIC_DB = 10.0
+
+# A recording whose speech level is below this is all silence (dBFS)
+SILENCE_DB = -55.0
+
+# Fractions of the way from the noise floor to the speech level
+START_THRESHOLD = 0.5
+KEEP_THRESHOLD = 0.25
+
+# Speech frames are tonal and do not cross zero like noise does
+MAX_FLATNESS = 0.4
+MAX_ZERO_CROSSINGS = 0.25
+
+# Steady audio with fewer tonal frames than this is taken as noise
+MIN_TONAL_FRACTION = 0.2
+
+# Shorter detections are dropped, shorter pauses are kept
+MIN_SPEECH_SECONDS = 0.25
+MIN_SILENCE_SECONDS = 1.0
+
+# Audio kept before and after every stretch of speech
+PAD_SECONDS = 0.2
+
+
+def vad_enabled() -> bool:
+    """Whether jobs skip non-speech by default (AUDIO_APP_VAD=1)."""
+    return os.environ.get("AUDIO_APP_VAD", "0") == "1"
+
+
+def frame_features(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_seconds: float = FRAME_SECONDS,
+) -> tuple:
+    """Return the energy (dBFS), zero-crossing rate and flatness of every frame.
+
+    The zero-crossing rate is in crossings per sample; the flatness is the
+    ratio of the geometric to the arithmetic mean of the power spectrum (near
+    0 for voiced speech, about 0.5 for white noise).
+    """
+    frame = max(2, int(frame_seconds * sample_rate))
+    n_frames = len(audio) // frame
+    frames = np.asarray(audio[: n_frames * frame], dtype=np.float32).reshape(
+        n_frames, frame
+    )
+
+    energy = np.einsum("ij,ij->i", frames, frames) / frame
+    energy_db = 10 * np.log10(energy + 1e-10)
+
+    zero_crossings = np.empty(n_frames, dtype=np.float32)
+    flatness = np.empty(n_frames, dtype=np.float32)
+    window = np.hanning(frame).astype(np.float32)
+    for start in range(0, n_frames, BLOCK_FRAMES):
+        block = frames[start : start + BLOCK_FRAMES]
+        signs = np.signbit(block)
+        zero_crossings[start : start + len(block)] = (
+            np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame
+        )
+        power = np.abs(np.fft.rfft(block * window, axis=1)) ** 2 + 1e-12
+        flatness[start : start + len(block)] = np.exp(
+            np.mean(np.log(power), axis=1)
+        ) / np.mean(power, axis=1)
+
+    return energy_db, zero_crossings, flatness
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_seconds: float = FRAME_SECONDS,
+) -> np.ndarray:
+    """Return the (start, end) sample ranges of speech, shape (n, 2).
+
+    Thresholds adapt to the recording: they sit between its noise floor and
+    its speech level, so the gain of the microphone does not matter.
+    """
+    frame = max(2, int(frame_seconds * sample_rate))
+    energy_db, zero_crossings, flatness = frame_features(
+        audio, sample_rate, frame_seconds
+    )
+    if not len(energy_db):
+        return np.zeros((0, 2), dtype=np.int64)
+
+    tonal = (flatness < MAX_FLATNESS) & (zero_crossings < MAX_ZERO_CROSSINGS)
+    noise, speech = np.percentile(energy_db, [NOISE_PERCENTILE, SPEECH_PERCENTILE])
+    if speech < SILENCE_DB:
+        return np.zeros((0, 2), dtype=np.int64)
+    if speech - noise < MIN_DYNAMIC_DB:
+        # No quiet stretch to tell apart: all speech or all noise
+        if np.mean(tonal) < MIN_TONAL_FRACTION:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.array([[0, len(audio)]], dtype=np.int64)
+
+    start_db = max(noise + START_THRESHOLD * (speech - noise), SILENCE_DB)
+    keep_db = noise + KEEP_THRESHOLD * (speech - noise)
+    starts = (energy_db > start_db) & tonal
+    active = energy_db > keep_db
+
+    # Hysteresis: runs of active frames that contain a starting frame
+    runs = _runs(active)
+    counts = np.concatenate(([0], np.cumsum(starts, dtype=np.int64)))
+    runs = runs[counts[runs[:, 1]] > counts[runs[:, 0]]]
+
+    pad = int(PAD_SECONDS * sample_rate / frame)
+    runs = _merge_close(runs, int(MIN_SILENCE_SECONDS * sample_rate / frame), pad)
+    runs = runs[runs[:, 1] - runs[:, 0] >= MIN_SPEECH_SECONDS * sample_rate / frame]
+
+    ranges = np.clip((runs + [[-pad, pad]]) * frame, 0, len(audio))
+    # The padding of neighbours may overlap after merging
+    return _merge_close(ranges, 0, 0)
+
+
+class SpeechMap:
+    """Where the kept pieces of a recording come from.
+
+    `regions` holds the (start, end) sample ranges of the original audio that
+    are kept, in order; the compressed audio is their concatenation.
+    """
+
+    def __init__(self, regions: np.ndarray, total_samples: int, sample_rate: int):
+        """Keep the regions and the length of the original audio."""
+        self.regions = np.asarray(regions, dtype=np.int64).reshape(-1, 2)
+        self.total_samples = total_samples
+        self.sample_rate = sample_rate
+        lengths = self.regions[:, 1] - self.regions[:, 0]
+        # Start of every region in the compressed audio
+        self._offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+    @property
+    def total_seconds(self) -> float:
+        """Length of the original audio."""
+        return self.total_samples / self.sample_rate
+
+    @property
+    def speech_seconds(self) -> float:
+        """Length of the compressed audio."""
+        return float(self._offsets[-1]) / self.sample_rate
+
+    @property
+    def skipped_seconds(self) -> float:
+        """Audio left out as non-speech."""
+        return self.total_seconds - self.speech_seconds
+
+    def compress(self, audio: np.ndarray) -> np.ndarray:
+        """Return the kept pieces of `audio` joined together."""
+        if len(self.regions) == 1 and tuple(self.regions[0]) == (0, len(audio)):
+            return audio
+        return np.concatenate(
+            [audio[start:end] for start, end in self.regions]
+            or [np.zeros(0, dtype=np.float32)]
+        )
+
+    def to_original(self, seconds, end: bool = False):
+        """Map times of the compressed audio to the original recording.
+
+        A time on the boundary of two regions belongs to the following one,
+        or to the previous one with `end` (for the end of a segment).
+        """
+        samples = np.asarray(seconds, dtype=np.float64) * self.sample_rate
+        if not len(self.regions):
+            return samples / self.sample_rate
+        side = "left" if end else "right"
+        index = np.clip(
+            np.searchsorted(self._offsets, samples, side=side) - 1,
+            0,
+            len(self.regions) - 1,
+        )
+        original = self.regions[index, 0] + (samples - self._offsets[index])
+        return original / self.sample_rate
+
+    def map_segment(self, segment):
+        """Shift the start and end of a segment to the original recording."""
+        return segment._replace(
+            start=float(self.to_original(segment.start)),
+            end=float(self.to_original(segment.end, end=True)),
+        )
+
+
+def apply_vad(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> tuple:
+    """Detect the speech of `audio` and cut its long silences.
+
+    Returns (compressed audio, SpeechMap) and logs how much audio is skipped.
+    """
+    speech_map = SpeechMap(detect_speech(audio, sample_rate), len(audio), sample_rate)
+    total = speech_map.total_seconds
+    logger.info(
+        f"Voice activity: {speech_map.speech_seconds:.1f}s of speech in "
+        f"{total:.1f}s, {speech_map.skipped_seconds:.1f}s skipped "
+        f"({speech_map.skipped_seconds / total if total else 0.0:.0%})"
+    )
+    return speech_map.compress(audio), speech_map
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """Return the (start, end) indices of the runs of True in a mask."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)), axis=1)
+
+
+def _merge_close(runs: np.ndarray, max_gap: int, pad: int) -> np.ndarray:
+    """Join runs separated by at most `max_gap` (after padding each side)."""
+    if len(runs) < 2:
+        return runs
+    gaps = runs[1:, 0] - runs[:-1, 1] - 2 * pad
+    split = np.flatnonzero(gaps > max_gap) + 1
+    first = np.concatenate(([0], split))
+    last = np.concatenate((split - 1, [len(runs) - 1]))
+    return np.stack((runs[first, 0], runs[last, 1]), axis=1)
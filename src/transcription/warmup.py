@@ -0,0 +1,101 @@
+# src/transcription/warmup.py
+
+"""Model warm-up at application startup.
+
+The first transcription of a session pays for importing torch and Whisper,
+loading the checkpoint and the lazy initialization of the kernels and the
+memory allocator on the first decode. Warming up does all of that while the
+user is still choosing a file: the model is loaded in the process that will
+run the jobs and one second of near-silence is decoded, so the first real job
+runs at steady-state speed. When the GUI shows a quick preview, the preview
+model is warmed up too. Disable it with AUDIO_APP_WARMUP=0.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from logger import get_logger
+
+from .inference import backend_options, detect_language_samples, transcribe_samples
+from .language import AUTO, SAMPLE_RATE, get_default_language
+from .resources import ensure_plan
+from .worker import global_worker
+
+
+logger = get_logger(__name__)
+
+# Length of the dummy audio decoded to warm up the model
+WARMUP_SECONDS = 1.0
+
+
+def warmup_enabled() -> bool:
+    """Whether the model is warmed up at startup (AUDIO_APP_WARMUP)."""
+    return os.environ.get("AUDIO_APP_WARMUP", "1") != "0"
+
+
+def warm_up_model(model: str = "small", backend: str | None = None) -> float:
+    """Load a model in this process and run a dummy decode with it.
+
+    Uses the default precision and language of the jobs, so the model that
+    is warmed up is the one they will use. Returns the seconds it took.
+    """
+    start = time.perf_counter()
+    ensure_plan()
+
+    # Quiet noise: pure zeros would let some kernels take shortcuts
+    rng = np.random.default_rng(0)
+    samples = (1e-3 * rng.standard_normal(int(WARMUP_SECONDS * SAMPLE_RATE))).astype(
+        np.float32
+    )
+
+    language = get_default_language()
+    if language == AUTO:
+        language, _ = detect_language_samples(samples, model, backend)
+    transcribe_samples(
+        samples, model, {"language": language, **backend_options(backend)}
+    )
+    return time.perf_counter() - start
+
+
+def start_warm_up(
+    model: str = "small",
+    backend: str | None = None,
+    on_done=None,
+    worker=global_worker,
+    preview_model: str | None = None,
+) -> threading.Thread | None:
+    """Warm up a model in the transcription worker from a background thread.
+
+    `on_done(seconds, error)` is called from that thread when it finishes,
+    with `error` None on success. A job sent meanwhile waits for the warm-up
+    instead of loading the model a second time. A `preview_model` is warmed
+    up first, since a job with a preview decodes with it first. Returns the
+    thread, or None if warm-up is disabled.
+    """
+    if not warmup_enabled():
+        return None
+    models = [model]
+    if preview_model is not None and preview_model != model:
+        models.insert(0, preview_model)
+
+    def run():
+        start = time.perf_counter()
+        try:
+            for name in models:
+                worker.call(warm_up_model, name, backend)
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+            if on_done is not None:
+                on_done(None, e)
+            return
+        seconds = time.perf_counter() - start
+        logger.info(f"Whisper model ({', '.join(models)}) ready in {seconds:.1f}s")
+        if on_done is not None:
+            on_done(seconds, None)
+
+    thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,238 @@
+# src/transcription/worker.py
+
+"""Isolated worker process for transcription jobs that can be cancelled.
+
+A job that runs in a thread cannot be stopped: when it hangs, it keeps the
+model, the audio and the CPU busy while the next job starts. Jobs sent to a
+`TranscriptionWorker` run in a separate process instead, which is killed on
+timeout or cancellation (freeing its CPU and memory) and respawned on the
+next job. Between jobs the process stays alive, so its models remain warm.
+"""
+
+import multiprocessing
+import threading
+import time
+from contextlib import closing
+
+from logger import get_logger
+
+from .resources import ThreadPlan, apply_plan, plan_environment, plan_threads
+
+
+logger = get_logger(__name__)
+
+# Seconds between checks for results, cancellation and deadlines
+POLL_INTERVAL = 0.1
+
+
+class TranscriptionCancelled(RuntimeError):
+    """Raised when a job is cancelled by the user."""
+
+
+class TranscriptionTimeout(RuntimeError):
+    """Raised when a job exceeds its deadline."""
+
+
+def _worker_main(conn, plan=None) -> None:
+    """Loop of the worker process: run jobs until the pipe is closed."""
+    if plan is not None:
+        apply_plan(plan)
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+
+        func, args, kwargs, stream = job
+        try:
+            if stream:
+                # Send every item as soon as the generator produces it
+                for item in func(*args, **kwargs):
+                    conn.send(("item", item))
+                conn.send(("ok", None))
+            else:
+                conn.send(("ok", func(*args, **kwargs)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class TranscriptionWorker:
+    """Child process that runs one job at a time and can be killed."""
+
+    def __init__(self, reserve: int = 0, plan: ThreadPlan | None = None):
+        """Initialize the worker; the process starts with the first job.
+
+        `reserve` cores are left to the calling process (see
+        `resources.plan_threads`), unless the thread `plan` of the process is
+        given.
+        """
+        self.reserve = reserve
+        self.plan = plan
+        self._process = None
+        self._conn = None
+        self._job_lock = threading.Lock()
+        self._cancel_requested = threading.Event()
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the worker process is running."""
+        return self._process is not None and self._process.is_alive()
+
+    def call(
+        self,
+        func,
+        *args,
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+        **kwargs,
+    ):
+        """Run `func(*args, **kwargs)` in the worker process and return its result.
+
+        `func` must be a module-level function so it can be pickled. Raises
+        TranscriptionTimeout after `timeout` seconds and TranscriptionCancelled
+        when `cancel_event` is set, `cancel()` is called or the user presses
+        Ctrl+C. In all those cases the process is killed.
+        """
+        result = None
+        for _, payload in self._run(func, args, kwargs, False, timeout, cancel_event):
+            result = payload
+        return result
+
+    def stream(
+        self,
+        func,
+        *args,
+        timeout: float | None = None,
+        cancel_event: threading.Event | None = None,
+        **kwargs,
+    ):
+        """Run the generator function `func` in the worker and yield its items.
+
+        Items are yielded as soon as the worker produces them. `timeout` applies
+        to the whole job. If the caller stops iterating early, the process is
+        killed so that it does not keep working for nobody.
+        """
+        messages = self._run(func, args, kwargs, True, timeout, cancel_event)
+        with closing(messages):
+            for status, payload in messages:
+                if status == "item":
+                    yield payload
+
+    def _run(self, func, args, kwargs, stream, timeout, cancel_event):
+        """Send a job and yield its ("item" | "ok", payload) messages."""
+        with self._job_lock:
+            self._cancel_requested.clear()
+            self._ensure_started()
+            self._conn.send((func, args, kwargs, stream))
+            deadline = None if timeout is None else time.monotonic() + timeout
+            finished = False
+
+            try:
+                while True:
+                    if self._conn.poll(POLL_INTERVAL):
+                        status, payload = self._recv()
+                        if status == "error":
+                            finished = True
+                            raise RuntimeError(payload)
+                        finished = status == "ok"
+                        yield status, payload
+                        if finished:
+                            return
+                        continue
+
+                    if not self._process.is_alive():
+                        self._reset()
+                        raise RuntimeError("The transcription worker died")
+
+                    cancelled = self._cancel_requested.is_set() or (
+                        cancel_event is not None and cancel_event.is_set()
+                    )
+                    if cancelled:
+                        self.kill()
+                        raise TranscriptionCancelled("Transcription cancelled")
+
+                    if deadline is not None and time.monotonic() > deadline:
+                        self.kill()
+                        raise TranscriptionTimeout(
+                            f"Transcription exceeded its deadline ({timeout}s)"
+                        )
+
+            except KeyboardInterrupt:
+                self.kill()
+                raise TranscriptionCancelled("Transcription cancelled") from None
+            finally:
+                # The caller stopped iterating while the job was still running
+                if not finished and self.is_alive:
+                    self.kill()
+
+    def cancel(self) -> None:
+        """Cancel the running job from another thread."""
+        self._cancel_requested.set()
+
+    def kill(self) -> None:
+        """Kill the worker process immediately."""
+        if self._process is not None and self._process.is_alive():
+            logger.warning("Killing transcription worker")
+            self._process.kill()
+            self._process.join(timeout=5)
+        self._reset()
+
+    def shutdown(self) -> None:
+        """Ask the worker process to exit after its current job."""
+        if self.is_alive:
+            try:
+                self._conn.send(None)
+                self._process.join(timeout=5)
+            except OSError:
+                pass
+        self.kill()
+
+    def _ensure_started(self) -> None:
+        """Start (or respawn) the worker process."""
+        if self.is_alive:
+            return
+        self._reset()
+        # Spawn instead of fork: torch does not survive forking well
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        plan = self.plan or plan_threads(reserve=self.reserve)
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child_conn, plan),
+            name="transcription-worker",
+            daemon=True,
+        )
+        with plan_environment(plan):
+            self._process.start()
+        child_conn.close()
+        logger.info(
+            f"Transcription worker started (pid {self._process.pid}, "
+            f"{plan.intra_op_threads} threads)"
+        )
+
+    def _recv(self):
+        """Receive a message, treating a broken pipe as a dead worker."""
+        try:
+            return self._conn.recv()
+        except (EOFError, OSError) as e:
+            self.kill()
+            raise RuntimeError("The transcription worker died") from e
+
+    def _reset(self) -> None:
+        """Forget the current process and its pipe."""
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+        self._process = None
+
+
+# Worker shared by the GUI and the CLI, leaving a core for their interface
+global_worker = TranscriptionWorker(reserve=1)
+
+
+def cancel_transcription() -> None:
+    """Cancel the job running in the global worker."""
+    global_worker.cancel()
@@ -0,0 +1,117 @@
+"""Conformance and speed benchmark of the inference backends.
+
+Every backend transcribes the same corpus in its own process (so that the
+peak RSS is its own) through `transcription.inference`, the path used by the
+application. Reports the real-time factor (processing time / audio time, lower
+is better), the speedup and the word agreement with the first backend, which
+is the reference. Exits with status 1 when a backend agrees less than
+`--min-agreement` with it, so it can gate a new backend on real recordings.
+
+Run from the project root:
+    python tests/benchmarks/bench_backends.py --model small
+    python tests/benchmarks/bench_backends.py --corpus recordings/ --dtype int8
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from bench_quantize import _peak_rss_mib, make_synthetic_corpus, word_agreement
+
+
+SR = 16000
+
+
+def run_backend(backend, model, dtype, paths, language):
+    """Transcribe the corpus with one backend (inside a child process)."""
+    from audio.decoder import decode_audio
+    from transcription.inference import backend_options, transcribe_samples
+    from transcription.model_registry import acquire_model
+
+    os.environ['AUDIO_APP_MODEL_DTYPE'] = dtype
+    start = time.perf_counter()
+    with acquire_model(model, backend=backend):
+        pass
+    load_seconds = time.perf_counter() - start
+
+    options = {'language': language, **backend_options(backend)}
+    texts, audio_seconds, busy_seconds = [], 0.0, 0.0
+    for path in paths:
+        samples = decode_audio(path)
+        audio_seconds += len(samples) / SR
+        start = time.perf_counter()
+        result = transcribe_samples(samples, model, options)
+        busy_seconds += time.perf_counter() - start
+        texts.append(result['text'].strip())
+
+    return {
+        'backend': backend,
+        'load_seconds': load_seconds,
+        'rtf': busy_seconds / audio_seconds,
+        'peak_rss_mib': _peak_rss_mib(),
+        'texts': texts,
+    }
+
+
+def main():
+    """Run every backend in a child process and compare the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='small')
+    parser.add_argument('--dtype', default='float32')
+    parser.add_argument('--corpus', help='Folder of recordings (default: synthetic)')
+    parser.add_argument('--language', default='es')
+    parser.add_argument('--backends', nargs='+', default=['whisper', 'ctranslate2'])
+    parser.add_argument('--min-agreement', type=float, default=0.9)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        paths = json.loads(args.child)
+        print(json.dumps(run_backend(args.backends[0], args.model, args.dtype,
+                                     paths, args.language)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as folder:
+        if args.corpus:
+            paths = sorted(glob.glob(os.path.join(args.corpus, '*.*')))
+        else:
+            paths = make_synthetic_corpus(folder)
+
+        results = []
+        for backend in args.backends:
+            output = subprocess.run(
+                [sys.executable, __file__, '--model', args.model,
+                 '--dtype', args.dtype, '--language', args.language,
+                 '--backends', backend, '--child', json.dumps(paths)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    reference = results[0]
+    print(f'\nModel {args.model} ({args.dtype}), {len(paths)} files, '
+          f'reference: {reference["backend"]}')
+    print(f"{'backend':12s} {'load':>7s} {'RTF':>6s} {'speedup':>8s} "
+          f"{'peak RSS':>10s} {'agreement':>10s}")
+    failed = False
+    for result in results:
+        pairs = zip(reference['texts'], result['texts'], strict=True)
+        agreement = np.mean([word_agreement(r, t) for r, t in pairs])
+        failed |= agreement < args.min_agreement
+        print(f"{result['backend']:12s} {result['load_seconds']:6.1f}s "
+              f"{result['rtf']:6.2f} {reference['rtf'] / result['rtf']:7.1f}x "
+              f"{result['peak_rss_mib']:8.0f} MiB {agreement:9.0%}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
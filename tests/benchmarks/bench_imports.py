@@ -0,0 +1,93 @@
+"""Import-time benchmark of the entry points, with a regression budget.
+
+Imports every entry point in a fresh interpreter with `python -X importtime`
+(best of `--repeat` runs, so the disk cache is warm) and prints its total
+time and the packages that cost the most, grouped by top-level name. Exits
+with status 1 when an entry point takes longer than `--budget-ms`, so a heavy
+dependency imported at module level again (torch, whisper, sounddevice...)
+shows up as a failure.
+
+Run from the project root:
+    python tests/benchmarks/bench_imports.py
+    python tests/benchmarks/bench_imports.py --budget-ms 300 --top 15
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+
+SRC = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+
+ENTRY_POINTS = ['main_console', 'gui.gui_app', 'options', 'transcription',
+                'transcription.batch', 'transcription.daemon']
+
+# "import time: self [us] | cumulative | imported package"
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def import_times(module):
+    """Return [(name, self_us, cumulative_us)] of the imports done by `module`.
+
+    The interpreter startup (site, encodings...) is left out: `-X importtime`
+    prints nested imports before their parent, indented, so the imports of
+    the module are the indented lines right before its own line.
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC, capture_output=True, text=True, check=True,
+    ).stderr
+    lines = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            lines.append((name, int(own), int(cumulative), len(indent)))
+
+    end = max(i for i, line in enumerate(lines) if line[0] == module and not line[3])
+    start = end
+    while start > 0 and lines[start - 1][3]:
+        start -= 1
+    return [line[:3] for line in lines[start : end + 1]]
+
+
+def breakdown(times):
+    """Group the self time of every imported module by its top-level package."""
+    groups = defaultdict(int)
+    for name, own, _ in times:
+        groups[name.split('.')[0]] += own
+    return sorted(groups.items(), key=lambda item: -item[1])
+
+
+def main():
+    """Measure every entry point and compare it with the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=ENTRY_POINTS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8)
+    parser.add_argument('--budget-ms', type=float, default=500.0)
+    args = parser.parse_args()
+
+    failed = []
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        best = min(runs, key=lambda times: times[-1][2])
+        total_ms = best[-1][2] / 1000
+        status = 'OK' if total_ms <= args.budget_ms else 'OVER BUDGET'
+        print(f'\n{module}: {total_ms:.0f} ms ({status}, '
+              f'budget {args.budget_ms:.0f} ms)')
+        for package, own in breakdown(best)[: args.top]:
+            print(f'    {package:24s} {own / 1000:8.1f} ms')
+        if total_ms > args.budget_ms:
+            failed.append(module)
+
+    if failed:
+        print(f'\nOver budget: {", ".join(failed)}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
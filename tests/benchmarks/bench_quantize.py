@@ -0,0 +1,144 @@
+"""Benchmark of int8 quantized models against float32 on the CPU.
+
+Every precision runs in its own process so that the peak RSS is its own.
+Reports the real-time factor (processing time / audio time, lower is better),
+the peak RSS and the word agreement of the transcripts with float32.
+
+Run from the project root:
+    python tests/benchmarks/bench_quantize.py --model small
+    python tests/benchmarks/bench_quantize.py --model small --corpus recordings/
+"""
+
+import argparse
+import difflib
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SR = 16000
+
+
+def make_synthetic_corpus(folder, seconds=20):
+    """Write the synthetic test clips (tones, chirps and modulated noise)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SR)) / SR
+    clips = {
+        'tone.wav': 0.3 * np.sin(2 * np.pi * 440 * t),
+        'chirp.wav': 0.3 * np.sin(2 * np.pi * (200 + 40 * t) * t),
+        # Noise with a syllable-like 4 Hz envelope
+        'babble.wav': 0.2 * rng.standard_normal(len(t))
+        * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)),
+    }
+    paths = []
+    for name, audio in clips.items():
+        path = os.path.join(folder, name)
+        sf.write(path, audio.astype(np.float32), SR)
+        paths.append(path)
+    return paths
+
+
+def run_precision(model, dtype, paths, language):
+    """Transcribe the corpus with one precision (inside a child process)."""
+    from audio.decoder import decode_audio
+    from transcription.model_registry import acquire_model
+
+    start = time.perf_counter()
+    with acquire_model(model, dtype=dtype):
+        pass
+    load_seconds = time.perf_counter() - start
+
+    texts, audio_seconds, busy_seconds = [], 0.0, 0.0
+    for path in paths:
+        samples = decode_audio(path)
+        audio_seconds += len(samples) / SR
+        start = time.perf_counter()
+        with acquire_model(model, dtype=dtype) as whisper_model:
+            result = whisper_model.transcribe(
+                samples, language=language, verbose=None, fp16=False
+            )
+        busy_seconds += time.perf_counter() - start
+        texts.append(result['text'].strip())
+
+    return {
+        'dtype': dtype,
+        'load_seconds': load_seconds,
+        'rtf': busy_seconds / audio_seconds,
+        'peak_rss_mib': _peak_rss_mib(),
+        'texts': texts,
+    }
+
+
+def word_agreement(reference, text):
+    """Fraction of matching words between two transcripts."""
+    ref, hyp = reference.lower().split(), text.lower().split()
+    if not ref and not hyp:
+        return 1.0
+    return difflib.SequenceMatcher(None, ref, hyp).ratio()
+
+
+def _peak_rss_mib():
+    """Peak resident memory of this process in MiB (0 if unknown)."""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def main():
+    """Run every precision in a child process and compare the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='small')
+    parser.add_argument('--corpus', help='Folder of recordings (default: synthetic)')
+    parser.add_argument('--language', default='es')
+    parser.add_argument('--dtypes', nargs='+', default=['float32', 'int8'])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        paths = json.loads(args.child)
+        print(json.dumps(run_precision(args.model, args.dtypes[0], paths,
+                                       args.language)))
+        return
+
+    with tempfile.TemporaryDirectory() as folder:
+        if args.corpus:
+            paths = sorted(glob.glob(os.path.join(args.corpus, '*.*')))
+        else:
+            paths = make_synthetic_corpus(folder)
+
+        results = []
+        for dtype in args.dtypes:
+            output = subprocess.run(
+                [sys.executable, __file__, '--model', args.model,
+                 '--language', args.language, '--dtypes', dtype,
+                 '--child', json.dumps(paths)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    reference = results[0]['texts']
+    print(f'\nModel {args.model}, {len(paths)} files')
+    print(f"{'dtype':8s} {'load':>7s} {'RTF':>6s} {'peak RSS':>10s} {'agreement':>10s}")
+    for result in results:
+        pairs = zip(reference, result['texts'], strict=True)
+        agreement = np.mean([word_agreement(r, t) for r, t in pairs])
+        print(f"{result['dtype']:8s} {result['load_seconds']:6.1f}s "
+              f"{result['rtf']:6.2f} {result['peak_rss_mib']:8.0f} MiB "
+              f"{agreement:9.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Peak memory of reading a long multichannel file: whole-file vs block-wise.
+
+Writes a long multichannel WAV (PCM 16 by default) and reads it in separate
+child processes (so that each peak RSS is its own) with:
+
+- whole: `sf.read` of the whole file, then mono, normalization and resampling,
+  as the soundfile fallback of the decoder used to do;
+- blocks: `audio.reader.read_audio`, which only holds the 16 kHz output;
+- stream: iterating `audio.reader.iter_blocks` without keeping the blocks,
+  the memory bounded by the block size alone.
+
+Run from the project root:
+    python tests/benchmarks/bench_reader.py --minutes 30 --channels 2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from bench_quantize import _peak_rss_mib
+
+from audio.reader import iter_blocks, read_audio
+from audio.resample import resample
+
+
+SR = 16000
+
+
+def read_whole(path):
+    """Read the file the way the decoder did before the block reader."""
+    audio_data, sr = sf.read(path, dtype='float32')
+    if len(audio_data.shape) > 1:
+        audio_data = np.mean(audio_data, axis=1, dtype=np.float32)
+    max_val = np.abs(audio_data).max() if len(audio_data) else 0.0
+    if max_val > 1.0:
+        audio_data /= max_val
+    return resample(audio_data, sr, SR)
+
+
+def read_stream(path):
+    """Go through the blocks without keeping them; return the sample count."""
+    return sum(len(block) for block in iter_blocks(path, SR))
+
+
+MODES = {'whole': read_whole, 'blocks': read_audio, 'stream': read_stream}
+
+
+def write_long_file(path, minutes, channels, rate, subtype):
+    """Write `minutes` of noisy tones in one-minute pieces."""
+    rng = np.random.default_rng(0)
+    t = np.arange(60 * rate) / rate
+    with sf.SoundFile(path, 'w', rate, channels, subtype) as out:
+        for minute in range(minutes):
+            tones = [np.sin(2 * np.pi * (220 + 55 * c + minute) * t)
+                     for c in range(channels)]
+            piece = 0.3 * np.stack(tones, axis=1)
+            out.write(piece + 0.01 * rng.standard_normal(piece.shape))
+
+
+def peak_mib():
+    """Peak resident memory of this process in MiB.
+
+    On Linux `ru_maxrss` keeps the peak of the parent from before `exec`
+    (here, writing the test file), so the high-water mark of the process's
+    own memory (VmHWM) is read instead when it is available.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    return _peak_rss_mib()
+
+
+def run_mode(mode, path):
+    """Read the file with one mode (inside a child process)."""
+    before = peak_mib()
+    start = time.perf_counter()
+    result = MODES[mode](path)
+    seconds = time.perf_counter() - start
+    samples = result if isinstance(result, int) else len(result)
+    return {'mode': mode, 'seconds': seconds, 'samples': samples,
+            'peak_mib': peak_mib() - before}
+
+
+def main():
+    """Read the same file with every mode and compare peak memory and time."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--minutes', type=int, default=30)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--rate', type=int, default=44100)
+    parser.add_argument('--subtype', default='PCM_16')
+    parser.add_argument('--modes', nargs='+', default=list(MODES))
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.modes[0], args.child)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'long.wav')
+        write_long_file(path, args.minutes, args.channels, args.rate,
+                        args.subtype)
+        size_mib = os.path.getsize(path) / 2**20
+
+        results = []
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, __file__, '--modes', mode, '--child', path],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    output_mib = results[0]['samples'] * 4 / 2**20
+    print(f'\n{args.minutes} min, {args.channels} ch, {args.rate} Hz '
+          f'{args.subtype}: file {size_mib:.0f} MiB, output {output_mib:.0f} MiB')
+    print(f"{'mode':8s} {'time':>8s} {'peak RSS added':>15s}")
+    for result in results:
+        print(f"{result['mode']:8s} {result['seconds']:7.2f}s "
+              f"{result['peak_mib']:11.0f} MiB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
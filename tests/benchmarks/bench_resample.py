@@ -0,0 +1,68 @@
+"""Benchmark of the polyphase resampler against linear interpolation.
+
+Run from the project root:
+    python tests/benchmarks/bench_resample.py --seconds 600
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from audio.resample import resample
+
+
+def interp_resample(audio, orig_rate, target_rate):
+    """Resample as the old soundfile fallback did."""
+    num_samples = int(len(audio) * target_rate / orig_rate)
+    indices = np.linspace(0, len(audio) - 1, num_samples)
+    return np.interp(indices, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def measure(func, *args):
+    """Return (seconds, peak MiB of new allocations) of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def alias_level(func, orig_rate, target_rate):
+    """Peak output of a tone above the target Nyquist frequency (dBFS)."""
+    t = np.arange(orig_rate * 2) / orig_rate
+    tone = np.sin(2 * np.pi * 0.6 * target_rate * t).astype(np.float32)
+    out = func(tone, orig_rate, target_rate)[100:-100]
+    return 20 * np.log10(max(np.abs(out).max(), 1e-12))
+
+
+def main():
+    """Compare both resamplers on white noise."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=600)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for orig_rate in (44100, 48000):
+        audio = rng.standard_normal(int(args.seconds * orig_rate)).astype(np.float32)
+        input_mib = audio.nbytes / 2**20
+        print(f'\n{args.seconds:.0f}s at {orig_rate} Hz -> 16000 Hz '
+              f'(input {input_mib:.0f} MiB)')
+        for name, func in (('np.interp', interp_resample), ('polyphase', resample)):
+            elapsed, peak = measure(func, audio, orig_rate, 16000)
+            print(f'  {name:10s} {elapsed:6.2f}s  '
+                  f'{args.seconds / elapsed:8.0f}x realtime  '
+                  f'peak {peak:7.1f} MiB  '
+                  f'alias {alias_level(func, orig_rate, 16000):6.1f} dBFS')
+
+
+if __name__ == '__main__':
+    main()
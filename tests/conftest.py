@@ -3,6 +3,8 @@
 import os
 import sys
 
+import pytest
+
 
 # Make sure src is in sys.path so you can import `logger` in tests
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -12,3 +14,33 @@ from logger import setup_logging
 
 # Configure centralized logging for testing
 setup_logging()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_transcription_state(monkeypatch, tmp_path):
+    """Start every test without models loaded by previous tests.
+
+    A daemon running on the machine must not receive the test jobs either,
+    and transcripts, quantized models, incremental states, decode timings or
+    queued jobs saved by other tests must not be reused. The language, precision,
+    backend, CPU sharing, warm-up, VAD and recording format configured on the
+    machine must not change the defaults either.
+    """
+    monkeypatch.setenv("AUDIO_APP_DAEMON_SOCKET", str(tmp_path / "daemon.sock"))
+    monkeypatch.setenv("AUDIO_APP_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("AUDIO_APP_MODEL_CACHE_DIR", str(tmp_path / "models"))
+    monkeypatch.setenv("AUDIO_APP_INCREMENTAL_DIR", str(tmp_path / "incremental"))
+    monkeypatch.setenv("AUDIO_APP_SCHEDULER_FILE", str(tmp_path / "scheduler.json"))
+    monkeypatch.setenv("AUDIO_APP_QUEUE_DB", str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.delenv("AUDIO_APP_LANGUAGE", raising=False)
+    monkeypatch.delenv("AUDIO_APP_MODEL_DTYPE", raising=False)
+    monkeypatch.delenv("AUDIO_APP_BACKEND", raising=False)
+    monkeypatch.delenv("AUDIO_APP_CONCURRENT_JOBS", raising=False)
+    monkeypatch.delenv("AUDIO_APP_CPU_AFFINITY", raising=False)
+    monkeypatch.delenv("AUDIO_APP_WARMUP", raising=False)
+    monkeypatch.delenv("AUDIO_APP_VAD", raising=False)
+    monkeypatch.delenv("AUDIO_APP_RECORD_FORMAT", raising=False)
+    registry = sys.modules.get("transcription.model_registry")
+    if registry is not None:
+        registry.global_registry.clear()
+    yield
@@ -0,0 +1,166 @@
+"""Conformance tests for the inference backends."""
+
+import importlib.util
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import backends, transcriber
+from transcription.backends import ctranslate2_backend
+from transcription.model_registry import global_registry
+
+
+SR = 16000
+
+
+def check_result(result, duration):
+    """Assert that a backend result follows the Whisper result format."""
+    assert isinstance(result['text'], str)
+    assert isinstance(result['language'], str)
+    previous_start = 0.0
+    for segment in result['segments']:
+        assert set(segment) >= {'text', 'start', 'end', 'avg_logprob'}
+        assert previous_start <= segment['start'] <= segment['end'] <= duration + 0.5
+        previous_start = segment['start']
+    assert result['text'].strip() == ''.join(
+        s['text'] for s in result['segments']
+    ).strip()
+
+
+class FakeWhisperModel:
+    """Fake `openai-whisper` model."""
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Return one segment per second of audio."""
+        seconds = len(audio) // SR
+        segments = [
+            {'text': f' word{i}', 'start': float(i), 'end': i + 1.0,
+             'avg_logprob': -0.1}
+            for i in range(seconds)
+        ]
+        return {'text': ''.join(s['text'] for s in segments),
+                'segments': segments, 'language': language}
+
+
+class FakeFasterWhisperModel:
+    """Fake `faster_whisper.WhisperModel` with the same return types."""
+
+    def __init__(self):
+        """Record the options of every call."""
+        self.calls = []
+        self.model = SimpleNamespace(is_multilingual=True)
+
+    def transcribe(self, audio, language=None, **options):
+        """Return a lazy generator of segments and the transcription info."""
+        self.calls.append(dict(options, language=language))
+        seconds = len(audio) // SR
+        segments = (
+            SimpleNamespace(text=f' word{i}', start=float(i), end=i + 1.0,
+                            avg_logprob=-0.1)
+            for i in range(seconds)
+        )
+        return segments, SimpleNamespace(language=language or 'en')
+
+    def detect_language(self, audio):
+        """Return the language, its probability and all the probabilities."""
+        return 'en', 0.9, [('en', 0.9), ('es', 0.1)]
+
+
+@pytest.mark.parametrize('name', backends.available_backends())
+def test_every_backend_implements_the_protocol(name):
+    """Test that the registered backends have the backend interface."""
+    backend = backends.get_backend(name)
+    assert isinstance(backend, backends.TranscriptionBackend)
+    assert backend.name == name
+
+
+def test_backends_return_the_same_format():
+    """Test that both backends convert their output to Whisper results."""
+    audio = np.zeros(3 * SR, dtype=np.float32)
+
+    whisper_result = backends.get_backend('whisper').transcribe(
+        FakeWhisperModel(), audio, language='es'
+    )
+    fake = FakeFasterWhisperModel()
+    loaded = ctranslate2_backend.CTranslate2Model(fake, 0)
+    ct2_result = backends.get_backend('ctranslate2').transcribe(
+        loaded, audio, language='es', fp16=False, initial_prompt='hola'
+    )
+
+    check_result(whisper_result, 3.0)
+    check_result(ct2_result, 3.0)
+    assert ct2_result == whisper_result
+    # Greedy decoding like Whisper, without the options it does not know
+    assert fake.calls == [{'beam_size': 1, 'initial_prompt': 'hola',
+                           'language': 'es'}]
+    assert backends.get_backend('ctranslate2').detect_language(
+        loaded, audio
+    ) == ('en', 0.9)
+
+
+def test_ctranslate2_needs_faster_whisper(monkeypatch):
+    """Test that a missing optional dependency gives a clear error."""
+    monkeypatch.setitem(sys.modules, 'faster_whisper', None)
+    with pytest.raises(RuntimeError, match='faster-whisper'):
+        backends.get_backend('ctranslate2').load('tiny', None, 'int8')
+
+
+def test_transcribe_audio_uses_the_chosen_backend(monkeypatch):
+    """Test that the backend is chosen per job and keeps its own cache."""
+
+    class EchoBackend:
+        name = 'echo'
+
+        def load(self, model, device, dtype):
+            return model
+
+        def model_bytes(self, loaded):
+            return 1
+
+        def transcribe(self, loaded, audio, **options):
+            return {'text': f'echo {loaded} {options["language"]}',
+                    'segments': None, 'language': options['language']}
+
+        def detect_language(self, loaded, audio):
+            return 'en', 1.0
+
+    monkeypatch.setitem(backends._backends, 'echo', EchoBackend())
+    monkeypatch.setattr('whisper.load_model', lambda name: FakeWhisperModel())
+    audio = np.zeros(2 * SR, dtype=np.float32)
+
+    assert transcriber.transcribe_audio(audio, 'tiny') == 'word0 word1'
+    assert transcriber.transcribe_audio(
+        audio, 'tiny', backend='echo', language='auto'
+    ) == 'echo tiny en'
+    monkeypatch.setenv('AUDIO_APP_BACKEND', 'echo')
+    assert transcriber.transcribe_audio(audio, 'tiny') == 'echo tiny es'
+
+    engines = {key[3] for key in global_registry.stats()['models']}
+    assert engines == {'whisper', 'echo'}
+    assert transcriber.transcribe_audio(audio, 'tiny', backend='nope') is None
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(os.environ.get('INTEGRATION_TESTS') != '1',
+                    reason="Set INTEGRATION_TESTS=1 to run integration tests")
+@pytest.mark.parametrize('name', backends.available_backends())
+def test_backend_with_real_model(name):
+    """Test every backend with its real `tiny` model (downloaded once)."""
+    if name == 'ctranslate2' and importlib.util.find_spec('faster_whisper') is None:
+        pytest.skip('faster-whisper is not installed')
+
+    t = np.arange(3 * SR) / SR
+    audio = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    backend = backends.get_backend(name)
+    loaded = backend.load('tiny', 'cpu', 'float32')
+
+    assert backend.model_bytes(loaded) > 0
+    check_result(backend.transcribe(loaded, audio, language='es'), 3.0)
+    language, probability = backend.detect_language(loaded, audio)
+    assert isinstance(language, str) and 0.0 <= probability <= 1.0
@@ -0,0 +1,180 @@
+"""Tests for the lag controller of live transcription."""
+
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import backpressure, live
+
+
+SR = 16000
+
+
+class InlineWorker:
+    """Worker that runs the jobs in this process, where the fake models are."""
+
+    def call(self, func, *args, **kwargs):
+        """Run a job right away."""
+        return func(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def inline_worker(monkeypatch):
+    """Decode the live windows in this process."""
+    monkeypatch.setattr(live, 'global_worker', InlineWorker())
+
+
+class FakeClock:
+    """Clock that only moves when a fake model decodes."""
+
+    def __init__(self):
+        """Start at zero."""
+        self.now = 0.0
+
+    def perf_counter(self):
+        """Return the current fake time."""
+        return self.now
+
+
+class CostModel:
+    """Fake model that takes `costs[name]` seconds per second of audio."""
+
+    def __init__(self, name, clock, costs):
+        """Keep the clock and the table of costs (changed by the tests)."""
+        self.name = name
+        self.clock = clock
+        self.costs = costs
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Advance the clock and return one word per second."""
+        self.clock.now += self.costs[self.name] * len(audio) / SR
+        segments = [{'text': ' palabra', 'start': float(k), 'end': float(k + 1)}
+                    for k in range(len(audio) // SR)]
+        return {'text': 'palabra' * len(segments), 'segments': segments}
+
+
+def test_levels_degrade_in_steps():
+    """Test the ladder: VAD, greedy, longer windows, then smaller models."""
+    levels = backpressure.degradation_levels('small', 10.0, 1.0)
+    assert [(s.model, s.profile, s.window_seconds, s.vad) for s in levels] == [
+        ('small', 'default', 10.0, False),
+        ('small', 'default', 10.0, True),
+        ('small', 'greedy', 10.0, True),
+        ('small', 'greedy', 20.0, True),
+        ('base', 'greedy', 20.0, True),
+        ('tiny', 'greedy', 20.0, True),
+    ]
+    assert levels[2].options == {'temperature': 0.0}
+    assert levels[3].step_seconds == 3.0
+
+
+def test_controller_degrades_and_recovers():
+    """Test the thresholds, the settling time and the recovery."""
+    controller = backpressure.LagController(
+        backpressure.degradation_levels('base', 10.0, 1.0)
+    )
+    # Too slow, but the first decodes only measure the level
+    assert controller.observe(3.0, 2.0, 1.0) is None
+    assert controller.observe(4.0, 2.0, 1.0) is None
+    assert controller.observe(5.0, 2.0, 1.0).vad
+    assert controller.level == 1 and controller.rtf is None
+
+    # The lag alone, while it keeps growing
+    for lag in (14.0, 15.0):
+        assert controller.observe(lag, None, 1.0) is None
+    assert controller.observe(16.0, None, 1.0).profile == 'greedy'
+    # A level that makes the lag shrink is kept
+    for lag in (15.0, 14.0, 13.5, 12.0):
+        assert controller.observe(lag, 0.8, 1.0) is None
+
+    # Fast again: one level up once the average stayed low for RECOVER_STEPS
+    steps = 1
+    while (change := controller.observe(2.0, 0.1, 1.0)) is None:
+        steps += 1
+    # The moving average needs two decodes to fall below RECOVER_RTF
+    assert steps == backpressure.RECOVER_STEPS + 1
+    assert change.profile == 'default' and controller.level == 1
+    assert controller.metrics()['changes'] == 3
+
+
+def simulate(transcriber, clock, steps, recorded=0.0):
+    """Feed audio at the pace of a recording and decode it.
+
+    Returns the lag after every decode and the seconds recorded in all.
+    """
+    # A tone with short pauses: voice activity detection keeps all of it
+    t = np.arange(30 * SR) / SR
+    speech = (0.3 * np.sin(2 * np.pi * 220 * t) * (t % 3 < 2.6)).astype(np.float32)
+    lags = []
+    for _ in range(steps):
+        # The audio recorded while the previous decode ran, or one step
+        seconds = max(transcriber.settings.step_seconds, clock.now - recorded)
+        transcriber.feed(np.resize(speech, int(seconds * SR)))
+        recorded += seconds
+        clock.now = max(clock.now, recorded)
+        transcriber._step(final=False)
+        lags.append(transcriber.lag)
+    return lags, recorded
+
+
+def test_fast_enough_machine_keeps_the_requested_settings(monkeypatch):
+    """Test that a factor below DEGRADE_RTF never degrades, model load included."""
+    clock = FakeClock()
+    costs = {'small': 0.2, 'base': 0.1, 'tiny': 0.05}
+    monkeypatch.setattr(live, 'time', types.SimpleNamespace(
+        perf_counter=clock.perf_counter))
+
+    def load(name):
+        # Loading takes six seconds of the first decode
+        clock.now += 6.0
+        return CostModel(name, clock, costs)
+
+    monkeypatch.setattr('whisper.load_model', load)
+    transcriber = live.LiveTranscriber('small', language='es')
+
+    recorded, metrics = 0.0, []
+    for _ in range(40):
+        _, recorded = simulate(transcriber, clock, 1, recorded)
+        metrics.append(transcriber.metrics())
+    # The first decode loaded the model: not a measure of the speed
+    assert metrics[0]['rtf'] is None
+    assert all(m['level'] == 0 for m in metrics)
+    assert transcriber.controller.changes == 0
+    assert backpressure.RECOVER_RTF < metrics[-1]['rtf'] < backpressure.DEGRADE_RTF
+    assert max(m['lag'] for m in metrics) < 5
+
+
+def test_live_transcription_keeps_up_on_a_slow_machine(monkeypatch):
+    """Test that the lag stays bounded and the settings come back with the CPU."""
+    clock = FakeClock()
+    costs = {'small': 1.5, 'base': 0.3, 'tiny': 0.1}
+    monkeypatch.setattr(live, 'time', types.SimpleNamespace(
+        perf_counter=clock.perf_counter))
+    monkeypatch.setattr('whisper.load_model',
+                        lambda name: CostModel(name, clock, costs))
+
+    # With fixed settings the text falls further behind at every decode
+    fixed = live.LiveTranscriber('small', language='es', adaptive=False)
+    lags, _ = simulate(fixed, clock, 30)
+    assert lags[-1] > 100 and lags[-1] > lags[-10] + 40
+
+    clock.now = 0.0
+    transcriber = live.LiveTranscriber('small', language='es')
+    lags, recorded = simulate(transcriber, clock, 60)
+    degraded = transcriber.metrics()
+    assert degraded['model'] == 'base' and degraded['level'] == 4
+    assert max(lags[-20:]) < 5
+
+    # The machine is idle again: back to the requested settings
+    costs.update(small=0.05, base=0.02, tiny=0.01)
+    simulate(transcriber, clock, 300, recorded)
+    recovered = transcriber.metrics()
+    assert recovered['level'] == 0 and recovered['model'] == 'small'
+    assert recovered['rtf'] < backpressure.RECOVER_RTF
+    assert set(recovered) >= {'lag', 'backlog', 'rtf', 'window_seconds', 'vad'}
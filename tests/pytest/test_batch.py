@@ -0,0 +1,65 @@
+"""Tests for batch transcription."""
+
+import os
+import sys
+
+import numpy as np
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import batch
+
+
+def _make_tree(tmp_path):
+    """Create a folder with audio files in nested subfolders."""
+    (tmp_path / 'in' / 'sub').mkdir(parents=True)
+    for name in ('in/a.wav', 'in/sub/b.wav'):
+        sf.write(str(tmp_path / name), 0.1 * np.ones(16000), 16000)
+    (tmp_path / 'in' / 'notes.txt').write_text('not audio')
+    return tmp_path / 'in'
+
+
+def test_collect_folders_and_globs(tmp_path):
+    """Test that folders are walked recursively and globs are expanded."""
+    folder = _make_tree(tmp_path)
+
+    from_dir = [p for p, _ in batch.collect_audio_files([str(folder)])]
+    assert [os.path.basename(p) for p in from_dir] == ['a.wav', 'b.wav']
+
+    from_glob = batch.collect_audio_files([str(folder / '**' / '*.wav')])
+    assert len(from_glob) == 2
+    assert all(root is None for _, root in from_glob)
+
+
+def test_output_path_preserves_structure(tmp_path):
+    """Test where transcripts are written."""
+    audio = str(tmp_path / 'in' / 'sub' / 'b.wav')
+
+    assert batch.output_path_for(audio) == str(tmp_path / 'in' / 'sub' / 'b.txt')
+    out = batch.output_path_for(audio, str(tmp_path / 'in'), str(tmp_path / 'out'))
+    assert out == str(tmp_path / 'out' / 'sub' / 'b.txt')
+
+
+def test_batch_single_worker(monkeypatch, tmp_path):
+    """Test a batch run in-process with a mocked transcription."""
+    folder = _make_tree(tmp_path)
+    monkeypatch.setattr(batch.global_registry, 'get', lambda model: None)
+    # The batch decodes each file once and passes the samples on
+    monkeypatch.setattr(batch, 'transcribe_audio',
+                        lambda samples, model, **kw: f'texto {len(samples)}')
+
+    report = batch.transcribe_batch([str(folder)], workers=1,
+                                    output_dir=str(tmp_path / 'out'))
+
+    assert len(report.succeeded) == 2
+    assert report.audio_seconds == 2.0
+    assert report.throughput > 0
+    written = (tmp_path / 'out' / 'sub' / 'b.txt').read_text(encoding='utf-8')
+    assert written == 'texto 16000'
+
+    # Files already transcribed are skipped on the next run
+    again = batch.transcribe_batch([str(folder)], workers=1,
+                                   output_dir=str(tmp_path / 'out'))
+    assert again.results == []
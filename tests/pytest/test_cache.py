@@ -0,0 +1,134 @@
+"""Tests for the on-disk transcript cache."""
+
+import os
+import sys
+
+import numpy as np
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import cache, transcriber
+
+
+def test_key_depends_on_audio_model_and_params():
+    """Test that every input of the transcription changes the key."""
+    audio = np.zeros(1600, dtype=np.float32)
+    digest = cache.audio_fingerprint(audio)
+    key = cache.make_key(digest, 'small', language='es')
+
+    assert key == cache.make_key(digest, 'small', language='es')
+    assert key != cache.make_key(digest, 'base', language='es')
+    assert key != cache.make_key(digest, 'small', language='en')
+    other = cache.audio_fingerprint(audio + 0.1)
+    assert key != cache.make_key(other, 'small', language='es')
+
+
+def test_put_get_and_invalidate(tmp_path):
+    """Test storing, reading and removing a record."""
+    store = cache.TranscriptCache(str(tmp_path), max_bytes=10**6)
+
+    store.put('abc123', {'text': 'hola'})
+    assert store.get('abc123') == {'text': 'hola'}
+    assert store.get('missing') is None
+
+    assert store.invalidate('abc123')
+    assert store.get('abc123') is None
+
+
+def test_eviction_keeps_cache_under_size(tmp_path):
+    """Test that the oldest entries are evicted when the cache is full."""
+    store = cache.TranscriptCache(str(tmp_path), max_bytes=10**6)
+    for i in range(5):
+        store.put(f'{i:02d}key', {'text': os.urandom(200).hex()})
+        path = store._path(f'{i:02d}key')
+        os.utime(path, (i, i))
+
+    store._max_bytes = store.stats()['bytes'] - 1
+    store.prune()
+
+    assert store.get('00key') is None
+    assert store.get('04key') is not None
+
+
+def test_corrupt_entry_is_discarded(tmp_path):
+    """Test that an unreadable record counts as a miss."""
+    store = cache.TranscriptCache(str(tmp_path))
+    store.put('ffkey', {'text': 'x'})
+    with open(store._path('ffkey'), 'wb') as f:
+        f.write(b'garbage')
+
+    assert store.get('ffkey') is None
+    assert store.stats()['entries'] == 0
+
+
+def test_repeated_transcription_skips_model(monkeypatch, tmp_path):
+    """Test that the second transcription of the same audio is cached."""
+    import soundfile as sf
+
+    wav = tmp_path / 'c.wav'
+    sf.write(str(wav), 0.1 * np.ones(1600), 16000)
+    copy = tmp_path / 'copy.wav'
+    copy.write_bytes(wav.read_bytes())
+
+    calls = []
+
+    class FakeModel:
+        def transcribe(self, audio, language="es", verbose=False):
+            calls.append(audio)
+            return {"text": "texto cacheado"}
+
+        def half(self):
+            return self
+
+    monkeypatch.setattr('whisper.load_model', lambda model: FakeModel())
+
+    assert transcriber.transcribe_audio(str(wav)) == 'texto cacheado'
+    assert transcriber.transcribe_audio(str(copy)) == 'texto cacheado'
+    assert len(calls) == 1
+
+    assert transcriber.transcribe_audio(str(wav), use_cache=False) == 'texto cacheado'
+    assert len(calls) == 2
+
+    # The precision of the model is part of the key
+    monkeypatch.setenv('AUDIO_APP_MODEL_DTYPE', 'float16')
+    assert transcriber.transcribe_audio(str(wav)) == 'texto cacheado'
+    assert len(calls) == 3
+
+
+def test_empty_or_incomplete_transcripts_are_not_cached(monkeypatch, tmp_path):
+    """Test that a transcript with failed chunks or no text is decoded again."""
+    import soundfile as sf
+
+    wav = tmp_path / 'long.wav'
+    tone = 0.3 * np.sin(2 * np.pi * 220 * np.arange(65 * 16000) / 16000)
+    sf.write(str(wav), tone, 16000)
+
+    calls = []
+    texts = iter(['uno', RuntimeError('chunk failed'), 'tres', '', '', ''])
+
+    class FakeModel:
+        def transcribe(self, audio, language="es", verbose=False, **kwargs):
+            calls.append(audio)
+            text = next(texts, f'bloque {len(calls)}')
+            if isinstance(text, Exception):
+                raise text
+            return {"text": text}
+
+    monkeypatch.setattr('whisper.load_model', lambda model: FakeModel())
+
+    assert transcriber.transcribe_audio(str(wav), long_form=True) == 'uno tres'
+    assert (
+        transcriber.transcribe_audio(str(wav), long_form=True)
+        == 'No audio content detected'
+    )
+    assert transcriber.transcribe_audio(str(wav), long_form=True) == (
+        'bloque 7 bloque 8 bloque 9'
+    )
+    assert len(calls) == 9
+
+    # Only the complete transcript was cached
+    assert transcriber.transcribe_audio(str(wav), long_form=True) == (
+        'bloque 7 bloque 8 bloque 9'
+    )
+    assert len(calls) == 9
@@ -0,0 +1,226 @@
+"""Tests for the transcription daemon and its client."""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import client, daemon, transcriber
+from transcription.segments import Revision, Segment
+from transcription.worker import TranscriptionCancelled
+
+
+@pytest.fixture
+def running_daemon(tmp_path):
+    """Start a daemon on a temporary socket in a background thread."""
+    socket_path = str(tmp_path / 'daemon.sock')
+    server = daemon.create_server(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=2)
+
+
+def test_ping_and_transcribe(monkeypatch, tmp_path, running_daemon):
+    """Test that the daemon answers pings and transcribes files."""
+    import soundfile as sf
+
+    wav = tmp_path / 'd.wav'
+    sf.write(str(wav), np.zeros(1600), 16000)
+
+    received = {}
+
+    def fake_transcribe(path, model='small', use_daemon=True, **options):
+        received.update(path=path, model=model, use_daemon=use_daemon)
+        return 'texto daemon'
+
+    monkeypatch.setattr(daemon, 'transcribe_audio', fake_transcribe)
+
+    assert client.ping(running_daemon)
+    text = client.request_transcription(str(wav), 'tiny', socket_path=running_daemon)
+
+    assert text == 'texto daemon'
+    assert received == {'path': str(wav), 'model': 'tiny', 'use_daemon': False}
+
+
+def test_transcribe_audio_uses_running_daemon(monkeypatch, running_daemon):
+    """Test that transcribe_audio delegates to the daemon when it runs."""
+    monkeypatch.setenv('AUDIO_APP_DAEMON_SOCKET', running_daemon)
+    monkeypatch.setattr(daemon, 'transcribe_audio',
+                        lambda path, model='small', **options: 'remoto')
+
+    assert transcriber.transcribe_audio(__file__) == 'remoto'
+
+
+def test_transcribe_audio_falls_back_without_daemon(monkeypatch, tmp_path):
+    """Test that a stale socket file falls back to in-process transcription."""
+    import soundfile as sf
+
+    stale = tmp_path / 'stale.sock'
+    stale.write_text('')
+    monkeypatch.setenv('AUDIO_APP_DAEMON_SOCKET', str(stale))
+
+    wav = tmp_path / 'f.wav'
+    sf.write(str(wav), 0.1 * np.ones(1600), 16000)
+
+    class FakeModel:
+        def transcribe(self, audio, language="es", verbose=False):
+            return {"text": "local"}
+
+    monkeypatch.setattr('whisper.load_model', lambda model: FakeModel())
+
+    assert transcriber.transcribe_audio(str(wav)) == 'local'
+
+
+def test_request_without_daemon_raises(tmp_path):
+    """Test that the client reports a missing daemon."""
+    with pytest.raises(client.DaemonUnavailable):
+        client.request_transcription('a.wav', socket_path=str(tmp_path / 'x.sock'))
+
+
+def test_iter_segments_streams_from_daemon(monkeypatch, running_daemon):
+    """Test that segments and revisions arrive one by one from the daemon."""
+    monkeypatch.setenv('AUDIO_APP_DAEMON_SOCKET', running_daemon)
+    received = {}
+
+    def fake_segments(path, model='small', **options):
+        received.update(options, model=model)
+        yield Segment('hola', 0.0, 1.0, -0.1)
+        yield Segment('mundo', 1.0, 2.0)
+
+    def fake_revisions(path, model='small', **options):
+        yield Revision(0, [Segment('ola', 0.0, 1.0)], False)
+        yield Revision(0, [Segment('hola', 0.0, 1.0)], True)
+
+    monkeypatch.setattr(daemon, 'iter_segments', fake_segments)
+    monkeypatch.setattr(daemon, 'iter_revisions', fake_revisions)
+
+    segments = list(transcriber.iter_segments(__file__, 'tiny', language='en'))
+    assert segments == [Segment('hola', 0.0, 1.0, -0.1), Segment('mundo', 1.0, 2.0)]
+    assert received['model'] == 'tiny' and received['language'] == 'en'
+    assert received['use_daemon'] is False and received['isolated'] is False
+
+    revisions = list(transcriber.iter_revisions(__file__))
+    assert [(r.segments[0].text, r.final) for r in revisions] == [
+        ('ola', False), ('hola', True)]
+
+
+def test_daemon_stream_errors_and_cancellation(monkeypatch, running_daemon):
+    """Test that a failed job raises and that cancelling stops the daemon job."""
+    monkeypatch.setenv('AUDIO_APP_DAEMON_SOCKET', running_daemon)
+
+    def broken(path, **options):
+        raise RuntimeError('boom')
+        yield
+
+    monkeypatch.setattr(daemon, 'iter_segments', broken)
+    with pytest.raises(RuntimeError, match='boom'):
+        list(transcriber.iter_segments(__file__))
+
+    stopped = threading.Event()
+
+    def endless(path, cancel_event=None, **options):
+        yield Segment('uno', 0.0, 1.0)
+        if cancel_event.wait(5):
+            stopped.set()
+
+    monkeypatch.setattr(daemon, 'iter_segments', endless)
+    cancel_event = threading.Event()
+    segments = transcriber.iter_segments(__file__, cancel_event=cancel_event)
+    assert next(segments).text == 'uno'
+    cancel_event.set()
+    with pytest.raises(TranscriptionCancelled):
+        next(segments)
+    assert stopped.wait(5)
+
+
+class SlowDecodeModel:
+    """Fake model whose decoder runs `steps` slow steps per transcription."""
+
+    def __init__(self):
+        """Build a decoder module that counts and slows down its steps."""
+        import torch
+
+        model = self
+        self.steps = 1
+        self.decoded = 0
+
+        class SlowDecoder(torch.nn.Module):
+            def forward(self, tokens):
+                model.decoded += 1
+                time.sleep(0.01)
+                return tokens
+
+        self.decoder = SlowDecoder()
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Run the decoder steps and return a fixed text."""
+        import torch
+
+        for _ in range(self.steps):
+            self.decoder(torch.zeros(1))
+        return {'text': 'modelo caliente'}
+
+
+def test_daemon_runs_client_jobs_on_its_warm_model(
+    monkeypatch, tmp_path, running_daemon
+):
+    """Test that isolated client jobs use the preloaded model and can be cancelled."""
+    import soundfile as sf
+
+    from transcription.worker import global_worker
+
+    monkeypatch.setenv('AUDIO_APP_DAEMON_SOCKET', running_daemon)
+    wav = tmp_path / 'w.wav'
+    sf.write(str(wav), 0.1 * np.ones(16000), 16000)
+
+    model = SlowDecodeModel()
+    loads = []
+    monkeypatch.setattr('whisper.load_model', lambda name: loads.append(name) or model)
+    daemon.global_registry.get('tiny')
+
+    text = transcriber.transcribe_audio(
+        str(wav), 'tiny', use_cache=False, isolated=True
+    )
+    assert text == 'modelo caliente'
+    assert loads == ['tiny']
+    assert not global_worker.is_alive
+
+    # Cancelling stops the decode in the daemon at its next step
+    model.steps = 1000
+    cancel_event = threading.Event()
+    threading.Timer(0.5, cancel_event.set).start()
+    started = time.monotonic()
+    assert transcriber.transcribe_audio(
+        str(wav), 'tiny', use_cache=False, cancel_event=cancel_event
+    ) is None
+    assert time.monotonic() - started < 5
+    decoded = model.decoded
+    time.sleep(0.5)
+    assert model.decoded == decoded < 500
+
+
+def test_in_process_jobs_can_be_cancelled(monkeypatch, tmp_path):
+    """Test that a job that is not isolated stops when cancelled."""
+    import soundfile as sf
+
+    wav = tmp_path / 'c.wav'
+    sf.write(str(wav), 0.1 * np.ones(16000), 16000)
+    model = SlowDecodeModel()
+    model.steps = 1000
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+
+    cancel_event = threading.Event()
+    threading.Timer(0.5, cancel_event.set).start()
+    assert transcriber.transcribe_audio(
+        str(wav), use_daemon=False, isolated=False, cancel_event=cancel_event
+    ) is None
+    assert model.decoded < 500
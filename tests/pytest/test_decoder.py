@@ -0,0 +1,60 @@
+"""Tests for in-memory audio decoding."""
+
+import io
+import os
+import shutil
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audio import decoder
+
+
+def _raw(samples):
+    """Encode samples as FFmpeg's f32le output."""
+    return io.BytesIO(np.asarray(samples, dtype='<f4').tobytes())
+
+
+def test_read_samples_with_exact_estimate():
+    """Test that a correct estimate fills a single preallocated buffer."""
+    samples = np.linspace(-1, 1, 1000, dtype=np.float32)
+    out = decoder.read_samples(_raw(samples), expected=1000)
+    np.testing.assert_array_equal(out, samples)
+
+
+def test_read_samples_grows_past_a_short_estimate(monkeypatch):
+    """Test that data beyond the estimate is read in extra chunks."""
+    monkeypatch.setattr(decoder, 'CHUNK_SAMPLES', 64)
+    samples = np.arange(1000, dtype=np.float32)
+
+    np.testing.assert_array_equal(decoder.read_samples(_raw(samples), 100), samples)
+    np.testing.assert_array_equal(decoder.read_samples(_raw(samples)), samples)
+
+
+def test_falls_back_to_soundfile_without_ffmpeg(monkeypatch, tmp_path):
+    """Test decoding when FFmpeg is not installed."""
+    monkeypatch.setattr(decoder, 'get_ffmpeg_path', lambda: None)
+    wav = tmp_path / 'a.wav'
+    sf.write(str(wav), 0.5 * np.ones((4410, 2)), 44100)
+
+    out = decoder.decode_audio(str(wav))
+    assert out.dtype == np.float32
+    assert len(out) == 1600
+    assert np.allclose(out[200:-200], 0.5, atol=1e-3)
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='FFmpeg not installed')
+def test_decode_with_ffmpeg(tmp_path):
+    """Test the FFmpeg pipe with a real file."""
+    wav = tmp_path / 'a.wav'
+    tone = 0.1 * np.sin(2 * np.pi * 440 * np.arange(16000) / 16000)
+    sf.write(str(wav), tone, 16000)
+
+    out = decoder.decode_with_ffmpeg(str(wav))
+    assert len(out) == 16000
+    assert np.abs(out - tone).max() < 1e-3
@@ -28,9 +28,12 @@ def test_gui_transcribe_file(monkeypatch, tmp_path):
         import pytest
         pytest.skip('Tk not available in this environment')
 
-    # Mock load_audio and transcribe_audio in GUI module
+    # Mock load_audio and iter_segments in GUI module
+    from transcription import Segment
+
     monkeypatch.setattr('gui.gui_app.load_audio', lambda p: str(wav))
-    monkeypatch.setattr('gui.gui_app.transcribe_audio', lambda p: 'texto GUI')
+    monkeypatch.setattr('gui.gui_app.iter_segments',
+                        lambda p, **kw: iter([Segment('texto GUI', 0.0, 0.1)]))
 
     # Mock messagebox to avoid dialogs
     calls = {}
@@ -42,6 +45,7 @@ def test_gui_transcribe_file(monkeypatch, tmp_path):
     gui = AudioTranscriptionGUI(root)
 
     gui.selected_file = str(wav)
+    gui.preview_var.set(False)
     # Directly call the method that normally runs in a thread
     gui._transcribe_file_thread()
 
@@ -51,6 +55,69 @@ def test_gui_transcribe_file(monkeypatch, tmp_path):
     root.destroy()
 
 
+def test_gui_preview_is_replaced(monkeypatch, tmp_path):
+    """Test that the final text of every window replaces its preview."""
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        import pytest
+        pytest.skip('Tk not available in this environment')
+
+    from transcription import Revision, Segment
+
+    shown = []
+
+    def fake_revisions(path, **kwargs):
+        yield Revision(0, [Segment('ola', 0.0, 1.0)], False)
+        yield Revision(1, [Segment('mundo', 1.0, 2.0)], False)
+        shown.append(gui.result_text.get(1.0, tk.END).strip())
+        yield Revision(0, [Segment('hola', 0.0, 1.0)], True)
+        shown.append(gui.result_text.tag_ranges('preview'))
+        yield Revision(1, [Segment('mundo.', 1.0, 2.0)], True)
+
+    monkeypatch.setattr('gui.gui_app.iter_revisions', fake_revisions)
+    gui = AudioTranscriptionGUI(root)
+
+    assert gui._transcribe('a.wav') == 'hola mundo.'
+    assert shown[0] == 'ola mundo'
+    # Only the second window is still a preview
+    assert [str(index) for index in shown[1]] == ['1.5', '1.10']
+    assert gui.result_text.tag_ranges('preview') == ()
+
+    root.destroy()
+
+
+def test_gui_live_text(monkeypatch, tmp_path):
+    """Test that the tentative text of a live transcription is shown in gray."""
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        import pytest
+        pytest.skip('Tk not available in this environment')
+
+    from transcription import LiveUpdate
+
+    gui = AudioTranscriptionGUI(root)
+    gui._show_live(LiveUpdate('hola', 'mundo', [], False))
+    assert gui.result_text.get(1.0, tk.END).strip() == 'hola mundo'
+    assert [str(index) for index in gui.result_text.tag_ranges('preview')] == [
+        '1.5', '1.10']
+
+    monkeypatch.setattr('tkinter.messagebox.showinfo', lambda *a, **k: None)
+
+    class FinishedLive:
+        def finish(self):
+            return 'hola mundo.'
+
+    gui._finish_live_recording(FinishedLive())
+    assert gui.transcription_text == 'hola mundo.'
+    assert gui.result_text.tag_ranges('preview') == ()
+
+    root.destroy()
+
+
 def test_gui_save_and_copy(monkeypatch, tmp_path):
     """Try saving to file and copying to clipboard from the GUI."""
     # Mock filedialog and messagebox
@@ -86,3 +153,29 @@ def test_gui_save_and_copy(monkeypatch, tmp_path):
     assert captured.get('text') == 'text to save'
 
     root.destroy()
+
+
+def test_gui_skips_warm_up_with_daemon(monkeypatch):
+    """Test that no model is loaded locally when the daemon is running."""
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        import pytest
+        pytest.skip('Tk not available in this environment')
+
+    started = []
+    monkeypatch.setattr('gui.gui_app.start_warm_up',
+                        lambda **kwargs: started.append(kwargs))
+    monkeypatch.setattr('gui.gui_app.is_daemon_available', lambda: True)
+    gui = AudioTranscriptionGUI(root)
+
+    gui.start_warm_up()
+    assert started == []
+    assert gui.model_status_var.get() == 'Model ready (daemon)'
+
+    monkeypatch.setattr('gui.gui_app.is_daemon_available', lambda: False)
+    gui.start_warm_up()
+    assert len(started) == 1
+
+    root.destroy()
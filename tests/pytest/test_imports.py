@@ -0,0 +1,61 @@
+"""Tests for the lazy imports of the packages and entry points."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import audio
+import transcription
+from transcription import transcriber
+
+
+SRC = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+
+# Dependencies that must only be loaded when they are first used
+HEAVY = {'torch', 'whisper', 'faster_whisper', 'ctranslate2', 'sounddevice',
+         'soundfile', 'pyperclip'}
+
+# Entry point -> heavy dependencies that it may load at startup
+ALLOWED = {
+    'main_console': set(),
+    'options': set(),
+    'transcription': set(),
+    'transcription.resources': set(),
+    'audio': set(),
+    'output': set(),
+    # The GUI module binds the clipboard and the transcriber (decoder) by name
+    'gui.gui_app': {'pyperclip', 'soundfile'},
+}
+
+
+def imported_by(module):
+    """Return the top-level packages that importing a module loads."""
+    code = ('import json, sys; before = set(sys.modules); '
+            f'import {module}; '
+            'print(json.dumps(sorted({m.split(".")[0] for m in sys.modules} - '
+            '{m.split(".")[0] for m in before})))')
+    output = subprocess.run([sys.executable, '-c', code], cwd=SRC, check=True,
+                            capture_output=True, text=True).stdout
+    return set(json.loads(output.strip().splitlines()[-1]))
+
+
+@pytest.mark.parametrize('module', sorted(ALLOWED))
+def test_heavy_dependencies_load_on_first_use(module):
+    """Test that importing an entry point does not load torch, Whisper..."""
+    assert imported_by(module) & HEAVY <= ALLOWED[module]
+
+
+def test_lazy_package_names():
+    """Test that the re-exported names resolve to their submodules."""
+    assert transcription.transcribe_audio is transcriber.transcribe_audio
+    assert 'iter_segments' in dir(transcription)
+    with pytest.raises(AttributeError):
+        audio.missing_name  # noqa: B018
+    with pytest.raises(ImportError):
+        from audio import missing_name  # noqa: F401
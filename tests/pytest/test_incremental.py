@@ -0,0 +1,86 @@
+"""Tests for the incremental transcription of growing files."""
+
+import os
+import sys
+
+import numpy as np
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import incremental
+
+
+SR = 16000
+
+
+class ClockModel:
+    """Fake model that reads the time encoded in the audio, one word per second.
+
+    The test audio is a ramp whose value at second t is t / 1000, so every
+    word names the second of the original file it comes from.
+    """
+
+    def __init__(self):
+        """Record the length of every decoded window."""
+        self.seconds = []
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Return one segment per whole second of the window."""
+        self.seconds.append(len(audio) / SR)
+        segments = []
+        for k in range(len(audio) // SR):
+            second = int(audio[int((k + 0.5) * SR)] * 1000)
+            segments.append({'text': f' s{second}', 'start': float(k),
+                             'end': float(k + 1)})
+        return {'text': ''.join(s['text'] for s in segments), 'segments': segments}
+
+
+def write_clock(path, seconds):
+    """Write (or rewrite in place) the first `seconds` of the ramp."""
+    ramp = (np.arange(seconds * SR) + 0.5) / SR / 1000
+    sf.write(path, ramp.astype(np.float32), SR, subtype='FLOAT')
+
+
+def test_only_the_tail_is_decoded(monkeypatch, tmp_path):
+    """Test that every run decodes the new audio and appends its words."""
+    model = ClockModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    wav = str(tmp_path / 'growing.wav')
+
+    write_clock(wav, 10)
+    update = incremental.transcribe_incremental(wav, 'tiny')
+    # The last two seconds may still change: they wait for the next run
+    assert update.text == ' '.join(f's{i}' for i in range(8))
+    assert update.decoded_seconds == 10.0
+
+    write_clock(wav, 20)
+    update = incremental.transcribe_incremental(wav, 'tiny')
+    assert update.decoded_seconds == 13.0
+    assert [s.text for s in update.segments] == [f's{i}' for i in range(8, 18)]
+
+    # Nothing new: nothing is decoded
+    assert incremental.transcribe_incremental(wav, 'tiny').decoded_seconds == 0.0
+
+    update = incremental.transcribe_incremental(wav, 'tiny', final=True)
+    assert update.text == ' '.join(f's{i}' for i in range(20))
+    assert incremental.get_segments(wav)[-1].end == 20.0
+
+
+def test_replaced_file_starts_over(monkeypatch, tmp_path):
+    """Test that a new file at the same path is transcribed from the start."""
+    model = ClockModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    wav = str(tmp_path / 'dump.wav')
+    write_clock(wav, 10)
+    incremental.transcribe_incremental(wav, 'tiny', final=True)
+
+    replacement = str(tmp_path / 'new.wav')
+    write_clock(replacement, 5)
+    os.replace(replacement, wav)
+    update = incremental.transcribe_incremental(wav, 'tiny', final=True)
+    assert update.text == 's0 s1 s2 s3 s4'
+
+    assert incremental.reset_state(wav)
+    assert incremental.get_segments(wav) == []
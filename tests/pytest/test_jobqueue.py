@@ -0,0 +1,134 @@
+"""Tests for the durable transcription job queue."""
+
+import os
+import socket
+import subprocess
+import sys
+
+import numpy as np
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import batch, jobqueue
+
+
+def dead_worker():
+    """Return the lease owner name of a process of this machine that ended."""
+    process = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                             capture_output=True, text=True, check=True)
+    return f'{socket.gethostname()}:{process.stdout.strip()}'
+
+
+def test_jobs_go_through_their_stages(tmp_path):
+    """Test submission, priorities, stage timings and completion."""
+    queue = jobqueue.JobQueue()
+    low = queue.submit('a.wav', 'a.txt', language='es')
+    high = queue.submit('b.wav', 'b.txt', priority=5)
+    # The same file and output is not queued twice
+    assert queue.submit('a.wav', 'a.txt') == low
+
+    job = queue.claim('w1')
+    assert (job.id, job.state, job.attempts) == (high, 'converting', 1)
+    assert queue.set_stage(job.id, 'w1', 'transcribing')
+    # Only the worker that holds the lease can move the job
+    assert not queue.complete(job.id, 'w2')
+    assert queue.complete(job.id, 'w1')
+
+    done = queue.get(high)
+    assert done.state == 'done'
+    assert set(done.timings) == {'converting', 'transcribing'}
+    assert queue.claim('w1').options == {'language': 'es'}
+    assert queue.claim('w1') is None
+    assert queue.counts() == {'pending': 0, 'converting': 1, 'transcribing': 0,
+                              'done': 1, 'failed': 0}
+
+    # Done jobs are only queued again on purpose
+    queue.submit('b.wav', 'b.txt', priority=5)
+    assert queue.get(high).state == 'done'
+    queue.submit('b.wav', 'b.txt', force=True)
+    assert queue.get(high).state == 'pending'
+
+
+def test_failed_attempts_back_off_and_give_up(tmp_path):
+    """Test the retries of a failing job and its final failure."""
+    queue = jobqueue.JobQueue(backoff_seconds=60)
+    job_id = queue.submit('a.wav', max_attempts=2)
+
+    queue.claim('w1')
+    assert queue.fail(job_id, 'w1', 'out of memory') == 'pending'
+    # The retry is not due before the backoff
+    assert queue.claim('w1') is None
+    assert 55 < queue.next_due() <= 60
+
+    with queue._transaction() as conn:
+        conn.execute('UPDATE jobs SET next_attempt = 0')
+    assert queue.claim('w1').attempts == 2
+    assert queue.fail(job_id, 'w1', 'out of memory again') == 'failed'
+    assert queue.get(job_id).error == 'out of memory again'
+    assert queue.next_due() is None
+
+    assert queue.retry_failed() == 1
+    assert queue.claim('w1').attempts == 1
+
+
+def test_expired_and_orphaned_leases_are_taken_again(tmp_path):
+    """Test that jobs of workers that died are reclaimed."""
+    queue = jobqueue.JobQueue()
+    job_id = queue.submit('a.wav', max_attempts=2)
+
+    queue.claim('w1', lease_seconds=-1)
+    job = queue.claim('w2')
+    assert (job.id, job.attempts) == (job_id, 2)
+    assert not queue.heartbeat(job_id, 'w1')
+    assert queue.heartbeat(job_id, 'w2')
+
+    # Out of attempts: the job fails instead of running a third time
+    with queue._transaction() as conn:
+        conn.execute('UPDATE jobs SET lease_expires = 0')
+    assert queue.claim('w3') is None
+    assert queue.get(job_id).state == 'failed'
+
+    other = queue.submit('b.wav')
+    queue.claim(dead_worker())
+    queue.claim('remote-host:1')
+    assert queue.release_orphans() == 1
+    assert queue.claim('w4').id == other
+
+
+def test_batch_resumes_after_a_crash(monkeypatch, tmp_path):
+    """Test that a new batch run finishes the work of one that was killed."""
+    folder = tmp_path / 'in'
+    folder.mkdir()
+    for name in ('a', 'b', 'c'):
+        sf.write(str(folder / f'{name}.wav'), 0.1 * np.ones(16000), 16000)
+    monkeypatch.setattr(batch.global_registry, 'get', lambda model: None)
+    monkeypatch.setattr(jobqueue, 'BACKOFF_SECONDS', 0.0)
+    transcribed = []
+
+    def fake_transcribe(samples, model, **kw):
+        transcribed.append(model)
+        if len(transcribed) == 1:
+            raise MemoryError('killed')
+        return 'texto'
+
+    monkeypatch.setattr(batch, 'transcribe_audio', fake_transcribe)
+
+    # A previous run was killed: one file done, one taken, one pending
+    queue = jobqueue.JobQueue()
+    ids = [queue.submit(str(folder / f'{name}.wav'), str(tmp_path / f'{name}.txt'))
+           for name in ('a', 'b', 'c')]
+    queue.claim('w0')
+    queue.complete(ids[0], 'w0')
+    (tmp_path / 'a.txt').write_text('done before')
+    queue.claim(dead_worker())
+
+    report = batch.transcribe_batch([], workers=1)
+    # b (after one retry) and c; a is not transcribed again
+    assert len(report.succeeded) == 2
+    assert len(transcribed) == 3
+    assert (tmp_path / 'a.txt').read_text() == 'done before'
+    assert queue.counts('batch')['done'] == 3
+    # The attempt of the killed run counts too
+    assert queue.get(ids[1]).attempts == 3
@@ -0,0 +1,105 @@
+"""Tests for spoken language identification."""
+
+import os
+import sys
+
+import numpy as np
+import torch
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import language, transcriber
+from transcription.cache import audio_fingerprint
+
+
+SR = 16000
+
+
+class LanguageModel:
+    """Fake multilingual model that always hears English."""
+
+    is_multilingual = True
+
+    class dims:
+        """Model dimensions used to build the mel spectrogram."""
+
+        n_mels = 80
+
+    def __init__(self):
+        """Record detections and decodes."""
+        self.detections = []
+        self.languages = []
+
+    def half(self):
+        """Convert to float16, which changes nothing here."""
+        return self
+
+    def parameters(self):
+        """Return the parameters that give the device and dtype."""
+        return iter([torch.zeros(1)])
+
+    def detect_language(self, mel):
+        """Return language probabilities for one window."""
+        self.detections.append(tuple(mel.shape))
+        return None, {'es': 0.2, 'en': 0.7, 'fr': 0.1}
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Transcribe and remember the language used."""
+        self.languages.append(language)
+        return {'text': f'text in {language}'}
+
+
+def test_excerpt_is_the_densest_speech():
+    """Test that the excerpt skips the long silences."""
+    audio = np.zeros(90 * SR, dtype=np.float32)
+    audio[50 * SR:80 * SR] = 0.3 * np.sin(2 * np.pi * 220 * np.arange(30 * SR) / SR)
+    audio += 1e-4 * np.random.default_rng(0).standard_normal(len(audio)).astype(
+        np.float32
+    )
+
+    excerpt = language.speech_excerpt(audio, SR)
+    assert len(excerpt) == 30 * SR
+    assert np.mean(np.abs(excerpt) > 0.01) > 0.9
+
+
+def test_default_and_explicit_languages(monkeypatch):
+    """Test that detection only runs for "auto"."""
+    audio = np.zeros(SR, dtype=np.float32)
+    assert language.resolve_language(None, audio, 'small') == 'es'
+    assert language.resolve_language('FR', audio, 'small') == 'fr'
+
+    monkeypatch.setenv('AUDIO_APP_LANGUAGE', 'en')
+    assert language.resolve_language(None, audio, 'small') == 'en'
+
+
+def test_detection_is_cached_per_audio(monkeypatch):
+    """Test that the same recording is only analysed once."""
+    model = LanguageModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    audio = 0.1 * np.ones(40 * SR, dtype=np.float32)
+    digest = audio_fingerprint(audio)
+
+    assert language.detect_language(audio, 'small', digest) == 'en'
+    assert language.detect_language(audio, 'small', digest) == 'en'
+    assert model.detections == [(80, 3000)]
+
+    # Another precision of the model answers for itself
+    monkeypatch.setenv('AUDIO_APP_MODEL_DTYPE', 'float16')
+    assert language.detect_language(audio, 'small', digest) == 'en'
+    assert len(model.detections) == 2
+
+
+def test_auto_language_reaches_the_decode(monkeypatch, tmp_path):
+    """Test that the detected language is passed to the full decode."""
+    import soundfile as sf
+
+    model = LanguageModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    wav = tmp_path / 'en.wav'
+    sf.write(str(wav), 0.1 * np.sin(np.arange(SR) / 5), SR)
+
+    text = transcriber.transcribe_audio(str(wav), language='auto', use_daemon=False)
+    assert text == 'text in en'
+    assert model.languages == ['en']
+    assert len(model.detections) == 1
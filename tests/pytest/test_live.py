@@ -0,0 +1,160 @@
+"""Tests for the live transcription of a recording."""
+
+import builtins
+import os
+import sys
+
+import numpy as np
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from options import option2
+from transcription import live
+
+
+SR = 16000
+
+
+class InlineWorker:
+    """Worker that runs the jobs in this process, where the fake models are."""
+
+    def __init__(self):
+        """Record the jobs."""
+        self.jobs = []
+
+    def call(self, func, *args, **kwargs):
+        """Run a job right away."""
+        self.jobs.append(func)
+        return func(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def inline_worker(monkeypatch):
+    """Decode the live windows in this process."""
+    monkeypatch.setattr(live, 'global_worker', InlineWorker())
+
+
+class ClockModel:
+    """Fake model that reads the time encoded in the audio, one word per second.
+
+    The audio is a ramp whose value at second t is t / 1000, so every word
+    names the second of the recording it comes from.
+    """
+
+    def __init__(self, pause=True):
+        """Record the window lengths; without `pause` a window is one segment."""
+        self.pause = pause
+        self.seconds = []
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Return one segment per whole second of the window (or a single one)."""
+        self.seconds.append(len(audio) / SR)
+        words = [f's{int(audio[int((k + 0.5) * SR)] * 1000)}'
+                 for k in range(len(audio) // SR)]
+        if not self.pause:
+            segments = [{'text': ' ' + ' '.join(words), 'start': 0.0,
+                         'end': float(len(words))}]
+        else:
+            segments = [{'text': ' ' + word, 'start': float(k),
+                         'end': float(k + 1)} for k, word in enumerate(words)]
+        return {'text': ' '.join(words), 'segments': segments}
+
+
+def clock(start, seconds):
+    """Return `seconds` of the ramp starting at second `start`."""
+    return ((np.arange(start * SR, (start + seconds) * SR) + 0.5) / SR / 1000
+            ).astype(np.float32)
+
+
+def expected(seconds):
+    """Return the transcript of the first `seconds` of the ramp."""
+    return ' '.join(f's{i}' for i in range(seconds))
+
+
+def test_sliding_window_commits_every_word_once(monkeypatch):
+    """Test the committed and tentative text while feeding one second at a time."""
+    model = ClockModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    updates = []
+    transcriber = live.LiveTranscriber('tiny', language='es',
+                                       on_update=updates.append)
+
+    for second in range(25):
+        transcriber.feed(clock(second, 1))
+        transcriber._step(final=False)
+    # The last two seconds may still change
+    assert transcriber.committed == expected(23)
+    assert updates[-1].tentative == 's23 s24'
+    assert not updates[-1].final
+    # Only the audio not committed is decoded again
+    assert max(model.seconds) <= 4
+
+    assert transcriber.finish() == expected(25)
+    assert updates[-1].final and updates[-1].tentative == ''
+    assert [s.text for s in transcriber.segments] == expected(25).split()
+
+
+def test_full_window_moves_on_without_pauses(monkeypatch):
+    """Test that speech without pauses is committed once the window is full."""
+    model = ClockModel(pause=False)
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    updates = []
+    transcriber = live.LiveTranscriber('tiny', language='es', window_seconds=5,
+                                       on_update=updates.append)
+
+    for second in range(0, 20, 2):
+        transcriber.feed(clock(second, 2))
+        transcriber._step(final=False)
+    assert max(model.seconds) <= 6
+    assert transcriber.committed
+    # The tentative text does not repeat the words of the overlap
+    for update in updates:
+        shown = f'{update.committed} {update.tentative}'.split()
+        assert shown == sorted(set(shown), key=shown.index)
+    assert transcriber.finish().split()[-1] == 's19'
+
+
+def test_thread_finishes_after_stop(monkeypatch):
+    """Test the background thread and the final text after the last block."""
+    monkeypatch.setattr('whisper.load_model', lambda name: ClockModel())
+    transcriber = live.LiveTranscriber('tiny', language='es')
+    transcriber.start()
+    for second in range(8):
+        transcriber.feed(clock(second, 1))
+    assert transcriber.finish() == expected(8)
+
+
+def test_windows_are_decoded_in_the_worker(monkeypatch):
+    """Test that every window goes to the worker, which resolves the language."""
+    monkeypatch.setattr('whisper.load_model', lambda name: ClockModel())
+    monkeypatch.setattr(live, 'resolve_language', lambda *args: 'en')
+    worker = InlineWorker()
+    transcriber = live.LiveTranscriber('tiny', language='auto', worker=worker)
+    for second in range(3):
+        transcriber.feed(clock(second, 1))
+        transcriber._step(final=False)
+    assert transcriber.finish() == expected(3)
+    assert worker.jobs == [live._decode_window] * 4
+    assert transcriber.language == 'en'
+
+
+def test_option_2_live_mode(monkeypatch):
+    """Test the live mode of option 2, with the recorder feeding the blocks."""
+    monkeypatch.setattr('whisper.load_model', lambda name: ClockModel())
+    responses = iter(['3', '', '1'])
+    monkeypatch.setattr(builtins, 'input', lambda *args: next(responses))
+
+    def fake_start(on_audio=None):
+        for second in range(6):
+            on_audio(clock(second, 1))
+
+    monkeypatch.setattr(option2, 'start_recording', fake_start)
+    monkeypatch.setattr(option2, 'stop_recording', lambda: 'rec.wav')
+    copied = {}
+    monkeypatch.setattr(option2, 'copy_to_clipboard',
+                        lambda text: copied.setdefault('text', text))
+
+    option2.option_2_record_and_transcribe()
+    assert copied['text'] == expected(6)
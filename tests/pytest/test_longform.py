@@ -0,0 +1,236 @@
+"""Tests for long-form chunked transcription."""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import longform, transcriber
+from transcription.worker import TranscriptionWorker, global_worker
+
+
+SR = 16000
+
+
+def _speech_with_pauses(seconds, pause_every):
+    """Create a tone interrupted by half-second silences."""
+    audio = 0.3 * np.sin(2 * np.pi * 220 * np.arange(seconds * SR) / SR)
+    audio = audio.astype(np.float32)
+    for t in range(pause_every, seconds, pause_every):
+        audio[t * SR: t * SR + SR // 2] = 0.0
+    return audio
+
+
+def test_chunks_are_bounded_and_cut_in_silence():
+    """Test that chunks respect the maximum length and end in pauses."""
+    audio = _speech_with_pauses(100, 27)
+    chunks = longform.find_chunks(audio, SR, max_seconds=30, overlap_seconds=0)
+
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == len(audio)
+    for start, end in chunks:
+        assert end - start <= 30 * SR
+    for _, end in chunks[:-1]:
+        assert np.all(audio[end: end + 160] == 0.0)
+
+
+def test_short_audio_is_a_single_chunk():
+    """Test that audio shorter than a chunk is not split."""
+    audio = np.zeros(10 * SR, dtype=np.float32)
+    assert longform.find_chunks(audio, SR) == [(0, len(audio))]
+
+
+def test_merge_overlap_removes_repeated_words():
+    """Test that words repeated at the seam appear once."""
+    merged = longform.merge_overlap('hola a todos, bienvenidos', 'Bienvenidos al curso')
+    assert merged == 'hola a todos, bienvenidos al curso'
+    assert longform.merge_overlap('uno dos', 'tres cuatro') == 'uno dos tres cuatro'
+
+
+def _numbered_speech():
+    """Create three chunks of speech, 0.1, 0.2 and 0.3 loud, split by pauses."""
+    audio = _speech_with_pauses(70, 25)
+    audio[25 * SR:50 * SR] *= 2
+    audio[50 * SR:] *= 3
+    return audio / 3
+
+
+def _chunk_number(samples):
+    """Return the number of a chunk of `_numbered_speech` from its loudness."""
+    return round(float(np.abs(samples[-SR:]).max()) * 10)
+
+
+def numbered_chunk(samples, prompt):
+    """Name a chunk of `_numbered_speech` by its loudness; the second one hangs."""
+    index = _chunk_number(samples)
+    if index == 2:
+        time.sleep(60)
+    return f'parte {index}'
+
+
+class SlowDecodeModel:
+    """Whisper-like model whose decoder takes ten seconds on the second chunk."""
+
+    def __init__(self):
+        """Build a decoder module that sleeps on every step."""
+        import torch
+
+        class SlowDecoder(torch.nn.Module):
+            def forward(self, tokens):
+                time.sleep(0.05)
+                return tokens
+
+        self.decoder = SlowDecoder()
+
+    def transcribe(self, audio, verbose=False, **kwargs):
+        """Run one decoder step per chunk, or two hundred on the second one."""
+        import torch
+
+        index = _chunk_number(audio)
+        for _ in range(200 if index == 2 else 1):
+            self.decoder(torch.zeros(1))
+        return {'text': f'parte {index}'}
+
+
+def long_form_job(path):
+    """Transcribe `path` long-form with the slow model, timing the job."""
+    import whisper
+
+    whisper.load_model = lambda model, **kwargs: SlowDecodeModel()
+    started = time.monotonic()
+    text = transcriber.transcribe_audio(
+        path,
+        use_daemon=False,
+        use_cache=False,
+        long_form=True,
+        long_form_workers=2,
+        chunk_timeout=1,
+    )
+    return text, time.monotonic() - started
+
+
+class InlineWorker:
+    """Worker that runs the chunks in this process."""
+
+    def call(self, func, *args, timeout=None, cancel_event=None):
+        """Run a chunk right away."""
+        return func(*args)
+
+
+def test_transcribe_long_passes_prompt():
+    """Test that sequential chunks receive the end of the previous text."""
+    audio = _speech_with_pauses(70, 25)
+    prompts = []
+
+    def fake_chunk(samples, prompt):
+        prompts.append(prompt)
+        return f'parte {len(prompts)}'
+
+    text = longform.transcribe_long(audio, fake_chunk)
+
+    assert text == 'parte 1 parte 2 parte 3'
+    assert prompts == [None, 'parte 1', 'parte 2']
+
+
+def test_slow_decode_stops_at_its_deadline_in_process(monkeypatch):
+    """Test that the warm in-process model stops decoding past the deadline."""
+    monkeypatch.setattr('whisper.load_model', lambda model: SlowDecodeModel())
+    started = time.monotonic()
+
+    text = longform.transcribe_long_form(
+        _numbered_speech(), 'base', {}, chunk_timeout=1
+    )
+
+    assert text == 'parte 1 parte 3'
+    assert time.monotonic() - started < 5
+
+
+def test_long_form_runs_in_the_transcription_worker(tmp_path):
+    """Test long-form jobs in the daemonic worker, which cannot start processes."""
+    import soundfile as sf
+
+    wav = tmp_path / 'long.wav'
+    sf.write(str(wav), _numbered_speech(), SR)
+
+    try:
+        text, elapsed = global_worker.call(long_form_job, str(wav))
+    finally:
+        global_worker.shutdown()
+
+    assert text == 'parte 1 parte 3'
+    assert elapsed < 5
+
+
+def test_slow_chunk_is_killed_and_the_next_ones_run():
+    """Test that a chunk over its deadline is killed, not left holding the CPU."""
+    worker = TranscriptionWorker()
+    started = time.monotonic()
+    try:
+        text = longform.transcribe_long(
+            _numbered_speech(), numbered_chunk, chunk_timeout=10, workers=[worker]
+        )
+    finally:
+        worker.shutdown()
+
+    # The third chunk had its own deadline, not what the second one left
+    assert text == 'parte 1 parte 3'
+    assert time.monotonic() - started < 45
+
+
+def test_parallel_chunks_have_their_own_deadlines():
+    """Test that a hung chunk in parallel mode only costs its own text."""
+    workers = [TranscriptionWorker(), TranscriptionWorker()]
+    started = time.monotonic()
+    try:
+        text = longform.transcribe_long(
+            _numbered_speech(), numbered_chunk, chunk_timeout=10, workers=workers
+        )
+    finally:
+        for worker in workers:
+            worker.shutdown()
+
+    assert text == 'parte 1 parte 3'
+    assert time.monotonic() - started < 45
+
+
+def test_transcribe_long_with_workers():
+    """Test that chunks are shared between several workers."""
+    audio = _speech_with_pauses(70, 25)
+    text = longform.transcribe_long(
+        audio,
+        lambda samples, prompt: f'{len(samples) // SR}:{prompt}',
+        workers=[InlineWorker(), InlineWorker()],
+    )
+
+    assert len(text.split()) == 3
+    # Parallel chunks do not wait for the previous text
+    assert all(word.endswith(':None') for word in text.split())
+
+
+def test_long_audio_uses_chunks(monkeypatch, tmp_path):
+    """Test that transcribe_audio switches to long-form for long files."""
+    import soundfile as sf
+
+    wav = tmp_path / 'long.wav'
+    sf.write(str(wav), _speech_with_pauses(65, 20), SR)
+
+    calls = []
+
+    class FakeModel:
+        def transcribe(self, audio, language="es", verbose=False, **kwargs):
+            calls.append(len(audio))
+            return {"text": f"bloque {len(calls)}"}
+
+    monkeypatch.setattr('whisper.load_model', lambda model: FakeModel())
+    monkeypatch.setattr(transcriber, 'LONG_FORM_SECONDS', 60)
+
+    # In this process, where the fake model is
+    text = transcriber.transcribe_audio(str(wav))
+
+    assert len(calls) == 3
+    assert max(calls) <= 30 * SR
+    assert text == 'bloque 1 bloque 2 bloque 3'
@@ -0,0 +1,137 @@
+"""Tests for the Whisper model registry."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import model_registry
+
+
+class FakeTensor:
+    """Tensor stand-in that reports its memory footprint."""
+
+    def __init__(self, nbytes):
+        """Store the size in bytes."""
+        self.nbytes = nbytes
+
+    def numel(self):
+        """Return the number of elements."""
+        return self.nbytes
+
+    def element_size(self):
+        """Return the size of each element."""
+        return 1
+
+
+class FakeModel:
+    """Model stand-in with a configurable size."""
+
+    def __init__(self, name, nbytes=100):
+        """Store the name and size of the model."""
+        self.name = name
+        self.nbytes = nbytes
+
+    def parameters(self):
+        """Return the fake parameters."""
+        return [FakeTensor(self.nbytes)]
+
+
+def test_second_acquire_is_a_hit(monkeypatch):
+    """Test that a loaded model is reused instead of loaded again."""
+    loads = []
+
+    def fake_load(name):
+        loads.append(name)
+        return FakeModel(name)
+
+    monkeypatch.setattr('whisper.load_model', fake_load)
+    registry = model_registry.ModelRegistry(max_bytes=1000)
+
+    with registry.acquire('small') as first:
+        pass
+    with registry.acquire('small') as second:
+        pass
+
+    assert first is second
+    assert loads == ['small']
+    stats = registry.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['resident_bytes'] == 100
+
+
+def test_lru_eviction_over_budget(monkeypatch):
+    """Test that the least recently used model is evicted over budget."""
+    monkeypatch.setattr('whisper.load_model', lambda name: FakeModel(name, 60))
+    registry = model_registry.ModelRegistry(max_bytes=150)
+
+    registry.get('tiny')
+    registry.get('base')
+    registry.get('tiny')  # base becomes the least recently used
+    registry.get('small')
+
+    models = {key[0] for key in registry.stats()['models']}
+    assert models == {'tiny', 'small'}
+    assert registry.stats()['evictions'] == 1
+
+
+def test_model_in_use_is_not_evicted(monkeypatch):
+    """Test that a model being used survives eviction."""
+    monkeypatch.setattr('whisper.load_model', lambda name: FakeModel(name, 60))
+    registry = model_registry.ModelRegistry(max_bytes=100)
+
+    with registry.acquire('base'):
+        registry.get('small')
+        models = {key[0] for key in registry.stats()['models']}
+        assert 'base' in models
+
+
+def test_concurrent_acquire_loads_once(monkeypatch):
+    """Test that threads asking for the same model share a single load."""
+    loads = []
+
+    def slow_load(name):
+        loads.append(name)
+        time.sleep(0.1)
+        return FakeModel(name)
+
+    monkeypatch.setattr('whisper.load_model', slow_load)
+    registry = model_registry.ModelRegistry(max_bytes=1000)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get('small')))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert loads == ['small']
+    assert all(r is results[0] for r in results)
+
+
+def test_failed_load_is_not_cached(monkeypatch):
+    """Test that a failed load is retried on the next request."""
+    calls = []
+
+    def flaky_load(name):
+        calls.append(name)
+        if len(calls) == 1:
+            raise RuntimeError('download failed')
+        return FakeModel(name)
+
+    monkeypatch.setattr('whisper.load_model', flaky_load)
+    registry = model_registry.ModelRegistry(max_bytes=1000)
+
+    with pytest.raises(RuntimeError):
+        registry.get('small')
+    assert registry.get('small').name == 'small'
+    assert len(calls) == 2
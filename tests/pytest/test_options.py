@@ -29,7 +29,7 @@ def test_option_1_copy_to_clipboard(monkeypatch, tmp_path):
 
     # Mock functions used WITHIN the loaded module (references are there)
     monkeypatch.setattr(option1, 'load_audio', lambda p: p)
-    monkeypatch.setattr(option1, 'transcribe_audio', lambda p: 'texto prueba')
+    monkeypatch.setattr(option1, 'transcribe_audio', lambda p, **kw: 'texto prueba')
 
     called = {}
 
@@ -56,7 +56,7 @@ def test_option_2_record_and_copy(monkeypatch, tmp_path):
     monkeypatch.setattr(option2, 'record_audio',
                         lambda duration=30: str(tmp_path / 'rec.wav'))
     monkeypatch.setattr(option2, 'transcribe_audio',
-                        lambda p: 'texto desde grabacion')
+                        lambda p, **kw: 'texto desde grabacion')
 
     called = {}
     monkeypatch.setattr(option2, 'copy_to_clipboard',
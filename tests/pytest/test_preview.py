@@ -0,0 +1,113 @@
+"""Tests for the two-pass transcription with a quick preview."""
+
+import os
+import sys
+
+import numpy as np
+import soundfile as sf
+import torch
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import iter_revisions, iter_segments
+
+
+SR = 16000
+
+
+class NamedModel:
+    """Fake model that answers one word per call, tagged with its name."""
+
+    def __init__(self, name, calls):
+        """Keep the model name and a shared log of the calls."""
+        self.name = name
+        self.calls = calls
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Return a segment naming the model, the window and its prompt."""
+        self.calls.append(self.name)
+        prompt = kwargs.get('initial_prompt') or '-'
+        text = f' {self.name}:{len(audio) // SR}:{prompt.split()[-1]}'
+        return {'text': text, 'segments': [
+            {'text': text, 'start': 0.0, 'end': len(audio) / SR}]}
+
+
+def test_preview_then_final(monkeypatch, tmp_path):
+    """Test that previews come first and the final text matches a direct run."""
+    calls = []
+    monkeypatch.setattr('whisper.load_model',
+                        lambda name: NamedModel(name, calls))
+    decoded = []
+    from transcription import transcriber
+    real_decode = transcriber.decode_audio
+    monkeypatch.setattr('transcription.transcriber.decode_audio',
+                        lambda *a, **k: decoded.append(a) or real_decode(*a, **k))
+
+    wav = str(tmp_path / 'a.wav')
+    rng = np.random.default_rng(0)
+    sf.write(wav, 0.1 * rng.standard_normal(70 * SR), SR)
+
+    revisions = list(iter_revisions(wav, 'small', preview_model='tiny',
+                                    use_cache=False))
+    assert [(r.window, r.final) for r in revisions] == [
+        (0, False), (1, False), (2, False), (0, True), (1, True), (2, True)]
+    assert calls == ['tiny'] * 3 + ['small'] * 3
+    assert len(decoded) == 1
+    # The preview windows are the final ones
+    assert [r.segments[0].start for r in revisions[:3]] == [
+        r.segments[0].start for r in revisions[3:]]
+
+    final = [s for r in revisions if r.final for s in r.segments]
+    assert final == list(iter_segments(wav, 'small', use_cache=False,
+                                       isolated=False))
+
+
+def test_cached_final_skips_preview(monkeypatch, tmp_path):
+    """Test that a cached transcript is one final revision without a preview."""
+    calls = []
+    monkeypatch.setattr('whisper.load_model',
+                        lambda name: NamedModel(name, calls))
+    wav = str(tmp_path / 'a.wav')
+    sf.write(wav, 0.1 * np.ones(5 * SR), SR)
+
+    first = list(iter_revisions(wav, 'small', preview_model='tiny'))
+    assert calls == ['tiny', 'small']
+
+    again = list(iter_revisions(wav, 'small', preview_model='tiny'))
+    assert calls == ['tiny', 'small']
+    assert len(again) == 1 and again[0].final
+    assert again[0].segments == first[-1].segments
+
+
+def test_preview_model_detects_the_language(monkeypatch, tmp_path):
+    """Test that "auto" is detected by the preview model, not the final one."""
+    calls = []
+
+    class DetectingModel(NamedModel):
+        """Named model that also identifies the language."""
+
+        is_multilingual = True
+
+        class dims:
+            """Model dimensions used to build the mel spectrogram."""
+
+            n_mels = 80
+
+        def parameters(self):
+            """Return the parameters that give the device and dtype."""
+            return iter([torch.zeros(1)])
+
+        def detect_language(self, mel):
+            """Log the detection and hear English."""
+            self.calls.append(f'{self.name}:detect')
+            return None, {'en': 0.9, 'es': 0.1}
+
+    monkeypatch.setattr('whisper.load_model',
+                        lambda name: DetectingModel(name, calls))
+    wav = str(tmp_path / 'a.wav')
+    sf.write(wav, 0.1 * np.ones(5 * SR), SR)
+
+    list(iter_revisions(wav, 'small', preview_model='tiny', language='auto',
+                        use_cache=False))
+    assert calls == ['tiny:detect', 'tiny', 'small']
@@ -0,0 +1,75 @@
+"""Tests for the int8 quantized model mode."""
+
+import os
+import sys
+
+import torch
+import whisper
+from whisper.model import ModelDimensions, Whisper
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import model_registry, quantize
+
+
+def _tiny_whisper():
+    """Build a small randomly initialised Whisper model."""
+    torch.manual_seed(0)
+    dims = ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2,
+        n_audio_layer=2, n_vocab=51865, n_text_ctx=448, n_text_state=64,
+        n_text_head=2, n_text_layer=2,
+    )
+    return Whisper(dims).eval()
+
+
+def test_linear_layers_are_quantized():
+    """Test that Whisper's linear layers become int8 and stay accurate."""
+    model = _tiny_whisper()
+    mel = torch.randn(1, 80, 3000)
+    with torch.no_grad():
+        expected = model.encoder(mel)
+        quantized = quantize.quantize_model(model)
+        result = quantized.encoder(mel)
+
+    key = quantized.decoder.blocks[0].attn.key
+    assert key.weight().dtype == torch.qint8
+    similarity = torch.nn.functional.cosine_similarity(
+        expected.flatten(), result.flatten(), dim=0
+    )
+    assert similarity > 0.99
+
+
+def test_quantized_model_is_saved_once(monkeypatch):
+    """Test that a second load reads the quantized model from disk."""
+    loads = []
+
+    def fake_load_model(name, device=None):
+        loads.append(name)
+        return _tiny_whisper()
+
+    monkeypatch.setattr(whisper, 'load_model', fake_load_model)
+
+    quantize.load_quantized_model('tiny')
+    assert os.path.exists(quantize.quantized_model_path('tiny'))
+    model = quantize.load_quantized_model('tiny')
+
+    assert loads == ['tiny']
+    assert model.decoder.blocks[0].attn.key.weight().dtype == torch.qint8
+
+
+def test_registry_exposes_int8(monkeypatch):
+    """Test selecting int8 per call and through the default precision."""
+    monkeypatch.setattr(whisper, 'load_model',
+                        lambda name, device=None: _tiny_whisper())
+    registry = model_registry.ModelRegistry()
+
+    full = registry.get('tiny', dtype='float32')
+    small = registry.get('tiny', dtype='int8')
+    monkeypatch.setenv('AUDIO_APP_MODEL_DTYPE', 'int8')
+    assert registry.get('tiny') is small
+
+    sizes = {key[2]: m['bytes'] for key, m in registry.stats()['models'].items()}
+    assert sizes['int8'] < sizes['float32']
+    assert full is not small
@@ -0,0 +1,63 @@
+"""Tests for the block-wise audio reader."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audio import reader
+from audio.resample import resample
+
+
+def read_whole(path):
+    """Convert a file in one go: mono, peak normalization and 16 kHz."""
+    audio_data, sr = sf.read(path, dtype='float32', always_2d=True)
+    audio_data = np.mean(audio_data, axis=1, dtype=np.float32)
+    peak = np.abs(audio_data).max()
+    if peak > 1.0:
+        audio_data /= peak
+    return resample(audio_data, sr, 16000)
+
+
+@pytest.mark.parametrize('subtype, rate, channels, amplitude', [
+    ('PCM_16', 44100, 2, 0.5),
+    ('PCM_24', 16000, 1, 0.9),
+    ('FLOAT', 48000, 3, 3.0),
+])
+def test_blocks_match_the_whole_file(tmp_path, subtype, rate, channels, amplitude):
+    """Test that reading in small blocks gives the whole-file conversion."""
+    rng = np.random.default_rng(0)
+    samples = amplitude * rng.uniform(-1, 1, (2 * rate + 123, channels))
+    path = str(tmp_path / 'a.wav')
+    sf.write(path, samples.astype(np.float32), rate, subtype=subtype)
+
+    expected = read_whole(path)
+    out = reader.read_audio(path, block_frames=1000)
+    assert out.dtype == np.float32
+    assert len(out) == len(expected)
+    np.testing.assert_allclose(out, expected, atol=1e-6)
+    if amplitude > 1.0:
+        assert np.abs(out).max() <= 1.0 + 1e-3
+
+
+def test_iter_blocks_yields_independent_blocks(tmp_path):
+    """Test that kept blocks are not overwritten by the following ones."""
+    path = str(tmp_path / 'a.wav')
+    sf.write(path, np.linspace(-0.5, 0.5, 5000), 16000)
+
+    blocks = list(reader.iter_blocks(path, block_frames=1024))
+    assert [len(block) for block in blocks] == [1024] * 4 + [904]
+    np.testing.assert_allclose(np.concatenate(blocks),
+                               np.linspace(-0.5, 0.5, 5000), atol=1e-4)
+
+
+def test_empty_file(tmp_path):
+    """Test that a file without frames gives no samples."""
+    path = str(tmp_path / 'a.wav')
+    sf.write(path, np.zeros((0, 2)), 44100)
+    assert len(reader.read_audio(path)) == 0
@@ -2,13 +2,18 @@
 
 import os
 import sys
+import threading
 
 import numpy as np
+import pytest
+import soundfile as sf
 
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from audio import recorder
+from audio.buffer import PagedBuffer
+from audio.writer import StreamWriter, get_record_format
 
 
 def test_record_audio_no_devices(monkeypatch):
@@ -43,13 +48,118 @@ def test_audio_recorder_stop_creates_file(tmp_path):
     a = recorder.AudioRecorder()
     # Simulate that you were recording
     a.is_recording = True
-    import numpy as np
-    a.audio_data = [np.ones((10, 1),
-                    dtype=np.float32) * 0.1,
-                    np.ones((10, 1),
-                    dtype=np.float32) * 0.1]
+    a.buffer.write(np.ones(10, dtype=np.float32) * 0.1)
+    a.buffer.write(np.ones(10, dtype=np.float32) * 0.1)
 
     wav = a.stop_recording()
     assert wav is not None
     assert os.path.exists(wav)
     os.remove(wav)
+
+
+def test_paged_buffer_spans_pages():
+    """Test writes across page boundaries and reads."""
+    buffer = PagedBuffer(page_frames=8)
+    buffer.write(np.arange(5, dtype=np.float32))
+    buffer.reserve()
+    spare = buffer._spare
+    buffer.write(-np.arange(5, 17, dtype=np.float32))
+
+    assert buffer.frames == 17
+    # The reserved page was used instead of allocating in the writer
+    assert buffer._spare is None and buffer._pages[1] is spare
+    assert [len(page) for page in buffer.pages()] == [8, 8, 1]
+    expected = np.concatenate([np.arange(5), -np.arange(5, 17)])
+    np.testing.assert_array_equal(np.concatenate(buffer.pages()), expected)
+    np.testing.assert_array_equal(buffer.read(6, 10), expected[6:10])
+    # Within a page, reads are views
+    assert buffer.read(1, 3).base is buffer._pages[0]
+    assert len(buffer.read(17)) == 0
+
+
+def test_paged_buffer_reader_sees_whole_blocks():
+    """Test that a reader running with the writer only sees written frames."""
+    buffer = PagedBuffer(page_frames=1000)
+    blocks = 500
+
+    def produce():
+        for index in range(blocks):
+            buffer.write(np.full(64, index, dtype=np.float32))
+
+    writer = threading.Thread(target=produce)
+    writer.start()
+    seen = 0
+    while seen < blocks * 64:
+        frames = buffer.frames
+        data = buffer.read(seen, frames)
+        np.testing.assert_array_equal(data, np.arange(seen, frames) // 64)
+        seen = frames
+    writer.join()
+
+
+def test_stop_recording_clips_and_resamples():
+    """Test the WAV written from the pages of a loud 48 kHz recording."""
+    a = recorder.AudioRecorder(capture_rate=48000)
+    a.is_recording = True
+    t = np.arange(48000) / 48000
+    for block in np.array_split(2 * np.sin(2 * np.pi * 440 * t), 12):
+        a.buffer.write(block)
+
+    wav = a.stop_recording()
+    audio, rate = sf.read(wav)
+    os.remove(wav)
+    assert rate == 16000 and abs(len(audio) - 16000) <= 1
+    assert 0.95 < np.abs(audio).max() <= 1.0
+
+
+def test_stream_writer_saves_and_releases_pages(tmp_path):
+    """Test that saved pages leave memory and the file is readable before stop."""
+    buffer = PagedBuffer(page_frames=1000)
+    path = str(tmp_path / 'live.wav')
+    writer = StreamWriter(buffer, path, 16000, 16000)
+    buffer.write(np.full(2500, 0.25, dtype=np.float32))
+    writer._drain()
+
+    # Two whole pages are on disk and no longer in memory
+    assert buffer.first_frame == 2000 and buffer._pages[:2] == [None, None]
+    with pytest.raises(ValueError):
+        buffer.read(0, 10)
+    # The header is up to date, as if the program had died here
+    assert sf.info(path).frames == 2500
+
+    buffer.write(np.full(700, 2.0, dtype=np.float32))
+    assert writer.finish() == 3200
+    audio, rate = sf.read(path)
+    assert len(audio) == 3200 and audio.max() == pytest.approx(1.0, abs=1e-4)
+
+
+def test_recorder_writes_flac(monkeypatch):
+    """Test recording to FLAC chosen with the environment variable."""
+    monkeypatch.setenv('AUDIO_APP_RECORD_FORMAT', 'flac')
+    a = recorder.AudioRecorder()
+    a.is_recording = True
+    a.buffer.write(np.full(1600, 0.1, dtype=np.float32))
+
+    path = a.stop_recording()
+    assert path.endswith('.flac')
+    audio, rate = sf.read(path)
+    os.remove(path)
+    assert rate == 16000 and len(audio) == 1600
+
+    monkeypatch.setenv('AUDIO_APP_RECORD_FORMAT', 'mp3')
+    with pytest.raises(ValueError):
+        get_record_format()
+
+
+def test_stream_writer_passes_blocks_on(tmp_path):
+    """Test that the blocks written are also handed to `on_audio`."""
+    blocks = []
+    buffer = PagedBuffer(page_frames=1000)
+    writer = StreamWriter(buffer, str(tmp_path / 'live.wav'), 48000, 16000,
+                          on_audio=blocks.append)
+    buffer.write(np.full(4800, 0.1, dtype=np.float32))
+    writer._drain()
+    buffer.write(np.full(4800, 0.1, dtype=np.float32))
+
+    assert writer.finish() == sum(len(block) for block in blocks)
+    assert abs(sum(len(block) for block in blocks) - 3200) <= 1
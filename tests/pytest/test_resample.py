@@ -0,0 +1,58 @@
+"""Tests for the polyphase resampler."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from audio.resample import PolyphaseResampler, resample
+
+
+def _tone(freq, rate, seconds=1.0):
+    """Create a float32 sine tone."""
+    return np.sin(2 * np.pi * freq * np.arange(int(rate * seconds)) / rate).astype(
+        np.float32
+    )
+
+
+@pytest.mark.parametrize('orig, target', [(44100, 16000), (48000, 16000),
+                                          (8000, 16000), (22050, 16000)])
+def test_tone_is_preserved(orig, target):
+    """Test that an in-band tone keeps its shape and length."""
+    out = resample(_tone(440, orig), orig, target)
+    expected = _tone(440, target)
+
+    assert out.dtype == np.float32
+    assert len(out) == len(expected)
+    assert np.abs(out - expected)[100:-100].max() < 1e-3
+
+
+def test_frequencies_above_nyquist_are_removed():
+    """Test that a tone above the new Nyquist frequency does not alias."""
+    out = resample(_tone(10000, 44100), 44100, 16000)
+    assert np.abs(out[100:-100]).max() < 1e-3
+
+
+def test_streaming_matches_one_shot():
+    """Test that feeding random-sized blocks gives the one-shot result."""
+    audio = np.random.default_rng(0).standard_normal(44100).astype(np.float32)
+    resampler = PolyphaseResampler(44100, 16000)
+
+    parts = []
+    for start in range(0, len(audio), 777):
+        parts.append(resampler.process(audio[start:start + 777]))
+    parts.append(resampler.flush())
+
+    np.testing.assert_allclose(
+        np.concatenate(parts), resample(audio, 44100, 16000), atol=1e-6
+    )
+
+
+def test_same_rate_is_unchanged():
+    """Test that no filtering happens when the rates are equal."""
+    audio = _tone(440, 16000)
+    assert resample(audio, 16000, 16000) is audio
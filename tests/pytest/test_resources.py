@@ -0,0 +1,79 @@
+"""Tests for the CPU thread and affinity plans."""
+
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import batch, resources, worker
+
+
+@pytest.fixture
+def eight_cpus(monkeypatch):
+    """Pretend that the process may run on 8 cores."""
+    monkeypatch.setattr(resources, 'available_cpus', lambda: list(range(8)))
+
+
+def test_cores_are_split_among_jobs(eight_cpus, monkeypatch):
+    """Test the threads and cores given to every concurrent job."""
+    assert resources.plan_threads() == resources.ThreadPlan(8, 1, None)
+    assert resources.plan_threads(3).intra_op_threads == 2
+    assert resources.plan_threads(16).intra_op_threads == 1
+
+    monkeypatch.setenv('AUDIO_APP_CONCURRENT_JOBS', '2')
+    assert resources.plan_threads().intra_op_threads == 4
+    monkeypatch.setenv('AUDIO_APP_CPU_AFFINITY', '1')
+    assert resources.plan_threads(slot=1).cpus == (4, 5, 6, 7)
+    # More jobs than cores: threads are shared, nobody is pinned
+    assert resources.plan_threads(16).cpus is None
+
+
+def test_reserve_only_on_larger_machines(eight_cpus, monkeypatch):
+    """Test that a core is left to the interface when there are enough."""
+    assert resources.plan_threads(reserve=1).intra_op_threads == 7
+    assert resources.plan_threads(reserve=1, pin=True).cpus == tuple(range(7))
+
+    monkeypatch.setattr(resources, 'available_cpus', lambda: [0, 1])
+    assert resources.plan_threads(reserve=1).intra_op_threads == 2
+
+
+def test_plan_environment_is_restored(monkeypatch):
+    """Test that the thread variables only change inside the block."""
+    monkeypatch.setenv('OMP_NUM_THREADS', '7')
+    monkeypatch.delenv('MKL_NUM_THREADS', raising=False)
+
+    with resources.plan_environment(resources.ThreadPlan(3)):
+        assert os.environ['OMP_NUM_THREADS'] == '3'
+        assert os.environ['MKL_NUM_THREADS'] == '3'
+    assert os.environ['OMP_NUM_THREADS'] == '7'
+    assert 'MKL_NUM_THREADS' not in os.environ
+
+
+def test_batch_workers_apply_their_plan(eight_cpus, monkeypatch):
+    """Test that a batch worker takes its slot and its thread count."""
+    applied = []
+    monkeypatch.setattr(batch, 'apply_plan', applied.append)
+    monkeypatch.setattr(batch.global_registry, 'get', lambda model: None)
+    monkeypatch.setenv('AUDIO_APP_CPU_AFFINITY', '1')
+
+    slots = multiprocessing.Value('i', 1)
+    batch._init_worker('tiny', 2, 3, slots)
+    assert applied == [resources.ThreadPlan(3, 1, (4, 5, 6, 7))]
+    assert slots.value == 2
+
+
+def test_worker_process_runs_with_its_plan():
+    """Test that the worker process applies its plan before the first job."""
+    transcription_worker = worker.TranscriptionWorker(reserve=1)
+    expected = resources.plan_threads(reserve=1)
+    try:
+        assert transcription_worker.call(resources.get_current_plan) == expected
+        assert transcription_worker.call(os.getenv, 'OMP_NUM_THREADS') == str(
+            expected.intra_op_threads
+        )
+    finally:
+        transcription_worker.shutdown()
@@ -0,0 +1,168 @@
+"""Tests for the deadline-aware choice of model and decoding parameters."""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import scheduler, transcribe_audio
+
+
+SR = 16000
+
+
+def voice(seconds):
+    """Return a harmonic tone with a syllable-like envelope."""
+    t = np.arange(int(seconds * SR)) / SR
+    tone = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 8))
+    return (0.2 * tone * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))).astype(np.float32)
+
+
+def test_candidates_and_estimates():
+    """Test the models considered and the cost of silence and loading."""
+    assert scheduler.candidate_models('medium') == ['medium', 'small', 'base', 'tiny']
+    assert scheduler.candidate_models('base.en') == ['base.en', 'tiny.en']
+    assert scheduler.candidate_models('large-v3')[:2] == ['large-v3', 'medium']
+
+    planner = scheduler.DeadlineScheduler()
+    speech = planner.estimate('small', 'greedy', 100.0, 100.0)
+    # Silence is cheaper than speech and free with VAD; loading is added
+    assert planner.estimate('small', 'greedy', 200.0, 100.0) > speech
+    assert planner.estimate('small', 'greedy', 200.0, 100.0, vad=True) == speech
+    assert speech == 0.25 * 100 + 3.0
+
+
+def test_deadline_picks_most_accurate_plan_that_fits():
+    """Test that tighter deadlines give smaller models and cheaper decoding."""
+    planner = scheduler.DeadlineScheduler()
+    audio = voice(600)
+
+    plan = planner.plan(audio, model='small')
+    assert (plan.model, plan.profile, plan.options) == ('small', 'default', {})
+    assert abs(plan.speech_seconds - 600) < 1
+
+    plan = planner.plan(audio, 1000, model='small')
+    assert (plan.model, plan.profile) == ('small', 'beam')
+    assert plan.options == {'beam_size': 5}
+    plan = planner.plan(audio, 120, model='small')
+    assert (plan.model, plan.profile) == ('base', 'beam')
+    plan = planner.plan(audio, 90, model='small')
+    assert (plan.model, plan.profile) == ('base', 'default')
+    assert plan.predicted_seconds * scheduler.SAFETY_MARGIN <= 90
+    # Nothing fits: the fastest plan
+    plan = planner.plan(audio, 5, model='small')
+    assert (plan.model, plan.profile) == ('tiny', 'greedy')
+
+
+def test_measurements_update_predictions():
+    """Test that observed timings are learned, also for unmeasured models."""
+    planner = scheduler.DeadlineScheduler()
+    plan = planner.plan(voice(100), model='small')
+    prior_base = planner.rtf('base', 'default')
+
+    # This host is twice as slow as the prior
+    planner.observe(plan, 2 * 0.25 * 1.15 * 100 + 5.0, load_seconds=5.0)
+    assert abs(planner.rtf('small') - 0.575) < 0.01
+    assert abs(planner.rtf('base') - 2 * prior_base) < 0.01
+    assert planner.estimate('small', 'default', 100.0, 100.0) == (
+        planner.rtf('small') * 100 + 5.0)
+
+    planner.observe(plan, 0.25 * 1.15 * 100)
+    assert 0.28 < planner.rtf('small') < 0.575
+
+    history = planner.history()
+    assert len(history) == 2
+    assert history[0]['predicted_seconds'] == plan.predicted_seconds
+    assert history[0]['actual_seconds'] == 2 * 0.25 * 1.15 * 100 + 5.0
+
+
+def test_measurements_are_kept_per_dtype(monkeypatch):
+    """Test that timings of one model precision do not predict another."""
+    planner = scheduler.DeadlineScheduler()
+    plan = planner.plan(voice(100), model='small')
+    planner.observe(plan, 0.25 * 1.15 * 100 + 5.0, load_seconds=5.0)
+    assert sorted(planner._load()['rtf']) == ['whisper:small:float32:default']
+
+    monkeypatch.setenv('AUDIO_APP_MODEL_DTYPE', 'int8')
+    assert planner.estimate('small', 'default', 100.0, 100.0) == (
+        planner.rtf('small') * 100 + 3.0)
+    # Measurements saved without the dtype are ignored
+    assert scheduler._host_factor({'whisper:small:default': 1.0}) == 1.0
+
+
+def test_transcribe_audio_meets_deadline(monkeypatch, tmp_path):
+    """Test that a deadline job uses the chosen model and records its time."""
+    loaded = []
+
+    class FakeModel:
+        def __init__(self, name):
+            self.name = name
+
+        def transcribe(self, audio, language='es', verbose=False, **kwargs):
+            return {'text': f'{self.name} {kwargs.get("beam_size")}'}
+
+    monkeypatch.setattr('whisper.load_model',
+                        lambda name: loaded.append(name) or FakeModel(name))
+    wav = str(tmp_path / 'voicemail.wav')
+    sf.write(wav, voice(100), SR)
+
+    assert transcribe_audio(wav, 'small', deadline=15, use_daemon=False) == (
+        'base None')
+    assert transcribe_audio(wav, 'small', deadline=100, use_daemon=False) == (
+        'small 5')
+    assert loaded == ['base', 'small']
+
+    jobs = scheduler.global_scheduler.history()
+    # The deadline of the plan is the time left after decoding the file
+    assert [job['model'] for job in jobs] == ['base', 'small']
+    assert 14 < jobs[0]['deadline'] <= 15 and 99 < jobs[1]['deadline'] <= 100
+    assert all(job['actual_seconds'] < job['predicted_seconds'] for job in jobs)
+
+
+def test_concurrent_observations_are_all_kept(tmp_path):
+    """Test that schedulers sharing the file (as batch workers do) lose no job."""
+    path = str(tmp_path / 'shared.json')
+    plan = scheduler.DeadlineScheduler(path).plan_seconds(10.0, 10.0)
+
+    def work():
+        # Each one with its own in-process lock, like separate processes
+        planner = scheduler.DeadlineScheduler(path)
+        for _ in range(20):
+            planner.observe(plan, 1.0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(scheduler.DeadlineScheduler(path).history()) == 80
+
+
+def test_jobs_without_deadline_skip_speech_detection(monkeypatch, tmp_path):
+    """Test that only the speech found by VAD is measured without a deadline."""
+
+    class FakeModel:
+        def transcribe(self, audio, language='es', verbose=False, **kwargs):
+            return {'text': 'hola'}
+
+    monkeypatch.setattr('whisper.load_model', lambda name: FakeModel())
+    planned = []
+    real_detect = scheduler.detect_speech
+    monkeypatch.setattr(scheduler, 'detect_speech',
+                        lambda *a: planned.append(a) or real_detect(*a))
+    wav = str(tmp_path / 'voice.wav')
+    sf.write(wav, np.concatenate([voice(10), np.zeros(10 * SR)]), SR)
+
+    assert transcribe_audio(wav, 'tiny', use_daemon=False, use_cache=False) == 'hola'
+    assert scheduler.global_scheduler.history() == []
+
+    assert transcribe_audio(wav, 'tiny', vad=True, use_daemon=False,
+                            use_cache=False) == 'hola'
+    (job,) = scheduler.global_scheduler.history()
+    assert job['audio_seconds'] == 20 and 9 < job['speech_seconds'] < 12
+    assert planned == []
@@ -0,0 +1,98 @@
+"""Tests for progressive segment-by-segment transcription."""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import Segment, iter_segments, transcriber
+from transcription.worker import TranscriptionWorker
+
+
+SR = 16000
+
+
+class WindowModel:
+    """Fake model that returns two segments per window."""
+
+    def __init__(self):
+        """Start counting the decoded windows."""
+        self.calls = 0
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Return segments relative to the start of the window."""
+        self.calls += 1
+        seconds = len(audio) / SR
+        return {
+            'text': f'uno{self.calls} dos{self.calls}',
+            'segments': [
+                {'text': f' uno{self.calls}', 'start': 0.0,
+                 'end': seconds / 2, 'avg_logprob': -0.1},
+                {'text': f' dos{self.calls}', 'start': seconds / 2,
+                 'end': seconds, 'avg_logprob': -0.2},
+            ],
+        }
+
+
+def _write_long_wav(tmp_path, seconds=70):
+    """Write a tone with a pause every 25 seconds."""
+    audio = 0.3 * np.sin(2 * np.pi * 220 * np.arange(seconds * SR) / SR)
+    for t in range(25, seconds, 25):
+        audio[t * SR: t * SR + SR // 2] = 0.0
+    wav = tmp_path / 'long.wav'
+    sf.write(str(wav), audio, SR)
+    return str(wav)
+
+
+def test_segments_are_yielded_per_window(monkeypatch, tmp_path):
+    """Test that the first segments arrive before later windows are decoded."""
+    model = WindowModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    wav = _write_long_wav(tmp_path)
+
+    segments = iter_segments(wav, isolated=False)
+    first = next(segments)
+    assert model.calls == 1
+    assert first == Segment('uno1', 0.0, first.end, -0.1)
+
+    rest = list(segments)
+    assert model.calls == 3
+    starts = [s.start for s in [first, *rest]]
+    assert starts == sorted(starts)
+    assert rest[-1].end == 70.0
+
+
+def test_streamed_segments_are_cached(monkeypatch, tmp_path):
+    """Test that a second pass replays the segments without a model."""
+    model = WindowModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    wav = _write_long_wav(tmp_path)
+
+    streamed = list(iter_segments(wav, isolated=False))
+    replayed = list(iter_segments(wav, isolated=False))
+    assert replayed == streamed
+    assert model.calls == 3
+
+    # The full-text API reads the same cache entry
+    assert transcriber.transcribe_audio(wav, use_daemon=False) == (
+        'uno1 dos1 uno2 dos2 uno3 dos3'
+    )
+
+
+def test_worker_stream_yields_items_and_stops_early():
+    """Test streaming from the worker and killing it when abandoned."""
+    worker = TranscriptionWorker()
+    try:
+        assert list(worker.stream(itertools.repeat, 'a', 3)) == ['a', 'a', 'a']
+
+        items = worker.stream(itertools.count)
+        assert [next(items) for _ in range(3)] == [0, 1, 2]
+        items.close()
+        assert not worker.is_alive
+    finally:
+        worker.shutdown()
@@ -0,0 +1,105 @@
+"""Tests for the voice activity detection stage."""
+
+import os
+import sys
+
+import numpy as np
+import soundfile as sf
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import Segment, iter_segments, transcribe_audio, vad
+
+
+SR = 16000
+
+
+def voice(seconds):
+    """Return a harmonic tone with a syllable-like envelope."""
+    t = np.arange(int(seconds * SR)) / SR
+    tone = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 8))
+    return (0.2 * tone * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))).astype(np.float32)
+
+
+def hiss(seconds, level=0.002, seed=0):
+    """Return white noise (background or a loud non-speech burst)."""
+    rng = np.random.default_rng(seed)
+    return (level * rng.standard_normal(int(seconds * SR))).astype(np.float32)
+
+
+def recording():
+    """Speech at 2-3.5 s and 8.5-11 s, a loud noise burst at 14-15 s."""
+    return np.concatenate([
+        hiss(2), voice(1.5), hiss(5, seed=1), voice(1), hiss(0.5, seed=2),
+        voice(1), hiss(3, seed=3), hiss(1, level=0.3, seed=4), hiss(2, seed=5),
+    ])
+
+
+class LengthModel:
+    """Fake model that answers one segment covering the audio it receives."""
+
+    def __init__(self):
+        """Record the length of every decoded audio."""
+        self.seconds = []
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Return a segment from 0 to the end of the audio."""
+        self.seconds.append(len(audio) / SR)
+        return {'text': 'hola', 'segments': [
+            {'text': ' hola', 'start': 0.0, 'end': len(audio) / SR}]}
+
+
+def test_speech_is_found_and_noise_skipped():
+    """Test the speech ranges of a recording with silence and noise."""
+    ranges = vad.detect_speech(recording()) / SR
+
+    assert len(ranges) == 2
+    # The short pause between the last two words is kept
+    assert abs(ranges[0][0] - 2.0) < 0.3 and abs(ranges[0][1] - 3.5) < 0.3
+    assert abs(ranges[1][0] - 8.5) < 0.3 and abs(ranges[1][1] - 11.0) < 0.3
+
+    assert len(vad.detect_speech(hiss(5))) == 0
+    assert len(vad.detect_speech(np.zeros(SR, dtype=np.float32))) == 0
+    # Without any quiet stretch everything is kept
+    assert vad.detect_speech(voice(3)).tolist() == [[0, 3 * SR]]
+
+
+def test_speech_map_translates_times():
+    """Test that compressed times map back to the original recording."""
+    speech_map = vad.SpeechMap([[SR, 2 * SR], [5 * SR, 7 * SR]], 10 * SR, SR)
+    audio = np.arange(10 * SR, dtype=np.float32)
+
+    compressed = speech_map.compress(audio)
+    assert len(compressed) == 3 * SR and compressed[SR] == 5 * SR
+    assert speech_map.skipped_seconds == 7.0
+    np.testing.assert_allclose(speech_map.to_original([0.0, 0.5, 1.0, 2.5]),
+                               [1.0, 1.5, 5.0, 6.5])
+    # A segment that ends at the boundary ends in the first region
+    assert speech_map.map_segment(Segment('a', 0.5, 1.0)) == Segment('a', 1.5, 2.0)
+
+
+def test_transcription_skips_silence(monkeypatch, tmp_path):
+    """Test that only speech is decoded and times refer to the original."""
+    model = LengthModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+    wav = str(tmp_path / 'a.wav')
+    sf.write(wav, recording(), SR)
+
+    segments = list(iter_segments(wav, 'tiny', vad=True, isolated=False))
+    assert model.seconds[0] < 8.0
+    assert segments[0].start < 2.0 and segments[0].end > 10.5
+
+    # VAD jobs have their own cache entries; AUDIO_APP_VAD turns it on
+    assert transcribe_audio(wav, 'tiny', use_daemon=False) == 'hola'
+    assert model.seconds[-1] == 17.0
+    monkeypatch.setenv('AUDIO_APP_VAD', '1')
+    assert transcribe_audio(wav, 'tiny', use_daemon=False) == 'hola'
+    assert len(model.seconds) == 2
+
+    # Nothing to decode in a recording without speech
+    sf.write(wav, hiss(5), SR)
+    assert transcribe_audio(wav, 'tiny', use_daemon=False) == (
+        'No audio content detected'
+    )
+    assert len(model.seconds) == 2
@@ -0,0 +1,124 @@
+"""Tests for the model warm-up at startup."""
+
+import os
+import sys
+
+import torch
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import warmup
+from transcription.model_registry import global_registry
+
+
+class LanguageModel:
+    """Fake multilingual model that always hears English."""
+
+    is_multilingual = True
+
+    class dims:
+        """Model dimensions used to build the mel spectrogram."""
+
+        n_mels = 80
+
+    def __init__(self):
+        """Record detections and decodes."""
+        self.detections = 0
+        self.languages = []
+
+    def parameters(self):
+        """Return the parameters that give the device and dtype."""
+        return iter([torch.zeros(1)])
+
+    def detect_language(self, mel):
+        """Return language probabilities for one window."""
+        self.detections += 1
+        return None, {'es': 0.2, 'en': 0.8}
+
+    def transcribe(self, audio, language='es', verbose=False, **kwargs):
+        """Remember the language used."""
+        self.languages.append(language)
+        return {'text': ''}
+
+
+class InlineWorker:
+    """Worker that runs the jobs in this process."""
+
+    def __init__(self):
+        """Record the jobs."""
+        self.jobs = []
+
+    def call(self, func, *args, **kwargs):
+        """Run a job right away."""
+        self.jobs.append(func)
+        return func(*args, **kwargs)
+
+
+def test_warm_up_loads_and_decodes(monkeypatch):
+    """Test that the model is loaded and decodes once in the default language."""
+    model = LanguageModel()
+    monkeypatch.setattr('whisper.load_model', lambda name: model)
+
+    assert warmup.warm_up_model('tiny') >= 0.0
+    assert model.languages == ['es']
+    assert model.detections == 0
+    assert [key[0] for key in global_registry.stats()['models']] == ['tiny']
+
+    # With language detection, the detection is warmed up too
+    monkeypatch.setenv('AUDIO_APP_LANGUAGE', 'auto')
+    warmup.warm_up_model('tiny')
+    assert model.detections == 1
+    assert model.languages == ['es', 'en']
+
+
+def test_start_warm_up_reports_readiness(monkeypatch):
+    """Test that the warm-up runs in the worker and reports when it ends."""
+    monkeypatch.setattr('whisper.load_model', lambda name: LanguageModel())
+    worker = InlineWorker()
+    results = []
+
+    thread = warmup.start_warm_up(
+        'tiny', on_done=lambda *r: results.append(r), worker=worker
+    )
+    thread.join(timeout=10)
+
+    assert worker.jobs == [warmup.warm_up_model]
+    seconds, error = results[0]
+    assert error is None and seconds >= 0.0
+
+
+def test_start_warm_up_preview_model(monkeypatch):
+    """Test that the preview model is warmed up first when there is one."""
+    loaded = []
+
+    def load(name):
+        loaded.append(name)
+        return LanguageModel()
+
+    monkeypatch.setattr('whisper.load_model', load)
+    worker = InlineWorker()
+    warmup.start_warm_up('tiny', preview_model='base', worker=worker).join(
+        timeout=10
+    )
+    assert loaded == ['base', 'tiny']
+    assert worker.jobs == [warmup.warm_up_model] * 2
+
+
+def test_start_warm_up_failure_and_disabled(monkeypatch):
+    """Test a failed warm-up and turning it off."""
+
+    def broken(name):
+        raise OSError('no network')
+
+    monkeypatch.setattr('whisper.load_model', broken)
+    results = []
+    warmup.start_warm_up(
+        'tiny', on_done=lambda *r: results.append(r), worker=InlineWorker()
+    ).join(timeout=10)
+    assert results[0][0] is None
+    assert isinstance(results[0][1], OSError)
+
+    monkeypatch.setenv('AUDIO_APP_WARMUP', '0')
+    assert warmup.start_warm_up(worker=InlineWorker()) is None
+
@@ -0,0 +1,63 @@
+"""Tests for the killable transcription worker process."""
+
+import operator
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from transcription import worker
+
+
+@pytest.fixture
+def transcription_worker():
+    """Provide a worker that is shut down after the test."""
+    w = worker.TranscriptionWorker()
+    yield w
+    w.shutdown()
+
+
+def test_call_returns_result_and_reuses_process(transcription_worker):
+    """Test that jobs run in the same warm process."""
+    assert transcription_worker.call(operator.add, 2, 3) == 5
+    pid = transcription_worker._process.pid
+    assert transcription_worker.call(operator.mul, 2, 3) == 6
+    assert transcription_worker._process.pid == pid
+
+
+def test_job_error_is_reported(transcription_worker):
+    """Test that an exception inside the job reaches the caller."""
+    with pytest.raises(RuntimeError, match='ValueError'):
+        transcription_worker.call(int, 'not a number')
+    assert transcription_worker.is_alive
+
+
+def test_timeout_kills_and_respawns(transcription_worker):
+    """Test that a hung job is killed and the next job gets a new process."""
+    transcription_worker.call(operator.add, 1, 1)
+    first_pid = transcription_worker._process.pid
+
+    start = time.monotonic()
+    with pytest.raises(worker.TranscriptionTimeout):
+        transcription_worker.call(time.sleep, 60, timeout=0.5)
+    assert time.monotonic() - start < 10
+    assert not transcription_worker.is_alive
+
+    assert transcription_worker.call(operator.add, 1, 2) == 3
+    assert transcription_worker._process.pid != first_pid
+
+
+def test_cancel_event_stops_job(transcription_worker):
+    """Test that setting the cancel event kills the running job."""
+    transcription_worker.call(operator.add, 1, 1)
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+
+    with pytest.raises(worker.TranscriptionCancelled):
+        transcription_worker.call(time.sleep, 60, cancel_event=cancel)
+    assert not transcription_worker.is_alive